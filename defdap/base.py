@@ -14,6 +14,8 @@
 # limitations under the License.
 
 import numpy as np
+import pandas as pd
+from scipy import ndimage
 
 from defdap.quat import Quat
 from defdap import plotting
@@ -24,6 +26,11 @@ class Map(object):
 
     def __init__(self):
         self.grainList = None
+        # points of all grains stored grain by grain. Points of grain i
+        # are at grainOffsets[i]:grainOffsets[i + 1] in each array.
+        self.grainPoints = None     # flat indices of points in the map
+        self.grainOffsets = None    # start of each grain
+        self.grainCoords = None     # coords (x, y) of points
         self.homogPoints = []
 
         self.proxigramArr = None
@@ -53,6 +60,81 @@ class Map(object):
             raise Exception("No grains detected.")
         return True
 
+    def labelGrains(self, minGrainSize=10):
+        """Segment the boundary map into grains by connected component
+        labelling and store the grain map in `grains`. Grains are
+        numbered from 1 in order of their first point in the map.
+        Boundary points are assigned to the grain on their left or
+        above them (the lower numbered if both) and points in grains
+        smaller than `minGrainSize` are set to -2.
+
+        Args:
+            minGrainSize (int, optional): Minimum grain area in pixels,
+                including assigned boundary points
+
+        The points of each grain are stored in `grainPoints`,
+        `grainOffsets` and `grainCoords`, grain by grain and in raster
+        order within a grain.
+
+        Returns:
+            int: Number of grains found
+        """
+        boundaries = self.boundaries == -1
+
+        # label regions separated by boundaries using 4-connectivity,
+        # then renumber in order of the first point of each region
+        labels, numLabels = ndimage.label(~boundaries)
+        regionIds, firstPoints = np.unique(labels, return_index=True)
+        firstPoints = firstPoints[regionIds > 0]
+        order = np.zeros(numLabels + 1, dtype=int)
+        order[labels.flat[firstPoints]] = np.argsort(np.argsort(firstPoints)) + 1
+        labels = order[labels]
+
+        # boundary points are claimed by the region on their left or
+        # above, whichever was found first
+        owner = np.zeros_like(labels)
+        owner[:, 1:] = labels[:, :-1]
+        ownerUp = labels[:-1]
+        owner[1:] = np.where(
+            (ownerUp > 0) & ((owner[1:] == 0) | (ownerUp < owner[1:])),
+            ownerUp, owner[1:]
+        )
+        labels[boundaries] = owner[boundaries]
+
+        # discard small regions and number the remaining grains
+        grainSizes = np.bincount(labels.ravel(), minlength=numLabels + 1)
+        keep = grainSizes >= minGrainSize
+        keep[0] = False
+        grainIds = np.full(numLabels + 1, -2, dtype=int)
+        grainIds[0] = -1
+        numGrains = np.count_nonzero(keep)
+        grainIds[keep] = np.arange(1, numGrains + 1)
+        self.grains = grainIds[labels]
+
+        # group the points of each grain
+        grainPoints = np.argsort(self.grains, axis=None, kind='stable')
+        grainOffsets = np.searchsorted(self.grains.flat[grainPoints],
+                                       np.arange(1, numGrains + 2))
+        self.grainPoints = grainPoints[grainOffsets[0]:]
+        self.grainOffsets = grainOffsets - grainOffsets[0]
+
+        yCoords, xCoords = np.unravel_index(self.grainPoints, self.grains.shape)
+        self.grainCoords = np.stack((xCoords, yCoords), axis=1)
+
+        return numGrains
+
+    def grainSlice(self, grainId):
+        """Slice of the points of a grain in the grain point arrays.
+
+        Args:
+            grainId (int): ID (place in grain list) of the grain
+
+        Returns:
+            slice: Slice into `grainPoints` and the other grain point
+                arrays
+        """
+        return slice(self.grainOffsets[grainId], self.grainOffsets[grainId + 1])
+
     def plotGrainNumbers(self, dilateBoundaries=False, ax=None, **kwargs):
         """Plot a map with grains numbered
 
@@ -330,29 +412,99 @@ class Map(object):
 
         trialDistances = None
 
-    def calcGrainAv(self, mapData, grainIds=-1):
-        """Calculate grain average of any DIC map data.
+    def calcGrainStats(self, mapData, stats=('mean',), grainIds=-1):
+        """Calculate statistics of map data over each grain, for all
+        grains at once. Several statistics of several fields are
+        calculated in one pass over the grain points.
 
         Args:
-            mapData (np.array): Array of map data to grain average. This must be cropped!
+            mapData (np.array or dict): Array of map data or dict of
+                named arrays. These must be cropped!
+            stats (list, optional): Statistics to calculate. Any of
+                'mean', 'std', 'min', 'max', 'median', 'count' or a
+                number for a percentile, e.g. 95 (labelled 'p95').
+            grainIds (list, optional): IDs of grains to return
+                statistics of, default is all grains
 
         Returns:
-            np.array: Array containing the grain average values
+            pandas.DataFrame: Statistics of each grain indexed by grain
+                ID. Columns are the statistics or (field, statistic) if
+                a dict of map data is given.
         """
         # Check that grains have been detected in the map
         self.checkGrainsDetected()
 
         if type(grainIds) is int and grainIds == -1:
             grainIds = range(len(self))
+        if isinstance(stats, (str, int, float)):
+            stats = [stats]
+        fields = mapData if isinstance(mapData, dict) else {None: mapData}
+
+        grainStarts = self.grainOffsets[:-1]
+        grainSizes = np.diff(self.grainOffsets)
+        grainIndex = np.repeat(np.arange(len(grainSizes)), grainSizes)
+
+        results = {}
+        for fieldName, fieldData in fields.items():
+            # data of grain points, grain by grain
+            values = np.ravel(fieldData)[self.grainPoints].astype(float)
+
+            mean = np.add.reduceat(values, grainStarts) / grainSizes
+            sortedValues = None
+            hasNan = None
+            for stat in stats:
+                if stat == 'mean':
+                    result = mean
+                elif stat == 'std':
+                    deviation = values - np.repeat(mean, grainSizes)
+                    result = np.sqrt(np.add.reduceat(deviation * deviation, grainStarts) / grainSizes)
+                elif stat == 'min':
+                    result = np.minimum.reduceat(values, grainStarts)
+                elif stat == 'max':
+                    result = np.maximum.reduceat(values, grainStarts)
+                elif stat == 'count':
+                    result = grainSizes
+                elif stat == 'median' or not isinstance(stat, str):
+                    q = 50 if stat == 'median' else stat
+                    if not 0 <= q <= 100:
+                        raise ValueError("Percentiles must be between 0 and 100.")
+                    if sortedValues is None:
+                        # sort values within each grain
+                        sortedValues = values[np.lexsort((values, grainIndex))]
+                        hasNan = np.add.reduceat(np.isnan(values), grainStarts) > 0
+
+                    # linear interpolation between closest ranks, as
+                    # numpy.percentile
+                    position = (grainSizes - 1) * q / 100
+                    lower = np.floor(position).astype(int)
+                    upper = np.ceil(position).astype(int)
+                    lowerValues = sortedValues[grainStarts + lower]
+                    upperValues = sortedValues[grainStarts + upper]
+                    result = lowerValues + (upperValues - lowerValues) * (position - lower)
+                    result[hasNan] = np.nan
+                    if stat != 'median':
+                        stat = "p{:g}".format(stat)
+                else:
+                    raise ValueError("Unknown statistic '{}'.".format(stat))
 
-        grainAvData = np.zeros(len(grainIds))
+                key = stat if fieldName is None else (fieldName, stat)
+                results[key] = result[grainIds]
 
-        for i, grainId in enumerate(grainIds):
-            grain = self[grainId]
-            grainData = grain.grainData(mapData)
-            grainAvData[i] = grainData.mean()
+        return pd.DataFrame(results, index=pd.Index(grainIds, name="grainId"))
+
+    def calcGrainAv(self, mapData, grainIds=-1):
+        """Calculate grain average of any DIC map data.
+
+        Args:
+            mapData (np.array): Array of map data to grain average. This must be cropped!
+
+        Returns:
+            np.array: Array containing the grain average values
+        """
+        grainStats = self.calcGrainStats(mapData, stats=('mean',),
+                                         grainIds=grainIds)
 
-        return grainAvData
+        return grainStats['mean'].to_numpy()
 
     def plotGrainDataMap(self, mapData=None, grainData=None,
                          grainIds=-1, bg=0, **kwargs):
@@ -377,11 +529,12 @@ class Map(object):
         if len(grainData) != len(grainIds):
             raise Exception("Must be 1 value for each grain in grainData.")
 
-        grainMap = np.full([self.yDim, self.xDim], bg, dtype=type(grainData[0]))
-        for grainId, grainValue in zip(grainIds, grainData):
-            grain = self.grainList[grainId]
-            for coord in grain.coordList:
-                grainMap[coord[1], coord[0]] = grainValue
+        # fill the points of each grain with its value
+        dataType = type(grainData[0])
+        grainValues = np.full(len(self), bg, dtype=dataType)
+        grainValues[list(grainIds)] = grainData
+        grainMap = np.full([self.yDim, self.xDim], bg, dtype=dataType)
+        grainMap.flat[self.grainPoints] = np.repeat(grainValues, np.diff(self.grainOffsets))
 
         plot = MapPlot.create(self, grainMap, **plotParams)
 
@@ -435,18 +588,32 @@ class Map(object):
 
 
 class Grain(object):
+    """A grain of a map. The points of the grain are held by the map
+    and the point data of a grain are views onto the map's arrays.
+    """
 
-    def __init__(self):
-        # list of coords stored as tuples (x, y). These are coords in a
-        # cropped image if crop exists.
-        self.coordList = []
+    def __init__(self, grainId, ownerMap):
+        self.grainId = grainId      # ID (place in grain list) of grain in map
+        self.ownerMap = ownerMap    # map this grain is a member of
 
     def __len__(self):
-        return len(self.coordList)
+        pointSlice = self.pointSlice
+        return pointSlice.stop - pointSlice.start
+
+    @property
+    def pointSlice(self):
+        return self.ownerMap.grainSlice(self.grainId)
+
+    @property
+    def coordList(self):
+        """Array of coords (x, y) of shape (n, 2). These are coords in a
+        cropped image if crop exists.
+        """
+        return self.ownerMap.grainCoords[self.pointSlice]
 
     @property
     def extremeCoords(self):
-        coords = np.array(self.coordList, dtype=int)
+        coords = self.coordList
 
         x0, y0 = coords.min(axis=0)
         xmax, ymax = coords.max(axis=0)
@@ -477,7 +644,7 @@ class Grain(object):
             xCentre = round((xmax + x0) / 2)
             yCentre = round((ymax + y0) / 2)
         elif centreType == "com":
-            xCentre, yCentre = np.array(self.coordList).mean(axis=0).round()
+            xCentre, yCentre = self.coordList.mean(axis=0).round()
         else:
             raise ValueError("centreType must be box or com")
 
@@ -493,8 +660,8 @@ class Grain(object):
         # initialise array with nans so area not in grain displays white
         outline = np.full((ymax - y0 + 1, xmax - x0 + 1), bg, dtype=int)
 
-        for coord in self.coordList:
-            outline[coord[1] - y0, coord[0] - x0] = fg
+        coords = self.coordList
+        outline[coords[:, 1] - y0, coords[:, 0] - x0] = fg
 
         return outline
 
@@ -521,12 +688,9 @@ class Grain(object):
         numpy.ndarray
             Array containing this grains values from the given map data.
         """
-        grainData = np.zeros(len(self), dtype=mapData.dtype)
-
-        for i, coord in enumerate(self.coordList):
-            grainData[i] = mapData[coord[1], coord[0]]
+        coords = self.coordList
 
-        return grainData
+        return mapData[coords[:, 1], coords[:, 0]]
 
     def grainMapData(self, mapData=None, grainData=None, bg=np.nan):
         """
@@ -560,8 +724,8 @@ class Grain(object):
         grainMapData = np.full((ymax - y0 + 1, xmax - x0 + 1), bg,
                                dtype=type(grainData[0]))
 
-        for coord, data in zip(self.coordList, grainData):
-            grainMapData[coord[1] - y0, coord[0] - x0] = data
+        coords = self.coordList
+        grainMapData[coords[:, 1] - y0, coords[:, 0] - x0] = grainData
 
         return grainMapData
 
@@ -19,8 +19,9 @@ from skimage import morphology as mph
 
 import copy
 
-from defdap.file_readers import EBSDDataLoader
-from defdap.quat import Quat
+from defdap.file_readers import EBSDDataLoader, checkRoi
+from defdap.file_writers import EBSDDataWriter
+from defdap.quat import Quat, QuatArray
 from defdap.crystal import SlipSystem
 from defdap import base
 
@@ -44,7 +45,11 @@ class Map(base.Map):
         step size
     eulerAngleArray
     bandContrastArray
-    quatArray : numpy.ndarray
+    meanAngularDeviationArray
+        For maps opened lazily these and phaseArray are read from
+        file on first access. Mean angular deviation is None if the
+        file has none.
+    quatArray : defdap.quat.QuatArray
         array of quaterions for each point of map
     numPhases : int
         number of phases
@@ -80,6 +85,8 @@ class Map(base.Map):
     origin : tuple(int)
         Map origin (y, x). Used by linker class where origin is a
         homologue point of the maps
+    offset : tuple(int)
+        Position (x, y) of the loaded region in the full map
     GND
         GND scalar map
     Nye
@@ -88,7 +95,8 @@ class Map(base.Map):
     ax
     """
 
-    def __init__(self, fileName, crystalSym, dataType=None):
+    def __init__(self, fileName, crystalSym, dataType=None,
+                 memoryMap=False, useCache=False, roi=None, lazy=False):
         """
         Initialise class and load EBSD data
 
@@ -98,12 +106,30 @@ class Map(base.Map):
             Path to EBSD file, including name, excluding extension
         crystalSym : str, {'cubic', 'hexagonal'}
             Crystal structure
-        dataType : str, {'OxfordBinary', 'OxfordText'}
+        dataType : str, {'OxfordBinary', 'OxfordText', 'EdaxAng',
+                         'HDF5'}
             Format of EBSD data file
+        memoryMap : bool, optional
+            Memory-map binary data files instead of reading them into
+            memory. Only used for 'OxfordBinary' data.
+        useCache : bool, optional
+            Cache data parsed from text files in a binary sidecar
+            file and load from it when valid. Only used for
+            'OxfordText' data.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) in pixels to
+            load, max values exclusive. Only this part of the map is
+            read from file.
+        lazy : bool, optional
+            Only read the metadata now and read the data arrays from
+            file when they are first accessed.
         """
         # Call base class constructor
         super(Map, self).__init__()
 
+        # function to read the data arrays when opened lazily
+        self._pendingDataLoad = None
+
         print("\rLoading EBSD data...", end="")
 
         self.crystalSym = None
@@ -112,14 +138,21 @@ class Map(base.Map):
         self.stepSize = None
         self.eulerAngleArray = None
         self.bandContrastArray = None
+        self.meanAngularDeviationArray = None
         self.quatArray = None
         self.numPhases = None
         self.phaseArray = None
         self.phaseNames = []
         self.boundaries = None
+        self.misOrix = None     # misorientation to neighbour in +x (degrees)
+        self.misOriy = None     # misorientation to neighbour in +y (degrees)
         self.phaseBoundaries = None
         self.cacheEulerMap = None
         self.grains = None
+        # data of the points of all grains, stored grain by grain
+        self.grainQuatComps = None  # quat components, shape (4, n)
+        self.grainMisOris = None    # misOri to grain reference ori
+        self.grainMisOriAxes = None     # misOri axes, shape (n, 3)
         self.misOri = None
         self.misOriAxis = None
         self.kam = None
@@ -128,6 +161,7 @@ class Map(base.Map):
         self.slipTraceColours = None
         self.currGrainId = None
         self.origin = (0, 0)
+        self.offset = (0, 0)
         self.GND = None
         self.Nye = None
 
@@ -135,14 +169,17 @@ class Map(base.Map):
         self.plotHomog = self.plotEulerMap
         self.highlightAlpha = 1
 
-        self.loadData(fileName, crystalSym, dataType=dataType)
+        self.loadData(fileName, crystalSym, dataType=dataType,
+                      memoryMap=memoryMap, useCache=useCache, roi=roi,
+                      lazy=lazy)
 
     @property
     def plotDefault(self):
         # return self.plotEulerMap(*args, **kwargs)
         return lambda *args, **kwargs: self.plotEulerMap(*args, **kwargs)
 
-    def loadData(self, fileName, crystalSym, dataType=None):
+    def loadData(self, fileName, crystalSym, dataType=None,
+                 memoryMap=False, useCache=False, roi=None, lazy=False):
         """
         Load in EBSD data
 
@@ -152,35 +189,217 @@ class Map(base.Map):
             Path to EBSD file, including name, excluding extension
         crystalSym : str, {'cubic', 'hexagonal'}
             Crystal structure
-        dataType : str, {'OxfordBinary', 'OxfordText'}
+        dataType : str, {'OxfordBinary', 'OxfordText', 'EdaxAng',
+                         'HDF5'}
             Format of EBSD data file
+        memoryMap : bool, optional
+            Memory-map binary data files instead of reading them into
+            memory. The data arrays are then views onto the file.
+        useCache : bool, optional
+            Cache data parsed from text files in a binary sidecar
+            file and load from it when valid.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) in pixels to
+            load, max values exclusive. The position of the region in
+            the full map is stored in `offset`.
+        lazy : bool, optional
+            Only read the metadata now and read the data arrays from
+            file when they are first accessed.
         """
         if dataType is None:
             dataType = "OxfordBinary"
 
+        # read the metadata then define how to read the data arrays
         dataLoader = EBSDDataLoader()
         if dataType == "OxfordBinary":
             metadataDict = dataLoader.loadOxfordCPR(fileName)
-            dataDict = dataLoader.loadOxfordCRC(fileName)
+
+            def loadArrays():
+                return dataLoader.loadOxfordCRC(fileName, memoryMap=memoryMap,
+                                                roi=roi)
         elif dataType == "OxfordText":
-            metadataDict, dataDict = dataLoader.loadOxfordCTF(fileName)
+            metadataDict, _ = dataLoader.loadOxfordCTF(fileName,
+                                                       metadataOnly=True)
+
+            def loadArrays():
+                return dataLoader.loadOxfordCTF(fileName, useCache=useCache,
+                                                roi=roi)[1]
+        elif dataType == "EdaxAng":
+            metadataDict, _ = dataLoader.loadEdaxAng(fileName,
+                                                     metadataOnly=True)
+
+            def loadArrays():
+                return dataLoader.loadEdaxAng(fileName, roi=roi)[1]
+        elif dataType == "HDF5":
+            metadataDict, _ = dataLoader.loadHDF5(fileName, metadataOnly=True)
+
+            def loadArrays():
+                return dataLoader.loadHDF5(fileName, roi=roi)[1]
         else:
             raise Exception("No loader found for this EBSD data.")
 
+        if lazy:
+            self._pendingDataLoad = loadArrays
+            if roi is not None:
+                # loading the data updates the metadata to the region
+                xMin, xMax, yMin, yMax = checkRoi(
+                    roi, metadataDict['xDim'], metadataDict['yDim']
+                )
+                metadataDict = dict(metadataDict, xDim=xMax - xMin,
+                                    yDim=yMax - yMin, offset=(xMin, yMin))
+        else:
+            self._pendingDataLoad = None
+            self.setDataArrays(loadArrays())
+
         self.xDim = metadataDict['xDim']
         self.yDim = metadataDict['yDim']
         self.stepSize = metadataDict['stepSize']
         self.numPhases = metadataDict['numPhases']
         self.phaseNames = metadataDict['phaseNames']
-
-        self.eulerAngleArray = dataDict['eulerAngle']
-        self.bandContrastArray = dataDict['bandContrast']
-        self.phaseArray = dataDict['phase']
+        self.offset = tuple(metadataDict['offset'])
 
         self.crystalSym = crystalSym
 
-        print("\rLoaded EBSD data (dimensions: {0} x {1} pixels, step "
-              "size: {2} um)".format(self.xDim, self.yDim, self.stepSize))
+        print("\rLoaded EBSD {0}(dimensions: {1} x {2} pixels, step "
+              "size: {3} um)".format("metadata " if lazy else "data ",
+                                     self.xDim, self.yDim, self.stepSize))
+
+    def setDataArrays(self, dataDict):
+        """Set the Euler angle, band contrast, mean angular deviation
+        and phase arrays from a dictionary of loaded data.
+
+        Parameters
+        ----------
+        dataDict : dict
+            Data loaded by an EBSDDataLoader.
+        """
+        self._eulerAngleArray = dataDict['eulerAngle']
+        self._bandContrastArray = dataDict['bandContrast']
+        self._meanAngularDeviationArray = dataDict.get('meanAngularDeviation')
+        self._phaseArray = dataDict['phase']
+        # orientations need to be rebuilt from the new data
+        self.quatArray = None
+
+    def save(self, fileName, dataType=None):
+        """
+        Write the current orientation, phase and band contrast data to
+        file, for example after transforming the map. Euler angles are
+        calculated from the quat array if it has been built, so
+        rotations applied to it are kept. Mean angular deviation is
+        written as zeros if the map has none.
+
+        Parameters
+        ----------
+        fileName : str
+            Path to file, including name, excluding extension
+        dataType : str, {'OxfordBinary', 'OxfordText'}
+            Format of EBSD data file to write, a .cpr/.crc pair by
+            default
+        """
+        if dataType is None:
+            dataType = "OxfordBinary"
+
+        dataWriter = EBSDDataWriter()
+        dataWriter.metadata['xDim'] = self.xDim
+        dataWriter.metadata['yDim'] = self.yDim
+        dataWriter.metadata['stepSize'] = self.stepSize
+        dataWriter.metadata['numPhases'] = self.numPhases
+        dataWriter.metadata['phaseNames'] = self.phaseNames
+        dataWriter.metadata['crystalSym'] = self.crystalSym
+
+        if self.quatArray is None:
+            dataWriter.data['eulerAngle'] = self.eulerAngleArray
+        else:
+            dataWriter.data['eulerAngle'] = self.quatArray.eulerAngles()
+        dataWriter.data['bandContrast'] = self.bandContrastArray
+        dataWriter.data['meanAngularDeviation'] = self.meanAngularDeviationArray
+        dataWriter.data['phase'] = self.phaseArray
+
+        if dataType == "OxfordBinary":
+            dataWriter.writeOxfordBinary(fileName)
+        elif dataType == "OxfordText":
+            dataWriter.writeOxfordCTF(fileName)
+        else:
+            raise Exception("No writer found for this EBSD data type.")
+
+    def loadPendingData(self):
+        """Read the data arrays of a lazily opened map from file, if
+        not already read.
+        """
+        if self._pendingDataLoad is not None:
+            loadArrays = self._pendingDataLoad
+            self._pendingDataLoad = None
+            print("\rLoading EBSD data...", end="")
+            self.setDataArrays(loadArrays())
+            print("\rLoaded EBSD data", end="")
+
+    @property
+    def dataLoaded(self):
+        return self._pendingDataLoad is None
+
+    @property
+    def eulerAngleArray(self):
+        self.loadPendingData()
+        return self._eulerAngleArray
+
+    @eulerAngleArray.setter
+    def eulerAngleArray(self, value):
+        self.loadPendingData()
+        self._eulerAngleArray = value
+        # orientations need to be rebuilt from the new data
+        self.quatArray = None
+
+    @property
+    def quatArray(self):
+        return self._quatArray
+
+    @quatArray.setter
+    def quatArray(self, value):
+        self._quatArray = value
+        # neighbour misorientations are calculated from the orientations
+        self.misOrix = None
+        self.misOriy = None
+
+    @property
+    def crystalSym(self):
+        return self._crystalSym
+
+    @crystalSym.setter
+    def crystalSym(self, value):
+        self._crystalSym = value
+        # neighbour misorientations depend on the crystal symmetry
+        self.misOrix = None
+        self.misOriy = None
+
+    @property
+    def bandContrastArray(self):
+        self.loadPendingData()
+        return self._bandContrastArray
+
+    @bandContrastArray.setter
+    def bandContrastArray(self, value):
+        self.loadPendingData()
+        self._bandContrastArray = value
+
+    @property
+    def meanAngularDeviationArray(self):
+        self.loadPendingData()
+        return self._meanAngularDeviationArray
+
+    @meanAngularDeviationArray.setter
+    def meanAngularDeviationArray(self, value):
+        self.loadPendingData()
+        self._meanAngularDeviationArray = value
+
+    @property
+    def phaseArray(self):
+        self.loadPendingData()
+        return self._phaseArray
+
+    @phaseArray.setter
+    def phaseArray(self, value):
+        self.loadPendingData()
+        self._phaseArray = value
 
     @property
     def scale(self):
@@ -193,13 +412,13 @@ class Map(base.Map):
         print("\rTransforming EBSD data...", end="")
         self.eulerAngleArray = self.eulerAngleArray[:, ::-1, ::-1]
         self.bandContrastArray = self.bandContrastArray[::-1, ::-1]
+        if self.meanAngularDeviationArray is not None:
+            self.meanAngularDeviationArray = self.meanAngularDeviationArray[::-1, ::-1]
         self.phaseArray = self.phaseArray[::-1, ::-1]
         self.buildQuatArray()
         
         transformQuat = Quat.fromAxisAngle(np.array([0, 0, 1]), np.pi)
-        for i in range(self.xDim):
-            for j in range(self.yDim):
-                self.quatArray[j, i] = self.quatArray[j, i] * transformQuat
+        self.quatArray = self.quatArray * transformQuat
         print("\rDone                                               ", end="")
 
     def plotBandContrastMap(self, **kwargs):
@@ -268,19 +487,29 @@ class Map(base.Map):
 
         return plot
 
-    def plotIPFMap(self, direction, **kwargs):
+    def plotIPFMap(self, direction, useLUT=False, **kwargs):
+        """
+        Plot a map with points coloured by IPF of a direction.
+
+        Parameters
+        ----------
+        direction : np.array
+            Vector of reference direction for the IPF.
+        useLUT : bool, optional
+            Interpolate colours from a lookup table over the fundamental
+            triangle, see `Quat.calcIPFcolours`.
+        """
         # Set default plot parameters then update with any input
         plotParams = {}
         plotParams.update(kwargs)
 
-        # calculate IPF colours
+        # calculate IPF colours, in the shape of the map
         IPFcolours = Quat.calcIPFcolours(
-            self.quatArray.flatten(),
+            self.quatArray,
             direction,
-            self.crystalSym
+            self.crystalSym,
+            useLUT=useLUT
         )
-        # reshape back to map shape array
-        IPFcolours = np.reshape(IPFcolours, (self.yDim, self.xDim, 3))
 
         plot = MapPlot.create(self, IPFcolours, **plotParams)
 
@@ -315,34 +544,31 @@ class Map(base.Map):
 
     def calcKam(self):
         """
-        Calculates Kernel Average Misorientaion (KAM) for the EBSD map.
-        Crystal symmetric equivalences are not considered. Stores
-        result in self.kam.
+        Calculates Kernel Average Misorientaion (KAM) for the EBSD map,
+        using the minimum misorientation to each neighbour considering
+        crystal symmetry. Stores result in self.kam.
         """
-        quatComps = np.empty((4, self.yDim, self.xDim))
+        self.buildQuatArray()
+        quatComps = self.quatArray.quatComps
 
-        for i, row in enumerate(self.quatArray):
-            for j, quat in enumerate(row):
-                quatComps[:, i, j] = quat.quatCoef
+        # misorientation with the neighbour in the positive y and x directions
+        misOriy = Quat.calcDisorientation(quatComps[:, :-1, :], quatComps[:, 1:, :],
+                                          self.crystalSym)
+        misOrix = Quat.calcDisorientation(quatComps[:, :, :-1], quatComps[:, :, 1:],
+                                          self.crystalSym)
 
         self.kam = np.empty((self.yDim, self.xDim))
 
-        # Start with rows. Calculate misorientation with neighbouring rows.
+        # Start with rows. Average misorientation with neighbouring rows.
         # First and last row only in one direction
-        self.kam[0, :] = abs(np.einsum("ij,ij->j", quatComps[:, 0, :], quatComps[:, 1, :]))
-        self.kam[-1, :] = abs(np.einsum("ij,ij->j", quatComps[:, -1, :], quatComps[:, -2, :]))
-        for i in range(1, self.yDim - 1):
-            self.kam[i, :] = (abs(np.einsum("ij,ij->j", quatComps[:, i, :], quatComps[:, i + 1, :])) +
-                              abs(np.einsum("ij,ij->j", quatComps[:, i, :], quatComps[:, i - 1, :]))) / 2
-
-        self.kam[self.kam > 1] = 1
+        self.kam[0, :] = misOriy[0]
+        self.kam[-1, :] = misOriy[-1]
+        self.kam[1:-1, :] = (misOriy[:-1] + misOriy[1:]) / 2
 
         # Do the same for columns
-        self.kam[:, 0] += abs(np.einsum("ij,ij->j", quatComps[:, :, 0], quatComps[:, :, 1]))
-        self.kam[:, -1] += abs(np.einsum("ij,ij->j", quatComps[:, :, -1], quatComps[:, :, -2]))
-        for i in range(1, self.xDim - 1):
-            self.kam[:, i] += (abs(np.einsum("ij,ij->j", quatComps[:, :, i], quatComps[:, :, i + 1])) +
-                               abs(np.einsum("ij,ij->j", quatComps[:, :, i], quatComps[:, :, i - 1]))) / 2
+        self.kam[:, 0] += misOrix[:, 0]
+        self.kam[:, -1] += misOrix[:, -1]
+        self.kam[:, 1:-1] += (misOrix[:, :-1] + misOrix[:, 1:]) / 2
 
         self.kam /= 2
         self.kam[self.kam > 1] = 1
@@ -382,32 +608,11 @@ class Map(base.Map):
         """
         self.buildQuatArray()
         print("\rFinding boundaries...", end="")
-        syms = Quat.symEqv(self.crystalSym)
+        # quat components of initial and symmetric equivalents, the
+        # first symmetry is the identity
+        syms = Quat.symEqvArray(self.crystalSym)
         numSyms = len(syms)
-
-        # array to store quat components of initial and symmetric equivalents
-        quatComps = np.empty((numSyms, 4, self.yDim, self.xDim))
-
-        # populate with initial quat components
-        for i, row in enumerate(self.quatArray):
-            for j, quat in enumerate(row):
-                quatComps[0, :, i, j] = quat.quatCoef
-
-        # loop of over symmetries and apply to initial quat components
-        # (excluding first symmetry as this is the identity transformation)
-        for i, sym in enumerate(syms[1:], start=1):
-            # sym[i] * quat for all points (* is quaternion product)
-            quatComps[i, 0] = (quatComps[0, 0] * sym[0] - quatComps[0, 1] * sym[1] -
-                               quatComps[0, 2] * sym[2] - quatComps[0, 3] * sym[3])
-            quatComps[i, 1] = (quatComps[0, 0] * sym[1] + quatComps[0, 1] * sym[0] -
-                               quatComps[0, 2] * sym[3] + quatComps[0, 3] * sym[2])
-            quatComps[i, 2] = (quatComps[0, 0] * sym[2] + quatComps[0, 2] * sym[0] -
-                               quatComps[0, 3] * sym[1] + quatComps[0, 1] * sym[3])
-            quatComps[i, 3] = (quatComps[0, 0] * sym[3] + quatComps[0, 3] * sym[0] -
-                               quatComps[0, 1] * sym[2] + quatComps[0, 2] * sym[1])
-
-            # swap into positve hemisphere if required
-            quatComps[i, :, quatComps[i, 0] < 0] *= -1
+        quatComps = Quat.calcProducts(syms, self.quatArray.quatComps)
 
         # Arrays to store neigbour misorientation in positive x and y direction
         misOrix = np.zeros((numSyms, self.yDim, self.xDim))
@@ -533,77 +738,89 @@ class Map(base.Map):
 
         return
 
-    def findBoundaries(self, boundDef=10):
+    def calcNeighbourMisOri(self, chunkSize=256):
         """
-        Find grain boundaries
+        Calculate the misorientation between each point and its
+        neighbours in the positive x and y directions, considering
+        crystal symmetry. Rows of the map are processed in chunks to
+        bound memory use. Stores results in degrees as float32 in
+        self.misOrix and self.misOriy. The last column/row have no
+        neighbour and are given a misorientation of 180 degrees.
 
-        :param boundDef: critical misorientation
-        :type boundDef: float
+        The results are kept until the orientations of the map change,
+        so calling again is free.
+
+        Parameters
+        ----------
+        chunkSize : int, optional
+            Number of rows to process at a time.
         """
         self.buildQuatArray()
-        print("\rFinding boundaries...", end="")
+        if self.misOrix is not None and self.misOriy is not None:
+            return
 
-        syms = Quat.symEqv(self.crystalSym)
-        numSyms = len(syms)
+        quatComps = self.quatArray.quatComps
 
-        # array to store quat components of initial and symmetric equivalents
-        quatComps = np.empty((numSyms, 4, self.yDim, self.xDim))
-
-        # populate with initial quat components
-        for i, row in enumerate(self.quatArray):
-            for j, quat in enumerate(row):
-                quatComps[0, :, i, j] = quat.quatCoef
-
-        # loop of over symmetries and apply to initial quat components
-        # (excluding first symmetry as this is the identity transformation)
-        for i, sym in enumerate(syms[1:], start=1):
-            # sym[i] * quat for all points (* is quaternion product)
-            quatComps[i, 0] = (quatComps[0, 0] * sym[0] - quatComps[0, 1] * sym[1] -
-                               quatComps[0, 2] * sym[2] - quatComps[0, 3] * sym[3])
-            quatComps[i, 1] = (quatComps[0, 0] * sym[1] + quatComps[0, 1] * sym[0] -
-                               quatComps[0, 2] * sym[3] + quatComps[0, 3] * sym[2])
-            quatComps[i, 2] = (quatComps[0, 0] * sym[2] + quatComps[0, 2] * sym[0] -
-                               quatComps[0, 3] * sym[1] + quatComps[0, 1] * sym[3])
-            quatComps[i, 3] = (quatComps[0, 0] * sym[3] + quatComps[0, 3] * sym[0] -
-                               quatComps[0, 1] * sym[2] + quatComps[0, 2] * sym[1])
-
-            # swap into positve hemisphere if required
-            quatComps[i, :, quatComps[i, 0] < 0] *= -1
+        # Arrays to store neigbour misorientation in positive x and y
+        # direction, 180 deg for the last column/row with no neighbour
+        misOrix = np.full((self.yDim, self.xDim), 180, dtype=np.float32)
+        misOriy = np.full((self.yDim, self.xDim), 180, dtype=np.float32)
 
-        # Arrays to store neigbour misorientation in positive x and y direction
-        misOrix = np.zeros((numSyms, self.yDim, self.xDim))
-        misOriy = np.zeros((numSyms, self.yDim, self.xDim))
+        for start in range(0, self.yDim, chunkSize):
+            stop = min(start + chunkSize, self.yDim)
+            stopy = min(stop, self.yDim - 1)
+            rowQuatComps = quatComps[:, start:stop]
 
-        # loop over symmetries calculating misorientation to initial
-        for i in range(numSyms):
-            for j in range(self.xDim - 1):
-                misOrix[i, :, j] = abs(np.einsum("ij,ij->j", quatComps[0, :, :, j], quatComps[i, :, :, j + 1]))
+            # min misorientation (max here as misorientaion is cos of
+            # this), converted to degrees before reducing precision
+            misOri = Quat.calcDisorientation(rowQuatComps[:, :, :-1], rowQuatComps[:, :, 1:],
+                                             self.crystalSym)
+            misOrix[start:stop, :-1] = 360 * np.arccos(misOri) / np.pi
+            misOri = Quat.calcDisorientation(quatComps[:, start:stopy], quatComps[:, start + 1:stopy + 1],
+                                             self.crystalSym)
+            misOriy[start:stopy] = 360 * np.arccos(misOri) / np.pi
 
-            for j in range(self.yDim - 1):
-                misOriy[i, j, :] = abs(np.einsum("ij,ij->j", quatComps[0, :, j, :], quatComps[i, :, j + 1, :]))
+        self.misOrix = misOrix
+        self.misOriy = misOriy
 
-        misOrix[misOrix > 1] = 1
-        misOriy[misOriy > 1] = 1
+    def findBoundaries(self, boundDef=10):
+        """
+        Find grain boundaries. Neighbour misorientations are only
+        calculated on the first call, so finding boundaries again with
+        a different critical misorientation is fast.
 
-        # find min misorientation (max here as misorientaion is cos of this)
-        misOrix = np.max(misOrix, axis=0)
-        misOriy = np.max(misOriy, axis=0)
+        :param boundDef: critical misorientation
+        :type boundDef: float
+        """
+        print("\rFinding boundaries...", end="")
 
-        # convert to misorientation in degrees
-        misOrix = 360 * np.arccos(misOrix) / np.pi
-        misOriy = 360 * np.arccos(misOriy) / np.pi
+        self.calcNeighbourMisOri()
 
         # set boundary locations where misOrix or misOriy are greater than set value
         self.boundaries = np.zeros((self.yDim, self.xDim), dtype=int)
-
-        for i in range(self.xDim):
-            for j in range(self.yDim):
-                if (misOrix[j, i] > boundDef) or (misOriy[j, i] > boundDef):
-                    self.boundaries[j, i] = -1
+        self.boundaries[(self.misOrix > boundDef) | (self.misOriy > boundDef)] = -1
 
         print("\rDone                                               ", end="")
         return
 
+    def findBoundaryLevels(self, boundDefs=(2, 15)):
+        """
+        Classify boundaries by misorientation in one pass, for example
+        into low and high angle boundaries.
+
+        :param boundDefs: critical misorientations of each level
+        :type boundDefs: list(float)
+        :return: Map of the number of critical misorientations exceeded
+            to the neighbours in x or y at each point. 0 where there is
+            no boundary.
+        """
+        self.calcNeighbourMisOri()
+
+        boundDefs = np.sort(boundDefs)
+        maxMisOri = np.maximum(self.misOrix, self.misOriy)
+
+        return np.searchsorted(boundDefs, maxMisOri, side='left')
+
     def findPhaseBoundaries(self, treatNonIndexedAs=None):
         """Finds boundaries in the phase map
 
@@ -664,41 +881,19 @@ class Map(base.Map):
 
     def findGrains(self, minGrainSize=10):
         """
-        Find grains and assign ids
+        Find grains and assign ids. Boundary points are assigned to
+        the grain on their left or above them.
 
         :param minGrainSize: Minimum grain area in pixels
         """
         print("\rFinding grains...", end="")
 
-        # Initialise the grain map
-        self.grains = np.copy(self.boundaries)
-
-        self.grainList = []
-
-        # List of points where no grain has be set yet
-        unknownPoints = np.where(self.grains == 0)
-        # Start counter for grains
-        grainIndex = 1
-
-        # Loop until all points (except boundaries) have been assigned
-        # to a grain or ignored
-        while unknownPoints[0].shape[0] > 0:
-            # Flood fill first unknown point and return grain object
-            currentGrain = self.floodFill(unknownPoints[1][0], unknownPoints[0][0], grainIndex)
-
-            grainSize = len(currentGrain)
-            if grainSize < minGrainSize:
-                # if grain size less than minimum, ignore grain and set
-                # values in grain map to -2
-                for coord in currentGrain.coordList:
-                    self.grains[coord[1], coord[0]] = -2
-            else:
-                # add grain and size to lists and increment grain label
-                self.grainList.append(currentGrain)
-                grainIndex += 1
+        numGrains = self.labelGrains(minGrainSize=minGrainSize)
 
-            # update unknown points
-            unknownPoints = np.where(self.grains == 0)
+        self.grainQuatComps = self.quatArray.quatComps.reshape((4, -1))[:, self.grainPoints]
+        self.grainMisOris = None
+        self.grainMisOriAxes = None
+        self.grainList = [Grain(i, self) for i in range(numGrains)]
 
         print("\rDone                                               ", end="")
 
@@ -720,56 +915,20 @@ class Map(base.Map):
 
         return plot
 
-    def floodFill(self, x, y, grainIndex):
-        currentGrain = Grain(self)
-
-        currentGrain.addPoint((x, y), self.quatArray[y, x])
-
-        edge = [(x, y)]
-        grain = [(x, y)]
-
-        self.grains[y, x] = grainIndex
-        while edge:
-            newedge = []
-
-            for (x, y) in edge:
-                moves = np.array([(x+1, y), (x-1, y), (x, y+1), (x, y-1)])
-
-                movesIndexShift = 0
-                if x <= 0:
-                    moves = np.delete(moves, 1, 0)
-                    movesIndexShift = 1
-                elif x >= self.xDim - 1:
-                    moves = np.delete(moves, 0, 0)
-                    movesIndexShift = 1
-
-                if y <= 0:
-                    moves = np.delete(moves, 3 - movesIndexShift, 0)
-                elif y >= self.yDim - 1:
-                    moves = np.delete(moves, 2 - movesIndexShift, 0)
-
-                for (s, t) in moves:
-                    if self.grains[t, s] == 0:
-                        currentGrain.addPoint((s, t), self.quatArray[t, s])
-                        newedge.append((s, t))
-                        grain.append((s, t))
-                        self.grains[t, s] = grainIndex
-                    elif self.grains[t, s] == -1 and (s > x or t > y):
-                        currentGrain.addPoint((s, t), self.quatArray[t, s])
-                        grain.append((s, t))
-                        self.grains[t, s] = grainIndex
-
-            if newedge == []:
-                return currentGrain
-            else:
-                edge = newedge
-
     def calcGrainAvOris(self):
+        """
+        Calculate the average orientation of all grains, in one batched
+        calculation using the grain map.
+        """
         # Check that grains have been detected in the map
         self.checkGrainsDetected()
+        self.buildQuatArray()
 
-        for grain in self.grainList:
-            grain.calcAverageOri()
+        avOris = Quat.calcAverageOris(self.quatArray, self.grains,
+                                      self.crystalSym)
+
+        for grain, avOri in zip(self.grainList, avOris):
+            grain.refOri = avOri
 
     def calcGrainMisOri(self, calcAxis=False):
         """
@@ -813,18 +972,14 @@ class Map(base.Map):
         self.misOri = np.ones([self.yDim, self.xDim])
 
         if component in [1, 2, 3]:
-            for grain in self.grainList:
-                for coord, misOriAxis in zip(grain.coordList, np.array(grain.misOriAxisList)):
-                    self.misOri[coord[1], coord[0]] = misOriAxis[component - 1]
+            self.misOri.flat[self.grainPoints] = self.grainMisOriAxes[:, component - 1]
 
             misOri = self.misOri * 180 / np.pi
             cLabel = "Rotation around {:} axis ($^\circ$)".format(
                 ['X', 'Y', 'Z'][component-1]
             )
         else:
-            for grain in self.grainList:
-                for coord, misOri in zip(grain.coordList, grain.misOriList):
-                    self.misOri[coord[1], coord[0]] = misOri
+            self.misOri.flat[self.grainPoints] = self.grainMisOris
 
             misOri = np.arccos(self.misOri) * 360 / np.pi
             cLabel = "Grain reference orienation deviation (GROD) ($^\circ$)"
@@ -935,8 +1090,7 @@ class Map(base.Map):
                 currentSchmidFactor = [max(s) for s in zip(*grain.averageSchmidFactors)]
 
             # Fill grain with colour
-            for coord in grain.coordList:
-                self.averageSchmidFactor[coord[1], coord[0]] = currentSchmidFactor[0]
+            self.averageSchmidFactor.flat[self.grainPoints[grain.pointSlice]] = currentSchmidFactor[0]
 
         self.averageSchmidFactor[self.averageSchmidFactor == 0] = 0.5
 
@@ -947,17 +1101,13 @@ class Map(base.Map):
 
 class Grain(base.Grain):
 
-    def __init__(self, ebsdMap):
+    def __init__(self, grainId, ebsdMap):
         # Call base class constructor
-        super(Grain, self).__init__()
+        super(Grain, self).__init__(grainId, ebsdMap)
 
         self.crystalSym = ebsdMap.crystalSym    # symmetry of material e.g. "cubic", "hexagonal"
         self.slipSystems = ebsdMap.slipSystems
         self.ebsdMap = ebsdMap                  # ebsd map this grain is a member of
-        self.ownerMap = ebsdMap
-        self.quatList = []                      # list of quats
-        self.misOriList = None                  # list of misOri at each point in grain
-        self.misOriAxisList = None              # list of misOri axes at each point in grain
         self.refOri = None                      # (quat) average ori of grain
         self.averageMisOri = None               # average misOri of grain
 
@@ -965,10 +1115,24 @@ class Grain(base.Grain):
         self.slipTraceAngles = None             # list of slip trace angles
         self.slipTraceInclinations = None
 
-    # quat is a quaterion and coord is a tuple (x, y)
-    def addPoint(self, coord, quat):
-        self.coordList.append(coord)
-        self.quatList.append(quat)
+    @property
+    def quatList(self):
+        """QuatArray of the orientation at each point in grain"""
+        return QuatArray(self.ebsdMap.grainQuatComps[:, self.pointSlice])
+
+    @property
+    def misOriList(self):
+        """Array of misOri at each point in grain"""
+        if self.ebsdMap.grainMisOris is None:
+            return None
+        return self.ebsdMap.grainMisOris[self.pointSlice]
+
+    @property
+    def misOriAxisList(self):
+        """Array of misOri axes at each point in grain, shape (n, 3)"""
+        if self.ebsdMap.grainMisOriAxes is None:
+            return None
+        return self.ebsdMap.grainMisOriAxes[self.pointSlice]
 
     def calcAverageOri(self):
         quatCompsSym = Quat.calcSymEqvs(self.quatList, self.crystalSym)
@@ -976,48 +1140,45 @@ class Grain(base.Grain):
         self.refOri = Quat.calcAverageOri(quatCompsSym)
 
     def buildMisOriList(self, calcAxis=False):
-        quatCompsSym = Quat.calcSymEqvs(self.quatList, self.crystalSym)
-
+        quatCompsSym = None
         if self.refOri is None:
+            quatCompsSym = Quat.calcSymEqvs(self.quatList, self.crystalSym)
             self.refOri = Quat.calcAverageOri(quatCompsSym)
 
-        misOriArray, minQuatComps = Quat.calcMisOri(quatCompsSym, self.refOri)
+        if calcAxis:
+            # symmetric equivalents closest to the reference are needed
+            # to calculate the axis
+            if quatCompsSym is None:
+                quatCompsSym = Quat.calcSymEqvs(self.quatList, self.crystalSym)
+            misOriArray, minQuatComps = Quat.calcMisOri(quatCompsSym, self.refOri)
+        else:
+            quatComps = self.quatList.quatComps
+            misOriArray = Quat.calcDisorientation(quatComps, self.refOri.quatCoef,
+                                                  self.crystalSym)
 
         self.averageMisOri = misOriArray.mean()
-        self.misOriList = list(misOriArray)
+
+        # results are stored in the map's arrays of grain point data
+        ebsdMap = self.ebsdMap
+        if ebsdMap.grainMisOris is None:
+            ebsdMap.grainMisOris = np.full(len(ebsdMap.grainPoints), np.nan)
+        ebsdMap.grainMisOris[self.pointSlice] = misOriArray
 
         if calcAxis:
             # Now for axis calulation
             refOriInv = self.refOri.conjugate
 
-            misOriAxis = np.empty((3, minQuatComps.shape[1]))
-            Dq = np.empty((4, minQuatComps.shape[1]))
-
-            # refOriInv * minQuat for all points (* is quaternion product)
-            # change to minQuat * refOriInv
-            Dq[0, :] = (refOriInv[0] * minQuatComps[0, :] - refOriInv[1] * minQuatComps[1, :] -
-                        refOriInv[2] * minQuatComps[2, :] - refOriInv[3] * minQuatComps[3, :])
+            if ebsdMap.grainMisOriAxes is None:
+                ebsdMap.grainMisOriAxes = np.full((len(ebsdMap.grainPoints), 3), np.nan)
+            misOriAxis = ebsdMap.grainMisOriAxes[self.pointSlice].T
 
-            Dq[1, :] = (refOriInv[1] * minQuatComps[0, :] + refOriInv[0] * minQuatComps[1, :] +
-                        refOriInv[3] * minQuatComps[2, :] - refOriInv[2] * minQuatComps[3, :])
-
-            Dq[2, :] = (refOriInv[2] * minQuatComps[0, :] + refOriInv[0] * minQuatComps[2, :] +
-                        refOriInv[1] * minQuatComps[3, :] - refOriInv[3] * minQuatComps[1, :])
-
-            Dq[3, :] = (refOriInv[3] * minQuatComps[0, :] + refOriInv[0] * minQuatComps[3, :] +
-                        refOriInv[2] * minQuatComps[1, :] - refOriInv[1] * minQuatComps[2, :])
-
-            Dq[:, Dq[0] < 0] = -Dq[:, Dq[0] < 0]
+            # minQuat * refOriInv for all points (* is quaternion product)
+            Dq = Quat.calcProducts(refOriInv.quatCoef, minQuatComps,
+                                   opOnLeft=False)
 
             # numpy broadcasting taking care of different array sizes
             misOriAxis[:, :] = (2 * Dq[1:4, :] * np.arccos(Dq[0, :])) / np.sqrt(1 - np.power(Dq[0, :], 2))
 
-            # hack it back into a list. Need to change self.*List to be arrays, it was a bad decision to
-            # make them lists in the beginning
-            self.misOriAxisList = []
-            for row in misOriAxis.transpose():
-                self.misOriAxisList.append(row)
-
     def plotRefOri(self, direction=np.array([0, 0, 1]), **kwargs):
         plotParams = {'marker': '+'}
         plotParams.update(kwargs)
@@ -1049,13 +1210,13 @@ class Grain(base.Grain):
             plotParams['cLabel'] = "Rotation around {:} ($^\circ$)".format(
                 ['X', 'Y', 'Z'][component-1]
             )
-            plotData = np.array(self.misOriAxisList)[:, component-1]
+            plotData = self.misOriAxisList[:, component-1]
 
         else:
             raise ValueError("Component must between 0 and 3")
         plotParams.update(kwargs)
 
-        plotData *= 180 / np.pi
+        plotData = plotData * 180 / np.pi
         plot = self.plotGrainData(grainData=plotData, **plotParams)
 
         return plot
@@ -16,6 +16,301 @@
 import numpy as np
 import pandas as pd
 import pathlib
+import os
+import io
+import json
+import warnings
+import scipy.io
+from concurrent.futures import ThreadPoolExecutor
+
+# Increment when the output of any loader changes to invalidate caches
+CACHE_VERSION = 3
+
+# record of each point in an Oxford .crc file
+CRC_DATA_FORMAT = np.dtype([
+    ('Phase', 'b'),
+    ('Eulers', [('ph1', 'f'), ('phi', 'f'), ('ph2', 'f')]),
+    ('MAD', 'f'),
+    ('BC', 'uint8'),
+    ('IB3', 'uint8'),
+    ('IB4', 'uint8'),
+    ('IB5', 'uint8'),
+    ('IB6', 'f')
+])
+
+
+class DataCache(object):
+    """Binary sidecar cache of data parsed from a text file.
+
+    The loaded metadata is stored as JSON and each data array as a
+    .npy file in a directory next to the source file. Entries are
+    keyed on the source path, size and modification time and the
+    loader used, and are ignored if any of these change.
+
+    Parameters
+    ----------
+    sourcePath : pathlib.Path
+        Path of the file being cached.
+    loaderName : str
+        Name of the loader that parsed the file.
+    """
+
+    def __init__(self, sourcePath, loaderName):
+        self.sourcePath = pathlib.Path(sourcePath)
+        self.cacheDir = self.sourcePath.with_name(
+            self.sourcePath.name + ".defdapcache"
+        )
+        self.loaderName = loaderName
+
+    @property
+    def key(self):
+        fileStat = self.sourcePath.stat()
+        return {
+            'path': str(self.sourcePath.resolve()),
+            'size': fileStat.st_size,
+            'mtime': fileStat.st_mtime_ns,
+            'loader': self.loaderName,
+            'version': CACHE_VERSION
+        }
+
+    def load(self):
+        """Load cached data if a valid entry exists.
+
+        Returns
+        -------
+        dict, dict or None
+            Cached metadata and data, with arrays memory-mapped from
+            the cache files. None if no valid entry exists.
+        """
+        indexPath = self.cacheDir / "index.json"
+        if not indexPath.is_file():
+            return None
+
+        try:
+            with open(str(indexPath), 'r') as indexFile:
+                index = json.load(indexFile)
+        except ValueError:
+            return None
+        if index.get('key') != self.key:
+            return None
+
+        # copy on write so edits to the arrays do not change the cache
+        loadedData = {}
+        for name in index['arrays']:
+            loadedData[name] = np.load(
+                str(self.cacheDir / "{}.npy".format(name)), mmap_mode='c'
+            )
+
+        # JSON stores tuples as lists
+        loadedMetadata = index['metadata']
+        if 'offset' in loadedMetadata:
+            loadedMetadata['offset'] = tuple(loadedMetadata['offset'])
+
+        return loadedMetadata, loadedData
+
+    def save(self, loadedMetadata, loadedData):
+        """Write metadata and data arrays to the cache, replacing any
+        existing entry.
+
+        Parameters
+        ----------
+        loadedMetadata : dict
+            Metadata, must be JSON serialisable.
+        loadedData : dict
+            Data arrays, None values are not stored.
+
+        Returns
+        -------
+        bool
+            True if the entry was written. Caching is skipped with a
+            warning if the cache can not be written, e.g. for a read
+            only data directory.
+        """
+        try:
+            self.writeEntry(loadedMetadata, loadedData)
+        except OSError as error:
+            warnings.warn("Could not write cache to {}: {}".format(
+                self.cacheDir, error
+            ))
+            return False
+
+        return True
+
+    def writeEntry(self, loadedMetadata, loadedData):
+        """Write the cache entry, raising OSError on failure."""
+        self.cacheDir.mkdir(exist_ok=True)
+        indexPath = self.cacheDir / "index.json"
+        # remove the index first so a partly written entry is not used
+        if indexPath.is_file():
+            indexPath.unlink()
+
+        arrayNames = []
+        for name, array in loadedData.items():
+            if array is None:
+                continue
+            np.save(str(self.cacheDir / "{}.npy".format(name)),
+                    np.ascontiguousarray(array))
+            arrayNames.append(name)
+
+        index = {
+            'key': self.key,
+            'metadata': loadedMetadata,
+            'arrays': arrayNames
+        }
+        with open(str(indexPath), 'w') as indexFile:
+            json.dump(index, indexFile)
+
+
+def parseTextChunks(filePath, numHeaderLines, columns, delimiter='\t',
+                    chunkSize=2**22, numThreads=None, skipRows=0,
+                    maxRows=None, rowLength=None, colRange=None):
+    """Parse the delimited numerical data section of a text file in
+    blocks of lines on a thread pool.
+
+    Parameters
+    ----------
+    filePath : pathlib.Path
+        Path of file to read.
+    numHeaderLines : int
+        Number of lines to skip before the data.
+    columns : list((int, numpy.ndarray))
+        Pairs of a column index and a 1D array to store that
+        column's values in.
+    delimiter : str, optional
+        Delimiter between values in a line.
+    chunkSize : int, optional
+        Approximate size in bytes of each block of lines.
+    numThreads : int, optional
+        Number of worker threads, defaults to the number of CPUs.
+    skipRows : int, optional
+        Number of lines of data to skip, without parsing, before
+        reading.
+    maxRows : int, optional
+        Maximum number of lines of data to read.
+    rowLength : int, optional
+        Number of lines in each row of the map. Required if
+        `colRange` is given.
+    colRange : tuple(int), optional
+        Range (start, stop) of positions in each map row to keep.
+        Values outside this range are parsed but not stored.
+
+    Returns
+    -------
+    int
+        Number of lines of data read.
+    """
+    if numThreads is None:
+        numThreads = os.cpu_count() or 1
+    colIdxs = sorted(set(colIdx for colIdx, _ in columns))
+    if colRange is not None and tuple(colRange) == (0, rowLength):
+        colRange = None
+
+    def parseChunk(chunk, startRow, numRows):
+        values = pd.read_csv(
+            io.BytesIO(chunk), sep=delimiter, header=None,
+            usecols=colIdxs, engine='c'
+        )
+        if len(values) != numRows:
+            raise ValueError("Error parsing data lines {} to {}.".format(
+                skipRows + startRow + 1, skipRows + startRow + numRows
+            ))
+
+        if colRange is None:
+            outIdxs = slice(startRow, startRow + numRows)
+            keep = slice(None)
+        else:
+            # position of each line in the map and in the output
+            rowIdxs = np.arange(startRow, startRow + numRows)
+            xs = rowIdxs % rowLength
+            keep = (xs >= colRange[0]) & (xs < colRange[1])
+            outIdxs = ((rowIdxs[keep] // rowLength) * (colRange[1] - colRange[0]) +
+                       xs[keep] - colRange[0])
+
+        for colIdx, outArray in columns:
+            outArray[outIdxs] = values[colIdx].values[keep]
+
+    def lineEnd(data, numLines):
+        # index after the end of the given number of lines
+        idx = 0
+        for _ in range(numLines):
+            idx = data.index(b'\n', idx) + 1
+        return idx
+
+    numRows = 0
+    pending = []
+    with open(str(filePath), 'rb') as textFile, \
+            ThreadPoolExecutor(max_workers=numThreads) as executor:
+        for _ in range(numHeaderLines):
+            textFile.readline()
+
+        data = textFile.read(chunkSize)
+
+        # skip lines by counting line breaks in blocks
+        linesToSkip = skipRows
+        while linesToSkip > 0 and data:
+            numBreaks = data.count(b'\n')
+            if numBreaks < linesToSkip:
+                linesToSkip -= numBreaks
+                data = data[data.rfind(b'\n') + 1:] + textFile.read(chunkSize)
+            else:
+                data = data[lineEnd(data, linesToSkip):]
+                linesToSkip = 0
+
+        while data:
+            nextData = textFile.read(chunkSize)
+            if nextData:
+                # only pass complete lines to the workers
+                splitIdx = data.rfind(b'\n') + 1
+                chunk, data = data[:splitIdx], data[splitIdx:] + nextData
+            else:
+                # last chunk, remove any trailing blank lines
+                chunk, data = data.rstrip() + b'\n', b''
+
+            chunkRows = chunk.count(b'\n')
+            if chunkRows == 0 or chunk == b'\n':
+                continue
+            if maxRows is not None and numRows + chunkRows >= maxRows:
+                # only keep lines up to the maximum and stop reading
+                chunkRows = maxRows - numRows
+                chunk, data = chunk[:lineEnd(chunk, chunkRows)], b''
+                if chunkRows == 0:
+                    break
+
+            pending.append(executor.submit(parseChunk, chunk, numRows, chunkRows))
+            numRows += chunkRows
+
+            # limit the number of chunks held in memory
+            if len(pending) >= 2 * numThreads:
+                pending.pop(0).result()
+
+        for future in pending:
+            future.result()
+
+    return numRows
+
+
+def checkRoi(roi, xDim, yDim):
+    """Check a region of interest lies within a map.
+
+    Parameters
+    ----------
+    roi : tuple(int)
+        Region of interest (xMin, xMax, yMin, yMax) in pixels. The
+        max values are exclusive.
+    xDim, yDim : int
+        Size of the full map.
+
+    Returns
+    -------
+    tuple(int)
+        Validated region of interest.
+    """
+    xMin, xMax, yMin, yMax = (int(val) for val in roi)
+    if not (0 <= xMin < xMax <= xDim and 0 <= yMin < yMax <= yDim):
+        raise ValueError("Region of interest {} is not within the map "
+                         "({} x {}).".format(roi, xDim, yDim))
+
+    return xMin, xMax, yMin, yMax
 
 
 class EBSDDataLoader(object):
@@ -26,18 +321,24 @@ class EBSDDataLoader(object):
             'yDim': 0,
             'stepSize': 0.,
             'numPhases': 0,
-            'phaseNames': []
+            'phaseNames': [],
+            'offset': (0, 0)
         }
         self.loadedData = {
             'eulerAngle': None,
             'bandContrast': None,
-            'phase': None
+            'phase': None,
+            'meanAngularDeviation': None
         }
 
     def checkMetadata(self):
         if len(self.loadedMetadata['phaseNames']) != self.loadedMetadata['numPhases']:
             print("Number of phases mismatch.")
             raise AssertionError
+        for key in ['xDim', 'yDim']:
+            if self.loadedMetadata[key] == 0:
+                raise ValueError("Metadata '{}' not found in file "
+                                 "header.".format(key))
 
     def checkData(self, binData):
         return
@@ -72,49 +373,151 @@ class EBSDDataLoader(object):
 
         return self.loadedMetadata
 
-    def loadOxfordCRC(self, fileName, fileDir=""):
-        """Read binary EBSD data from a .crc file"""
+    def loadOxfordCRC(self, fileName, fileDir="", memoryMap=False,
+                      roi=None):
+        """Read binary EBSD data from a .crc file
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file excluding extension.
+        fileDir : str, optional
+            Directory containing the file.
+        memoryMap : bool, optional
+            If True the file is memory-mapped instead of read into
+            memory. The returned arrays are then strided views onto
+            the file (Euler angles as float32), which are only read
+            from disk when accessed. Use `np.array` on a view to get
+            a contiguous in-memory copy. Changes made to the views
+            are not written back to the file.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) to load, in
+            pixels with max values exclusive. Only the rows of the
+            file covering the region are read. The map dimensions in
+            the metadata are updated to the size of the region and its
+            position is stored as the 'offset' (x, y).
+
+        Returns
+        -------
+        dict
+            Loaded data.
+        """
         xDim = self.loadedMetadata['xDim']
         yDim = self.loadedMetadata['yDim']
+        if roi is None:
+            roi = (0, xDim, 0, yDim)
+        xMin, xMax, yMin, yMax = checkRoi(roi, xDim, yDim)
 
         fileName = "{}.crc".format(fileName)
         filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
         if not filePath.is_file():
             raise FileNotFoundError("Cannot open file {}".format(filePath))
 
-        dataFormat = np.dtype([
-            ('Phase', 'b'),
-            ('Eulers', [('ph1', 'f'), ('phi', 'f'), ('ph2', 'f')]),
-            ('MAD', 'f'),
-            ('BC', 'uint8'),
-            ('IB3', 'uint8'),
-            ('IB4', 'uint8'),
-            ('IB5', 'uint8'),
-            ('IB6', 'f')
-        ])
-        binData = np.fromfile(str(filePath), dataFormat, count=-1)
+        dataFormat = CRC_DATA_FORMAT
+        # records are fixed size so seek straight to the first row
+        offset = yMin * xDim * dataFormat.itemsize
+        count = (yMax - yMin) * xDim
+        if memoryMap:
+            # copy on write so edits to the map do not modify the file
+            binData = np.memmap(str(filePath), dtype=dataFormat, mode='c',
+                                offset=offset, shape=(count,))
+        else:
+            with open(str(filePath), 'rb') as crcFile:
+                crcFile.seek(offset)
+                binData = np.fromfile(crcFile, dataFormat, count=count)
+            if binData.size != count:
+                raise ValueError("Not enough data in file {}".format(filePath))
 
         self.checkData(binData)
 
-        self.loadedData['bandContrast'] = np.reshape(
-            binData['BC'], (yDim, xDim)
-        )
-        self.loadedData['phase'] = np.reshape(
-            binData['Phase'], (yDim, xDim)
-        )
-        eulerAngles = np.reshape(
-            binData['Eulers'], (yDim, xDim)
+        binData = np.reshape(binData, (yMax - yMin, xDim))[:, xMin:xMax]
+        self.loadedMetadata['xDim'] = xMax - xMin
+        self.loadedMetadata['yDim'] = yMax - yMin
+        self.loadedMetadata['offset'] = (xMin, yMin)
+
+        self.loadedData['bandContrast'] = binData['BC']
+        self.loadedData['phase'] = binData['Phase']
+        self.loadedData['meanAngularDeviation'] = binData['MAD']
+        self.loadedData['eulerAngle'] = self.structuredEulers(
+            binData['Eulers'], binData.shape, copy=not memoryMap
         )
-        # flatten the structures so that the Euler angles are stored
-        # into a normal array
-        eulerAngles = np.array(eulerAngles.tolist()).transpose((2, 0, 1))
-        self.loadedData['eulerAngle'] = eulerAngles
 
         return self.loadedData
 
-    def loadOxfordCTF(self, fileName, fileDir=""):
+    @staticmethod
+    def structuredEulers(eulerData, shape, copy=True):
+        """Convert structured Euler angle data, with fields ph1, phi
+        and ph2, to an array of shape (3, ...) without going through
+        Python objects.
+
+        Parameters
+        ----------
+        eulerData : numpy.ndarray
+            Structured array of Euler angles.
+        shape : tuple
+            Shape of the map (yDim, xDim).
+        copy : bool, optional
+            If True return a contiguous float64 array, otherwise a
+            strided float32 view onto the input data.
+
+        Returns
+        -------
+        numpy.ndarray
+            Euler angles, shape (3, yDim, xDim).
+        """
+        fieldNames = eulerData.dtype.names
+        if copy:
+            eulerAngles = np.empty((3,) + tuple(shape), dtype=float)
+            for i, fieldName in enumerate(fieldNames):
+                eulerAngles[i] = np.reshape(eulerData[fieldName], shape)
+        else:
+            # fields are adjacent float32 values in each record so the
+            # Euler component is the first (slowest varying) axis
+            ph1 = np.reshape(eulerData[fieldNames[0]], shape)
+            eulerAngles = np.lib.stride_tricks.as_strided(
+                ph1, shape=(3,) + ph1.shape,
+                strides=(ph1.itemsize,) + ph1.strides,
+                writeable=False
+            )
+
+        return eulerAngles
+
+    def loadOxfordCTF(self, fileName, fileDir="", chunkSize=2**22,
+                      numThreads=None, useCache=False, roi=None,
+                      metadataOnly=False):
         """ A .ctf file is a HKL single orientation file. This is a
-        data file generated by the Oxford EBSD instrument."""
+        data file generated by the Oxford EBSD instrument.
+
+        The data section is read in blocks of `chunkSize` bytes which
+        are parsed on a pool of threads directly into preallocated
+        arrays, so peak memory is set by the chunk size and not the
+        size of the file.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file excluding extension.
+        fileDir : str, optional
+            Directory containing the file.
+        chunkSize : int, optional
+            Size in bytes of each block of the data section to parse.
+        numThreads : int, optional
+            Number of worker threads, defaults to the number of CPUs.
+        useCache : bool, optional
+            Load from a binary sidecar cache of the file if a valid
+            one exists, otherwise parse the file and create one.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) to load, in
+            pixels with max values exclusive. Lines before the region
+            are skipped without parsing and reading stops after it.
+        metadataOnly : bool, optional
+            Only read the header of the file.
+
+        Returns
+        -------
+        dict, dict
+            Loaded metadata and data.
+        """
 
         # open data file and read in metadata
         fileName = "{}.ctf".format(fileName)
@@ -122,8 +525,20 @@ class EBSDDataLoader(object):
         if not filePath.is_file():
             raise FileNotFoundError("Cannot open file {}".format(filePath))
 
+        if useCache and not metadataOnly:
+            cacheName = "OxfordCTF"
+            if roi is not None:
+                cacheName += "_" + "_".join(str(int(val)) for val in roi)
+            cache = DataCache(filePath, cacheName)
+            cached = cache.load()
+            if cached is not None:
+                self.loadedMetadata.update(cached[0])
+                self.loadedData.update(cached[1])
+                return self.loadedMetadata, self.loadedData
+
         ctfFile = open(str(filePath), 'r')
 
+        self.loadedMetadata['phaseNames'] = []
         for i, line in enumerate(ctfFile):
             if 'XCells' in line:
                 xDim = int(line.split()[-1])
@@ -140,6 +555,8 @@ class EBSDDataLoader(object):
                     self.loadedMetadata['phaseNames'].append(
                         next(ctfFile).split()[2]
                     )
+                # names of the data columns follow the phases
+                columnNames = next(ctfFile).split()
                 numHeaderLines = i + j + 3
                 # phases are last in the header so break out the loop
                 break
@@ -147,34 +564,317 @@ class EBSDDataLoader(object):
         ctfFile.close()
 
         self.checkMetadata()
+        if metadataOnly:
+            return self.loadedMetadata, self.loadedData
+
+        if roi is None:
+            roi = (0, xDim, 0, yDim)
+        xMin, xMax, yMin, yMax = checkRoi(roi, xDim, yDim)
+        shape = (yMax - yMin, xMax - xMin)
 
         # now read the data from file
-        dataFormat = np.dtype([
-            ('Phase', 'b'),
-            ('Eulers', [('ph1', 'f'), ('phi', 'f'), ('ph2', 'f')]),
-            ('MAD', 'f'),
-            ('BC', 'uint8')
-        ])
-        binData = np.loadtxt(
-            str(filePath), dataFormat, delimiter='\t',
-            skiprows=numHeaderLines, usecols=(0, 5, 6, 7, 8, 9)
-        )
+        self.loadedData['phase'] = np.empty(shape, dtype='b')
+        self.loadedData['bandContrast'] = np.empty(shape, dtype='uint8')
+        self.loadedData['meanAngularDeviation'] = np.empty(shape, dtype='f')
+        self.loadedData['eulerAngle'] = np.empty((3,) + shape, dtype=float)
 
-        self.checkData(binData)
+        # flat views of the output arrays to fill with each column
+        columns = [
+            (columnNames.index('Phase'), self.loadedData['phase'].reshape(-1)),
+            (columnNames.index('Euler1'), self.loadedData['eulerAngle'][0].reshape(-1)),
+            (columnNames.index('Euler2'), self.loadedData['eulerAngle'][1].reshape(-1)),
+            (columnNames.index('Euler3'), self.loadedData['eulerAngle'][2].reshape(-1)),
+            (columnNames.index('MAD'), self.loadedData['meanAngularDeviation'].reshape(-1)),
+            (columnNames.index('BC'), self.loadedData['bandContrast'].reshape(-1)),
+        ]
 
-        self.loadedData['bandContrast'] = np.reshape(
-            binData['BC'], (yDim, xDim)
+        # whole rows of the map are read, columns outside the region
+        # are dropped
+        numRows = parseTextChunks(
+            filePath, numHeaderLines, columns,
+            chunkSize=chunkSize, numThreads=numThreads,
+            skipRows=yMin * xDim, maxRows=shape[0] * xDim,
+            rowLength=xDim, colRange=(xMin, xMax)
         )
-        self.loadedData['phase'] = np.reshape(
-            binData['Phase'], (yDim, xDim)
-        )
-        eulerAngles = np.reshape(
-            binData['Eulers'], (yDim, xDim)
+        if numRows != shape[0] * xDim:
+            raise ValueError("Number of data points does not match "
+                             "dimensions in header.")
+
+        self.loadedMetadata['xDim'] = shape[1]
+        self.loadedMetadata['yDim'] = shape[0]
+        self.loadedMetadata['offset'] = (xMin, yMin)
+
+        self.loadedData['eulerAngle'] *= np.pi / 180.
+
+        if useCache:
+            cache.save(self.loadedMetadata, self.loadedData)
+
+        return self.loadedMetadata, self.loadedData
+
+    def loadEdaxAng(self, fileName, fileDir="", chunkSize=2**22,
+                    numThreads=None, roi=None, metadataOnly=False):
+        """ An .ang file is a text data file generated by the EDAX
+        (TSL OIM) EBSD instrument. Only square grids are supported.
+
+        The data section is parsed in blocks of `chunkSize` bytes on a
+        pool of threads directly into preallocated arrays. The image
+        quality is loaded as the band contrast. Points with a negative
+        confidence index are given phase 0 (non-indexed) and, for
+        single phase files, phase ID 0 is taken to be the first phase.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file excluding extension.
+        fileDir : str, optional
+            Directory containing the file.
+        chunkSize : int, optional
+            Size in bytes of each block of the data section to parse.
+        numThreads : int, optional
+            Number of worker threads, defaults to the number of CPUs.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) to load, in
+            pixels with max values exclusive.
+        metadataOnly : bool, optional
+            Only read the header of the file.
+
+        Returns
+        -------
+        dict, dict
+            Loaded metadata and data.
+        """
+        fileName = "{}.ang".format(fileName)
+        filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
+        if not filePath.is_file():
+            raise FileNotFoundError("Cannot open file {}".format(filePath))
+
+        numHeaderLines = 0
+        self.loadedMetadata['phaseNames'] = []
+        with open(str(filePath), 'r') as angFile:
+            for line in angFile:
+                if not line.startswith('#'):
+                    break
+                numHeaderLines += 1
+
+                lineSplit = line.strip('# \t\n').split()
+                if len(lineSplit) < 2:
+                    continue
+                key = lineSplit[0].rstrip(':')
+                if key == 'MaterialName':
+                    self.loadedMetadata['phaseNames'].append(lineSplit[1])
+                elif key == 'GRID' and lineSplit[1] != 'SqrGrid':
+                    raise ValueError("Only square grid .ang files are "
+                                     "supported.")
+                elif key == 'XSTEP':
+                    self.loadedMetadata['stepSize'] = float(lineSplit[1])
+                elif key == 'NCOLS_ODD':
+                    self.loadedMetadata['xDim'] = int(lineSplit[1])
+                elif key == 'NROWS':
+                    self.loadedMetadata['yDim'] = int(lineSplit[1])
+
+        numPhases = len(self.loadedMetadata['phaseNames'])
+        self.loadedMetadata['numPhases'] = numPhases
+
+        self.checkMetadata()
+        if metadataOnly:
+            return self.loadedMetadata, self.loadedData
+
+        xDim = self.loadedMetadata['xDim']
+        yDim = self.loadedMetadata['yDim']
+
+        if roi is None:
+            roi = (0, xDim, 0, yDim)
+        xMin, xMax, yMin, yMax = checkRoi(roi, xDim, yDim)
+        shape = (yMax - yMin, xMax - xMin)
+
+        self.loadedData['phase'] = np.empty(shape, dtype='b')
+        self.loadedData['bandContrast'] = np.empty(shape, dtype='f')
+        self.loadedData['eulerAngle'] = np.empty((3,) + shape, dtype=float)
+        confidenceIndex = np.empty(shape, dtype='f')
+
+        # columns are phi1, PHI, phi2, x, y, IQ, CI, phase, ...
+        columns = [
+            (0, self.loadedData['eulerAngle'][0].reshape(-1)),
+            (1, self.loadedData['eulerAngle'][1].reshape(-1)),
+            (2, self.loadedData['eulerAngle'][2].reshape(-1)),
+            (5, self.loadedData['bandContrast'].reshape(-1)),
+            (6, confidenceIndex.reshape(-1)),
+            (7, self.loadedData['phase'].reshape(-1)),
+        ]
+
+        numRows = parseTextChunks(
+            filePath, numHeaderLines, columns, delimiter=r'\s+',
+            chunkSize=chunkSize, numThreads=numThreads,
+            skipRows=yMin * xDim, maxRows=shape[0] * xDim,
+            rowLength=xDim, colRange=(xMin, xMax)
         )
-        # flatten the structures the Euler angles are stored into a
-        # normal array
-        eulerAngles = np.array(eulerAngles.tolist()).transpose((2, 0, 1))
-        self.loadedData['eulerAngle'] = eulerAngles * np.pi / 180.
+        if numRows != shape[0] * xDim:
+            raise ValueError("Number of data points does not match "
+                             "dimensions in header.")
+
+        if numPhases == 1:
+            self.loadedData['phase'][self.loadedData['phase'] == 0] = 1
+        self.loadedData['phase'][confidenceIndex < 0] = 0
+
+        self.loadedMetadata['xDim'] = shape[1]
+        self.loadedMetadata['yDim'] = shape[0]
+        self.loadedMetadata['offset'] = (xMin, yMin)
+
+        return self.loadedMetadata, self.loadedData
+
+    def loadHDF5(self, fileName, fileDir="", scanName=None,
+                 chunkSize=2**20, roi=None, metadataOnly=False):
+        """Load EBSD data from a HDF5 file, either an Oxford h5oina
+        file or a h5ebsd file as written by EDAX OIM. Requires h5py.
+
+        Datasets are read in blocks of whole map rows into
+        preallocated arrays, so memory use is bounded by the size of
+        the loaded data and not by the intermediate reads.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file, the extension can be omitted for files ending
+            .h5oina, .h5 or .hdf5.
+        fileDir : str, optional
+            Directory containing the file.
+        scanName : str, optional
+            Name of the group containing the scan to load, defaults to
+            the first group in the file containing EBSD data.
+        chunkSize : int, optional
+            Approximate number of points to read at a time.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) to load, in
+            pixels with max values exclusive.
+        metadataOnly : bool, optional
+            Only read the header of the file.
+
+        Returns
+        -------
+        dict, dict
+            Loaded metadata and data.
+        """
+        try:
+            import h5py
+        except ImportError:
+            raise ImportError("h5py is required to load HDF5 EBSD files.")
+
+        filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
+        for ext in ['', '.h5oina', '.h5', '.hdf5']:
+            testPath = filePath.parent / (filePath.name + ext)
+            if testPath.is_file():
+                filePath = testPath
+                break
+        else:
+            raise FileNotFoundError("Cannot open file {}".format(filePath))
+
+        def headerValue(header, name):
+            value = np.array(header[name]).ravel()[0]
+            if isinstance(value, bytes):
+                value = value.decode()
+            return value
+
+        with h5py.File(str(filePath), 'r') as h5File:
+            if scanName is None:
+                for scanName, group in h5File.items():
+                    if isinstance(group, h5py.Group) and 'EBSD' in group:
+                        break
+                else:
+                    raise ValueError("No EBSD data found in {}".format(
+                        filePath))
+            header = h5File[scanName]['EBSD']['Header']
+            dataGroup = h5File[scanName]['EBSD']['Data']
+
+            if 'Euler' in dataGroup:
+                # h5oina, Euler angles in radians
+                xDim = int(headerValue(header, 'X Cells'))
+                yDim = int(headerValue(header, 'Y Cells'))
+                stepSize = float(headerValue(header, 'X Step'))
+                phaseNames = [
+                    headerValue(header['Phases'][key], 'Phase Name')
+                    for key in sorted(header['Phases'], key=int)
+                ]
+                fields = [
+                    ('eulerAngle', dataGroup['Euler']),
+                    ('phase', dataGroup['Phase']),
+                    ('bandContrast', dataGroup['Band Contrast']),
+                ]
+                if 'Mean Angular Deviation' in dataGroup:
+                    fields.append(('meanAngularDeviation',
+                                   dataGroup['Mean Angular Deviation']))
+            else:
+                # h5ebsd, Euler angles in radians and image quality
+                # loaded as band contrast
+                xDim = int(headerValue(header, 'nColumns'))
+                yDim = int(headerValue(header, 'nRows'))
+                stepSize = float(headerValue(header, 'Step X'))
+                phaseNames = [
+                    headerValue(header['Phase'][key], 'MaterialName')
+                    for key in sorted(header['Phase'], key=int)
+                ]
+                fields = [
+                    ('eulerAngle', [dataGroup['phi1'], dataGroup['Phi'],
+                                    dataGroup['phi2']]),
+                    ('phase', dataGroup['Phase']),
+                    ('bandContrast', dataGroup['IQ']),
+                    ('confidenceIndex', dataGroup['CI']),
+                ]
+
+            self.loadedMetadata['stepSize'] = stepSize
+            self.loadedMetadata['phaseNames'] = phaseNames
+            self.loadedMetadata['numPhases'] = len(phaseNames)
+            self.loadedMetadata['xDim'] = xDim
+            self.loadedMetadata['yDim'] = yDim
+
+            self.checkMetadata()
+            if metadataOnly:
+                return self.loadedMetadata, self.loadedData
+
+            if roi is None:
+                roi = (0, xDim, 0, yDim)
+            xMin, xMax, yMin, yMax = checkRoi(roi, xDim, yDim)
+            shape = (yMax - yMin, xMax - xMin)
+
+            loadedData = {}
+            for key, dataset in fields:
+                if key == 'eulerAngle':
+                    loadedData[key] = np.empty((3,) + shape, dtype=float)
+                else:
+                    loadedData[key] = np.empty(shape, dtype=dataset.dtype)
+
+            # read blocks of whole rows of the map
+            rowsPerRead = max(chunkSize // xDim, 1)
+            for rowStart in range(yMin, yMax, rowsPerRead):
+                rowEnd = min(rowStart + rowsPerRead, yMax)
+                pointSlice = slice(rowStart * xDim, rowEnd * xDim)
+                outSlice = slice(rowStart - yMin, rowEnd - yMin)
+                blockShape = (rowEnd - rowStart, xDim)
+
+                for key, dataset in fields:
+                    if key != 'eulerAngle':
+                        block = dataset[pointSlice].reshape(blockShape)
+                        loadedData[key][outSlice] = block[:, xMin:xMax]
+                    elif isinstance(dataset, list):
+                        for i, component in enumerate(dataset):
+                            block = component[pointSlice].reshape(blockShape)
+                            loadedData[key][i, outSlice] = block[:, xMin:xMax]
+                    else:
+                        block = dataset[pointSlice].reshape(blockShape + (3,))
+                        loadedData[key][:, outSlice] = np.moveaxis(
+                            block[:, xMin:xMax], -1, 0
+                        )
+
+        if 'confidenceIndex' in loadedData:
+            # same phase convention as for .ang files
+            confidenceIndex = loadedData.pop('confidenceIndex')
+            if len(phaseNames) == 1:
+                loadedData['phase'][loadedData['phase'] == 0] = 1
+            loadedData['phase'][confidenceIndex < 0] = 0
+        self.loadedData.update(loadedData)
+
+        self.loadedMetadata['xDim'] = shape[1]
+        self.loadedMetadata['yDim'] = shape[0]
+        self.loadedMetadata['offset'] = (xMin, yMin)
 
         return self.loadedMetadata, self.loadedData
 
@@ -187,7 +887,8 @@ class DICDataLoader(object):
             'version': "",
             'binning': "",
             'xDim': 0,
-            'yDim': 0
+            'yDim': 0,
+            'offset': (0, 0)
         }
         self.loadedData = {
             'xc': None,
@@ -200,20 +901,22 @@ class DICDataLoader(object):
         return
 
     def checkData(self):
-        # Calculate size of map from loaded data and check it matches
-        # values from metadata
-        coords = self.loadedData['xc']
-        xdim = int(
-            (coords.max() - coords.min()) / min(abs(np.diff(coords))) + 1
-        )
+        # Check the loaded data has the dimensions given in the header
+        # and that the coordinates form a regular grid of that size
+        shape = (self.loadedMetadata['yDim'], self.loadedMetadata['xDim'])
+        for key in ['xc', 'yc', 'xd', 'yd']:
+            assert self.loadedData[key].shape == shape, "Dimensions of data and header do not match"
 
-        coords = self.loadedData['yc']
-        ydim = int(
-            (coords.max() - coords.min()) / max(abs(np.diff(coords))) + 1
-        )
-
-        assert xdim == self.loadedMetadata['xDim'], "Dimensions of data and header do not match"
-        assert ydim == self.loadedMetadata['yDim'], "Dimensions of data and header do not match"
+        xc = self.loadedData['xc']
+        yc = self.loadedData['yc']
+        if shape[1] > 1:
+            xStep = xc[0, 1] - xc[0, 0]
+            assert np.isclose(xc[-1, -1] - xc[-1, 0], (shape[1] - 1) * xStep), \
+                "Coordinates of data do not match dimensions in header"
+        if shape[0] > 1:
+            yStep = yc[1, 0] - yc[0, 0]
+            assert np.isclose(yc[-1, -1] - yc[0, -1], (shape[0] - 1) * yStep), \
+                "Coordinates of data do not match dimensions in header"
 
     def loadDavisMetadata(self, fileName, fileDir=""):
         # Load metadata
@@ -238,19 +941,164 @@ class DICDataLoader(object):
 
         return self.loadedMetadata
 
-    def loadDavisData(self, fileName, fileDir=""):
+    def loadDavisData(self, fileName, fileDir="", useCache=False,
+                      dtype=float, chunkSize=2**22, numThreads=None,
+                      roi=None):
+        """Load displacement data from a DaVis text file. The data is
+        parsed directly into arrays of the map dimensions given in the
+        header, so the metadata must be loaded first.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file including extension.
+        fileDir : str, optional
+            Directory containing the file.
+        useCache : bool, optional
+            Load from a binary sidecar cache of the file if a valid
+            one exists, otherwise parse the file and create one.
+        dtype : numpy.dtype, optional
+            Data type of the loaded arrays, use float32 to halve the
+            memory required.
+        chunkSize : int, optional
+            Size in bytes of each block of the file to parse.
+        numThreads : int, optional
+            Number of worker threads, defaults to the number of CPUs.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) to load, in
+            pixels with max values exclusive. The map dimensions in the
+            metadata are updated to the size of the region and its
+            position is stored as the 'offset' (x, y).
+
+        Returns
+        -------
+        dict
+            Loaded data. Each array has shape (yDim, xDim).
+        """
         filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
         if not filePath.is_file():
             raise FileNotFoundError("Cannot open file {}".format(filePath))
 
-        data = pd.read_table(str(filePath), delimiter='\t', skiprows=1, header=None)
-        # x and y coordinates
-        self.loadedData['xc'] = data.values[:, 0]
-        self.loadedData['yc'] = data.values[:, 1]
-        # x and y displacement
-        self.loadedData['xd'] = data.values[:, 2]
-        self.loadedData['yd'] = data.values[:, 3]
+        if useCache:
+            cacheName = "DavisText_{}".format(np.dtype(dtype).name)
+            if roi is not None:
+                cacheName += "_" + "_".join(str(int(val)) for val in roi)
+            cache = DataCache(filePath, cacheName)
+            cached = cache.load()
+            if cached is not None:
+                self.loadedMetadata.update(cached[0])
+                self.loadedData.update(cached[1])
+                return self.loadedData
+
+        xDim = self.loadedMetadata['xDim']
+        yDim = self.loadedMetadata['yDim']
+        if roi is None:
+            roi = (0, xDim, 0, yDim)
+        xMin, xMax, yMin, yMax = checkRoi(roi, xDim, yDim)
+        shape = (yMax - yMin, xMax - xMin)
+
+        # x and y coordinates and x and y displacement
+        keys = ['xc', 'yc', 'xd', 'yd']
+        for key in keys:
+            self.loadedData[key] = np.empty(shape, dtype=dtype)
+        columns = [(i, self.loadedData[key].reshape(-1)) for i, key in enumerate(keys)]
+
+        numRows = parseTextChunks(
+            filePath, 1, columns,
+            chunkSize=chunkSize, numThreads=numThreads,
+            skipRows=yMin * xDim, maxRows=shape[0] * xDim,
+            rowLength=xDim, colRange=(xMin, xMax)
+        )
+        if numRows != shape[0] * xDim:
+            raise AssertionError("Dimensions of data and header do not match")
+
+        self.loadedMetadata['xDim'] = shape[1]
+        self.loadedMetadata['yDim'] = shape[0]
+        self.loadedMetadata['offset'] = (xMin, yMin)
 
         self.checkData()
 
+        if useCache:
+            cache.save(self.loadedMetadata, self.loadedData)
+
         return self.loadedData
+
+    def loadNCorr(self, fileName, fileDir="", step=0, dtype=float,
+                  roi=None):
+        """Load displacement data from a .mat file saved by nCorr.
+        Only the `data_dic` variable of the file is read and the
+        coordinates of each point are generated in the same way as
+        the nCorrToDavis script.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file including extension.
+        fileDir : str, optional
+            Directory containing the file.
+        step : int, optional
+            Index of the deformed image to load the displacements of,
+            when the analysis contains more than one.
+        dtype : numpy.dtype, optional
+            Data type of the loaded arrays.
+        roi : tuple(int), optional
+            Region of interest (xMin, xMax, yMin, yMax) to load, in
+            data points with max values exclusive.
+
+        Returns
+        -------
+        dict, dict
+            Loaded metadata and data. Each array has shape
+            (yDim, xDim).
+        """
+        filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
+        if not filePath.is_file():
+            raise FileNotFoundError("Cannot open file {}".format(filePath))
+
+        # skip loading any other variables, such as the images
+        try:
+            matData = scipy.io.loadmat(
+                str(filePath), variable_names=['data_dic'],
+                squeeze_me=True, struct_as_record=False
+            )
+        except NotImplementedError:
+            raise ValueError("MATLAB v7.3 files are not supported, resave "
+                             "{} in an older format.".format(filePath))
+        if 'data_dic' not in matData:
+            raise ValueError("No nCorr DIC data found in {}".format(filePath))
+        dicData = matData['data_dic']
+
+        displacements = np.atleast_1d(dicData.displacements)[step]
+        xd = np.asarray(displacements.plot_u_dic, dtype=dtype)
+        yd = np.asarray(displacements.plot_v_dic, dtype=dtype)
+        subsetSize = int(dicData.dispinfo.radius)
+
+        yDim, xDim = xd.shape
+        if roi is None:
+            roi = (0, xDim, 0, yDim)
+        xMin, xMax, yMin, yMax = checkRoi(roi, xDim, yDim)
+
+        self.loadedMetadata['format'] = "nCorr"
+        self.loadedMetadata['version'] = "1.2"
+        self.loadedMetadata['binning'] = subsetSize
+        self.loadedMetadata['xDim'] = xMax - xMin
+        self.loadedMetadata['yDim'] = yMax - yMin
+        self.loadedMetadata['offset'] = (xMin, yMin)
+
+        self.checkMetadata()
+
+        # points are at the centre of each subset, round half up as
+        # in MATLAB
+        coordOffset = int(np.floor(subsetSize / 2 + 0.5))
+        xc, yc = np.meshgrid(
+            np.arange(xMin, xMax) * subsetSize + coordOffset,
+            np.arange(yMin, yMax) * subsetSize + coordOffset
+        )
+        self.loadedData['xc'] = xc.astype(dtype)
+        self.loadedData['yc'] = yc.astype(dtype)
+        self.loadedData['xd'] = xd[yMin:yMax, xMin:xMax]
+        self.loadedData['yd'] = yd[yMin:yMax, xMin:xMax]
+
+        self.checkData()
+
+        return self.loadedMetadata, self.loadedData
@@ -0,0 +1,210 @@
+# Copyright 2019 Mechanics of Microstructures Group
+#    at The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pathlib
+
+from defdap.file_readers import CRC_DATA_FORMAT
+
+
+class EBSDDataWriter(object):
+    """Write EBSD data to file. Set the metadata and data to write in
+    `metadata` and `data`, in the same form as loaded by an
+    EBSDDataLoader.
+    """
+
+    # Laue group numbers used by Oxford software
+    laueGroups = {'cubic': 11, 'hexagonal': 9}
+
+    def __init__(self):
+        self.metadata = {
+            'xDim': 0,
+            'yDim': 0,
+            'stepSize': 0.,
+            'numPhases': 0,
+            'phaseNames': [],
+            'crystalSym': None
+        }
+        self.data = {
+            'eulerAngle': None,
+            'bandContrast': None,
+            'phase': None,
+            'meanAngularDeviation': None
+        }
+
+    def checkData(self):
+        shape = (self.metadata['yDim'], self.metadata['xDim'])
+        if self.data['eulerAngle'].shape != (3,) + shape:
+            raise ValueError("Dimensions of Euler angle data and metadata "
+                             "do not match.")
+        for key in ['bandContrast', 'phase', 'meanAngularDeviation']:
+            if self.data[key] is not None and self.data[key].shape != shape:
+                raise ValueError("Dimensions of {} data and metadata do not "
+                                 "match.".format(key))
+        if len(self.metadata['phaseNames']) != self.metadata['numPhases']:
+            raise ValueError("Number of phases mismatch.")
+
+    def columnData(self, key, dtype):
+        """Data of a field as a 1D array, in order of the points in a
+        file. Zeros are returned for fields without data.
+        """
+        numPoints = self.metadata['xDim'] * self.metadata['yDim']
+        if self.data[key] is None:
+            return np.zeros(numPoints, dtype=dtype)
+        return np.ravel(self.data[key]).astype(dtype, copy=False)
+
+    def writeOxfordCPR(self, fileName, fileDir=""):
+        """Write a .cpr metadata file, describing data in a .crc file.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file excluding extension.
+        fileDir : str, optional
+            Directory to write the file in.
+        """
+        fileName = "{}.cpr".format(fileName)
+        filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
+
+        lines = [
+            "[General]",
+            "Version=5.0",
+            "Description=Exported from DefDAP",
+            "JobMode=RegularGrid",
+            "[Job]",
+            "GridDistX={:.4f}".format(self.metadata['stepSize']),
+            "GridDistY={:.4f}".format(self.metadata['stepSize']),
+            "xCells={:d}".format(self.metadata['xDim']),
+            "yCells={:d}".format(self.metadata['yDim']),
+            # fields in each record of the .crc file
+            "[Fields]",
+            "Count=9",
+        ]
+        lines += ["Field{:d}={:d}".format(i + 1, fieldId) for i, fieldId in
+                  enumerate([3, 4, 5, 6, 7, 8, 10, 11, 12])]
+
+        lines += ["[Phases]", "Count={:d}".format(self.metadata['numPhases'])]
+        laueGroup = self.laueGroups.get(self.metadata['crystalSym'])
+        for i, phaseName in enumerate(self.metadata['phaseNames']):
+            lines += ["[Phase{:d}]".format(i + 1),
+                      "StructureName={}".format(phaseName)]
+            if laueGroup is not None:
+                lines.append("LaueGroup={:d}".format(laueGroup))
+
+        with open(str(filePath), 'w') as cprFile:
+            cprFile.write("\n".join(lines) + "\n")
+
+    def writeOxfordCRC(self, fileName, fileDir=""):
+        """Write the data to a .crc file in a single bulk write, with
+        Euler angles in radians.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file excluding extension.
+        fileDir : str, optional
+            Directory to write the file in.
+        """
+        fileName = "{}.crc".format(fileName)
+        filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
+
+        eulerAngle = self.data['eulerAngle']
+        binData = np.zeros(eulerAngle[0].size, dtype=CRC_DATA_FORMAT)
+        binData['Phase'] = self.columnData('phase', 'b')
+        for i, fieldName in enumerate(CRC_DATA_FORMAT['Eulers'].names):
+            binData['Eulers'][fieldName] = np.ravel(eulerAngle[i])
+        binData['MAD'] = self.columnData('meanAngularDeviation', 'f')
+        binData['BC'] = self.columnData('bandContrast', 'uint8')
+
+        binData.tofile(str(filePath))
+
+    def writeOxfordBinary(self, fileName, fileDir=""):
+        """Write the metadata and data to a .cpr/.crc pair of files.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of files excluding extension.
+        fileDir : str, optional
+            Directory to write the files in.
+        """
+        self.checkData()
+        self.writeOxfordCPR(fileName, fileDir=fileDir)
+        self.writeOxfordCRC(fileName, fileDir=fileDir)
+
+    def writeOxfordCTF(self, fileName, fileDir="", chunkSize=2**16):
+        """Write the metadata and data to a .ctf file. Blocks of points
+        are formatted with numpy.savetxt. Band slope is not stored so
+        is written as 0, as are the number of bands and error columns.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file excluding extension.
+        fileDir : str, optional
+            Directory to write the file in.
+        chunkSize : int, optional
+            Number of points to format at a time.
+        """
+        self.checkData()
+
+        fileName = "{}.ctf".format(fileName)
+        filePath = pathlib.Path(fileDir) / pathlib.Path(fileName)
+
+        xDim = self.metadata['xDim']
+        yDim = self.metadata['yDim']
+        stepSize = self.metadata['stepSize']
+
+        lines = [
+            "Channel Text File",
+            "Prj\tExported from DefDAP",
+            "JobMode\tGrid",
+            "XCells\t{:d}".format(xDim),
+            "YCells\t{:d}".format(yDim),
+            "XStep\t{:.4f}".format(stepSize),
+            "YStep\t{:.4f}".format(stepSize),
+            "Phases\t{:d}".format(self.metadata['numPhases']),
+        ]
+        # lattice parameters are not known so are left as unit lengths
+        laueGroup = self.laueGroups.get(self.metadata['crystalSym'], 0)
+        latticeAngles = "90.000;90.000;120.000" if laueGroup == 9 else \
+            "90.000;90.000;90.000"
+        for phaseName in self.metadata['phaseNames']:
+            lines.append("1.000;1.000;1.000\t{}\t{}\t{:d}\t0".format(
+                latticeAngles, phaseName, laueGroup
+            ))
+        lines.append("Phase\tX\tY\tBands\tError\tEuler1\tEuler2\tEuler3"
+                     "\tMAD\tBC\tBS")
+
+        # columns of the data section
+        yCoords, xCoords = np.mgrid[0:yDim, 0:xDim] * stepSize
+        columns = np.empty((xDim * yDim, 11))
+        columns[:, 0] = self.columnData('phase', float)
+        columns[:, 1] = xCoords.ravel()
+        columns[:, 2] = yCoords.ravel()
+        columns[:, 3:5] = 0
+        columns[:, 5:8] = np.reshape(self.data['eulerAngle'],
+                                     (3, -1)).T * 180 / np.pi
+        columns[:, 8] = self.columnData('meanAngularDeviation', float)
+        columns[:, 9] = self.columnData('bandContrast', float)
+        columns[:, 10] = 0
+
+        columnFormats = ['%d', '%.4f', '%.4f', '%d', '%d', '%.4f', '%.4f',
+                         '%.4f', '%.4f', '%d', '%d']
+        with open(str(filePath), 'w') as ctfFile:
+            ctfFile.write("\n".join(lines) + "\n")
+            for start in range(0, len(columns), chunkSize):
+                np.savetxt(ctfFile, columns[start:start + chunkSize],
+                           fmt=columnFormats, delimiter='\t')
@@ -16,6 +16,12 @@
 import numpy as np
 from matplotlib.pyplot import imread
 import inspect
+import glob
+import os
+import pathlib
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 from skimage import transform as tf
 from skimage import morphology as mph
@@ -34,12 +40,27 @@ from defdap.plotting import MapPlot, GrainPlot
 
 class Map(base.Map):
 
-    def __init__(self, path, fname, dataType=None):
+    def __init__(self, path, fname, dataType=None, useCache=False,
+                 roi=None, data=None):
         """Initialise class and import DIC data from file
 
         Args:
             path(str): Path to file
             fname(str): Name of file including extension
+            dataType(str, optional): Format of DIC data file,
+                'DavisText' (default) or 'NCorr' for a .mat file
+                saved by nCorr
+            useCache(bool, optional): Cache parsed data in a binary
+                sidecar file and load from it when valid
+            roi(tuple, optional): Region of interest (xMin, xMax,
+                yMin, yMax) in data points to load, max values
+                exclusive. Its position in the full map is stored in
+                offset (x, y)
+            data(tuple, optional): Already loaded (metadata, data)
+                dictionaries to build the map from instead of loading
+                the file. The data can also contain the deformation
+                gradient components and max shear, otherwise they are
+                calculated
         """
 
         # Call base class constructor
@@ -53,6 +74,7 @@ class Map(base.Map):
         self.binning = None     # Sub-window size in pixels
         self.xdim = None        # size of map along x (from header)
         self.ydim = None        # size of map along y (from header)
+        self.offset = (0, 0)    # position of loaded region in full map
 
         self.xc = None          # x coordinates
         self.yc = None          # y coordinates
@@ -64,6 +86,7 @@ class Map(base.Map):
         self.ebsdTransformInv = None        # Transform from DIC to EBSD coordinates
         self.currGrainId = None             # ID of last selected grain
         self.ebsdGrainIds = None
+        self.grainMaxShear = None           # max shear of points of all grains
         self.patternImPath = None           # Path to BSE image of map
         self.plotHomog = self.plotMaxShear  # Use max shear map for defining homologous points
         self.highlightAlpha = 0.6
@@ -75,7 +98,11 @@ class Map(base.Map):
         self.path = path                    # file path
         self.fname = fname                  # file name
 
-        self.loadData(path, fname, dataType=dataType)
+        if data is None:
+            self.loadData(path, fname, dataType=dataType, useCache=useCache,
+                          roi=roi)
+        else:
+            self.setData(*data)
   
         # *dim are full size of data. *Dim are size after cropping
         self.xDim = self.xdim
@@ -83,15 +110,15 @@ class Map(base.Map):
         
         self.x_map = self._map(self.xd)     # u (displacement component along x)
         self.y_map = self._map(self.yd)     # v (displacement component along x)
-        xDispGrad = self._grad(self.x_map)
-        yDispGrad = self._grad(self.y_map)
-        self.f11 = xDispGrad[1] + 1         # f11
-        self.f22 = yDispGrad[0] + 1         # f22
-        self.f12 = xDispGrad[0]             # f12
-        self.f21 = yDispGrad[1]             # f21
-
-        self.max_shear = np.sqrt((((self.f11 - self.f22) / 2.)**2) +
-                                 ((self.f12 + self.f21) / 2.)**2)   # max shear component
+        if data is None or 'max_shear' not in data[1]:
+            deformation = calcDeformation(self.x_map, self.y_map, self.gradStep)
+        else:
+            deformation = data[1]
+        self.f11 = deformation['f11']       # f11
+        self.f22 = deformation['f22']       # f22
+        self.f12 = deformation['f12']       # f12
+        self.f21 = deformation['f21']       # f21
+        self.max_shear = deformation['max_shear']                   # max shear component
         self.mapshape = np.shape(self.max_shear)                    # map shape
 
         self.cropDists = np.array(((0, 0), (0, 0)), dtype=int)      # crop distances (default all zeros)
@@ -108,21 +135,52 @@ class Map(base.Map):
     def crystalSym(self):
         return self.ebsdMap.crystalSym
 
-    def loadData(self, fileDir, fileName, dataType=None):
+    @staticmethod
+    def readData(fileDir, fileName, dataType=None, useCache=False, roi=None,
+                 dtype=float, numThreads=None):
+        """Read DIC data from file without creating a map.
+
+        Args:
+            fileDir(str): Path to file
+            fileName(str): Name of file including extension
+            dataType(str, optional): Format of DIC data file
+            useCache(bool, optional): Use a binary sidecar cache
+            roi(tuple, optional): Region of interest to load
+            dtype(numpy.dtype, optional): Data type of loaded arrays
+            numThreads(int, optional): Threads used to parse text files
+
+        Returns:
+            dict, dict: Loaded metadata and data
+        """
         dataType = "DavisText" if dataType is None else dataType
 
         dataLoader = DICDataLoader()
         if dataType == "DavisText":
             metadataDict = dataLoader.loadDavisMetadata(fileName, fileDir)
-            dataDict = dataLoader.loadDavisData(fileName, fileDir)
+            dataDict = dataLoader.loadDavisData(fileName, fileDir,
+                                                useCache=useCache, roi=roi,
+                                                dtype=dtype,
+                                                numThreads=numThreads)
+        elif dataType == "NCorr":
+            metadataDict, dataDict = dataLoader.loadNCorr(fileName, fileDir,
+                                                          roi=roi, dtype=dtype)
         else:
             raise Exception("No loader found for this DIC data.")
 
+        return metadataDict, dataDict
+
+    def loadData(self, fileDir, fileName, dataType=None, useCache=False,
+                 roi=None):
+        self.setData(*self.readData(fileDir, fileName, dataType=dataType,
+                                    useCache=useCache, roi=roi))
+
+    def setData(self, metadataDict, dataDict):
         self.format = metadataDict['format']      # Software name
         self.version = metadataDict['version']    # Software version
         self.binning = metadataDict['binning']    # Sub-window width in pixels
         self.xdim = metadataDict['xDim']          # size of map along x (from header)
         self.ydim = metadataDict['yDim']          # size of map along y (from header)
+        self.offset = tuple(metadataDict['offset'])  # position of loaded region
 
         self.xc = dataDict['xc']    # x coordinates
         self.yc = dataDict['yc']    # y coordinates
@@ -130,11 +188,16 @@ class Map(base.Map):
         self.yd = dataDict['yd']    # y displacement
 
     def _map(self, data_col):
-        data_map = np.reshape(np.array(data_col), (self.ydim, self.xdim))
+        data_map = np.reshape(data_col, (self.ydim, self.xdim))
         return data_map
 
+    @property
+    def gradStep(self):
+        # spacing of the data points
+        return min(abs((np.diff(self._map(self.xc)[0]))))
+
     def _grad(self, data_map):
-        grad_step = min(abs((np.diff(self.xc))))
+        grad_step = self.gradStep
         data_grad = np.gradient(data_map, grad_step, grad_step)
         return data_grad
 
@@ -515,35 +578,10 @@ class Map(base.Map):
         # Check a EBSD map is linked
         self.checkEbsdLinked()
 
-        # Initialise the grain map
-        self.grains = np.copy(self.boundaries)
-
-        self.grainList = []
-
-        # List of points where no grain has been set yet
-        unknownPoints = np.where(self.grains == 0)
-        # Start counter for grains
-        grainIndex = 1
-
-        # Loop until all points (except boundaries) have been assigned
-        # to a grain or ignored
-        while unknownPoints[0].shape[0] > 0:
-            # Flood fill first unknown point and return grain object
-            currentGrain = self.floodFill(unknownPoints[1][0], unknownPoints[0][0], grainIndex)
-
-            grainSize = len(currentGrain)
-            if grainSize < minGrainSize:
-                # if grain size less than minimum, ignore grain and set
-                # values in grain map to -2
-                for coord in currentGrain.coordList:
-                    self.grains[coord[1], coord[0]] = -2
-            else:
-                # add grain and size to lists and increment grain label
-                self.grainList.append(currentGrain)
-                grainIndex += 1
+        numGrains = self.labelGrains(minGrainSize=minGrainSize)
 
-            # update unknown points
-            unknownPoints = np.where(self.grains == 0)
+        self.grainMaxShear = self.crop(self.max_shear).ravel()[self.grainPoints]
+        self.grainList = [Grain(i, self) for i in range(numGrains)]
 
         # Now link grains to those in ebsd Map
         # Warp DIC grain map to EBSD frame
@@ -568,65 +606,214 @@ class Map(base.Map):
 
         print("\rDone                                               ", end="")
 
-    def floodFill(self, x, y, grainIndex):
-        currentGrain = Grain(self)
-
-        currentGrain.addPoint((x, y), self.max_shear[y + self.cropDists[1, 0], x + self.cropDists[0, 0]])
-
-        edge = [(x, y)]
-        grain = [(x, y)]
-
-        self.grains[y, x] = grainIndex
-        while edge:
-            newedge = []
-
-            for (x, y) in edge:
-                moves = np.array([(x + 1, y),
-                                  (x - 1, y),
-                                  (x, y + 1),
-                                  (x, y - 1)])
-
-                movesIndexShift = 0
-                if x <= 0:
-                    moves = np.delete(moves, 1, 0)
-                    movesIndexShift = 1
-                elif x >= self.xDim - 1:
-                    moves = np.delete(moves, 0, 0)
-                    movesIndexShift = 1
-
-                if y <= 0:
-                    moves = np.delete(moves, 3 - movesIndexShift, 0)
-                elif y >= self.yDim - 1:
-                    moves = np.delete(moves, 2 - movesIndexShift, 0)
-
-                for (s, t) in moves:
-                    if self.grains[t, s] == 0:
-                        currentGrain.addPoint((s, t), self.max_shear[y + self.cropDists[1, 0],
-                                                                     x + self.cropDists[0, 0]])
-                        newedge.append((s, t))
-                        grain.append((s, t))
-                        self.grains[t, s] = grainIndex
-                    elif self.grains[t, s] == -1 and (s > x or t > y):
-                        currentGrain.addPoint((s, t), self.max_shear[y + self.cropDists[1, 0],
-                                                                     x + self.cropDists[0, 0]])
-                        grain.append((s, t))
-                        self.grains[t, s] = grainIndex
-
-            if newedge == []:
-                return currentGrain
-            else:
-                edge = newedge
+
+def calcDeformation(xDisp, yDisp, gradStep):
+    """Calculate deformation gradient components and max shear from
+    displacement maps. The maps can be stacked along leading axes, in
+    which case the gradients are taken over the last two.
+
+    Args:
+        xDisp(np.ndarray): x displacement, shape (..., yDim, xDim)
+        yDisp(np.ndarray): y displacement, shape (..., yDim, xDim)
+        gradStep(float): Spacing of the data points
+
+    Returns:
+        dict: f11, f22, f12, f21 and max_shear arrays
+    """
+    xDispGrad = np.gradient(xDisp, gradStep, axis=(-2, -1))
+    yDispGrad = np.gradient(yDisp, gradStep, axis=(-2, -1))
+
+    deformation = {
+        'f11': xDispGrad[1] + 1,
+        'f22': yDispGrad[0] + 1,
+        'f12': xDispGrad[0],
+        'f21': yDispGrad[1],
+    }
+    deformation['max_shear'] = np.sqrt(
+        ((deformation['f11'] - deformation['f22']) / 2.)**2 +
+        ((deformation['f12'] + deformation['f21']) / 2.)**2
+    )
+
+    return deformation
+
+
+class MapSequence(object):
+    """Sequence of DIC maps of the same area, for example from the load
+    steps of an in-situ test. Displacements and deformation of all the
+    steps are held in stacked arrays of shape (nSteps, yDim, xDim) and
+    indexing the sequence gives a Map for a step with its data as
+    views onto the stacks.
+    """
+
+    def __init__(self, path, dataType=None, numThreads=None,
+                 memoryMapDir=None, dtype=float, useCache=False, roi=None):
+        """Load the DIC data of all steps in parallel.
+
+        Args:
+            path(str): Directory containing one data file per step or
+                a glob pattern matching the files. Steps are ordered by
+                file name, comparing numbers by value
+            dataType(str, optional): Format of DIC data files
+            numThreads(int, optional): Number of files to load at
+                once, defaults to the number of CPUs
+            memoryMapDir(str, optional): Directory to store the stacked
+                arrays in as memory-mapped .npy files, instead of
+                holding them in memory. The files are written to a new
+                subdirectory so existing files are never overwritten
+            dtype(numpy.dtype, optional): Data type of the stacks, use
+                float32 to halve the memory required
+            useCache(bool, optional): Use binary sidecar caches of the
+                data files
+            roi(tuple, optional): Region of interest to load from each
+                file (xMin, xMax, yMin, yMax)
+        """
+        print("\rLoading DIC sequence...", end="")
+
+        self.dataType = "DavisText" if dataType is None else dataType
+        self.filePaths = self.findFiles(path, self.dataType)
+        if len(self.filePaths) == 0:
+            raise FileNotFoundError("No DIC data found for {}".format(path))
+        self.numSteps = len(self.filePaths)
+        if memoryMapDir is not None:
+            # a new directory for each sequence
+            memoryMapDir = tempfile.mkdtemp(prefix="defdapSequence",
+                                            dir=memoryMapDir)
+        self.memoryMapDir = memoryMapDir
+        self.dtype = dtype
+
+        self.metadata = [None] * self.numSteps
+        self.xc = None          # x coordinates, shared by all steps
+        self.yc = None          # y coordinates, shared by all steps
+        self.xd = None          # x displacement stack
+        self.yd = None          # y displacement stack
+        self.f11 = None
+        self.f22 = None
+        self.f12 = None
+        self.f21 = None
+        self.max_shear = None
+        self.maps = [None] * self.numSteps
+
+        def loadStep(i):
+            filePath = self.filePaths[i]
+            metadata, data = Map.readData(
+                str(filePath.parent), filePath.name, dataType=self.dataType,
+                useCache=useCache, roi=roi, dtype=dtype, numThreads=1
+            )
+            if i == 0:
+                # the first step defines the grid for the sequence
+                self.xc = np.array(data['xc'])
+                self.yc = np.array(data['yc'])
+                self.xd = self._newStack('xd', self.xc.shape)
+                self.yd = self._newStack('yd', self.xc.shape)
+            elif not (np.array_equal(data['xc'], self.xc) and
+                      np.array_equal(data['yc'], self.yc)):
+                raise ValueError("Grid of {} does not match the first "
+                                 "step.".format(filePath))
+            self.metadata[i] = metadata
+            self.xd[i] = data['xd']
+            self.yd[i] = data['yd']
+
+        loadStep(0)
+        if numThreads is None:
+            numThreads = os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=numThreads) as executor:
+            list(executor.map(loadStep, range(1, self.numSteps)))
+
+        self.calcDeformation()
+
+        print("\rLoaded DIC sequence ({0} steps, dimensions: {1} x {2} "
+              "pixels)".format(self.numSteps, self.xDim, self.yDim))
+
+    @staticmethod
+    def findFiles(path, dataType):
+        """Find the data files of a sequence.
+
+        Args:
+            path(str): Directory or glob pattern
+            dataType(str): Format of DIC data files, used to select
+                files in a directory
+
+        Returns:
+            list(pathlib.Path): Paths ordered by file name
+        """
+        if os.path.isdir(path):
+            extension = {"DavisText": "*.txt", "NCorr": "*.mat"}[dataType]
+            path = os.path.join(path, extension)
+
+        def naturalKey(filePath):
+            return [int(part) if part.isdigit() else part
+                    for part in re.split(r'(\d+)', filePath.name)]
+
+        return sorted((pathlib.Path(filePath) for filePath in glob.glob(path)),
+                      key=naturalKey)
+
+    def _newStack(self, name, shape):
+        shape = (self.numSteps,) + tuple(shape)
+        if self.memoryMapDir is None:
+            return np.empty(shape, dtype=self.dtype)
+        return np.lib.format.open_memmap(
+            os.path.join(self.memoryMapDir, "{}.npy".format(name)),
+            mode='w+', dtype=self.dtype, shape=shape
+        )
+
+    @property
+    def xDim(self):
+        return self.xd.shape[2]
+
+    @property
+    def yDim(self):
+        return self.xd.shape[1]
+
+    @property
+    def gradStep(self):
+        # spacing of the data points
+        return min(abs(np.diff(self.xc[0])))
+
+    def calcDeformation(self):
+        """Calculate deformation gradient components and max shear of
+        all steps, working on blocks of steps at a time.
+        """
+        keys = ['f11', 'f22', 'f12', 'f21', 'max_shear']
+        for key in keys:
+            setattr(self, key, self._newStack(key, self.xd.shape[1:]))
+
+        gradStep = self.gradStep
+        blockSize = max(2**24 // (self.xDim * self.yDim), 1)
+        for start in range(0, self.numSteps, blockSize):
+            block = slice(start, start + blockSize)
+            deformation = calcDeformation(self.xd[block], self.yd[block],
+                                          gradStep)
+            for key in keys:
+                getattr(self, key)[block] = deformation[key]
+
+    def __len__(self):
+        return self.numSteps
+
+    def __getitem__(self, step):
+        """Map of a step, with data arrays that are views onto the
+        stacks of the sequence.
+        """
+        step = range(self.numSteps)[step]
+        if self.maps[step] is None:
+            data = {'xc': self.xc, 'yc': self.yc}
+            for key in ['xd', 'yd', 'f11', 'f22', 'f12', 'f21', 'max_shear']:
+                data[key] = getattr(self, key)[step]
+
+            filePath = self.filePaths[step]
+            self.maps[step] = Map(str(filePath.parent) + os.sep, filePath.name,
+                                  dataType=self.dataType,
+                                  data=(self.metadata[step], data))
+
+        return self.maps[step]
 
 
 class Grain(base.Grain):
 
-    def __init__(self, dicMap):
+    def __init__(self, grainId, dicMap):
         # Call base class constructor
-        super(Grain, self).__init__()
+        super(Grain, self).__init__(grainId, dicMap)
 
         self.dicMap = dicMap       # dic map this grain is a member of
-        self.ownerMap = dicMap
-        self.maxShearList = []
         self.ebsdGrain = None
         self.ebsdMap = None
 
@@ -637,10 +824,10 @@ class Grain(base.Grain):
             plotSlipBands=True, *args, **kwargs
         )
 
-    # coord is a tuple (x, y)
-    def addPoint(self, coord, maxShear):
-        self.coordList.append(coord)
-        self.maxShearList.append(maxShear)
+    @property
+    def maxShearList(self):
+        """Array of max shear at each point in grain"""
+        return self.dicMap.grainMaxShear[self.pointSlice]
 
     def plotMaxShear(self, **kwargs):
         # Set default plot parameters then update with any input
@@ -400,9 +400,9 @@ class PolePlot(Plot):
     def addLine(self, startPoint, endPoint, plotSyms=False, res=100, **kwargs):
         lines = [(startPoint, endPoint)]
         if plotSyms:
-            for symm in quat.Quat.symEqv(self.crystalSym)[1:]:
-                startPointSymm = symm.transformVector(startPoint).astype(int)
-                endPointSymm = symm.transformVector(endPoint).astype(int)
+            for symm in quat.Quat.symEqvMatrices(self.crystalSym)[1:]:
+                startPointSymm = symm.dot(startPoint).astype(int)
+                endPointSymm = symm.dot(endPoint).astype(int)
 
                 if startPointSymm[2] < 0:
                     startPointSymm *= -1
@@ -13,12 +13,39 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import math
+import os
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 from defdap import plotting
 
 
+class InstanceDispatch(object):
+    """Descriptor for a static method that is replaced by an instance
+    method when accessed from an instance of the class. Used as a
+    decorator, taking the instance method as an argument.
+    """
+
+    def __init__(self, instanceMethod):
+        self.instanceMethod = instanceMethod
+        self.staticMethod = None
+
+    def __call__(self, staticMethod):
+        self.staticMethod = staticMethod
+        self.__doc__ = staticMethod.__doc__
+        return self
+
+    def __get__(self, obj, objType=None):
+        if obj is None:
+            return self.staticMethod
+        return self.instanceMethod.__get__(obj, objType)
+
+
 class Quat(object):
+    # the 4 components are stored as floats without an instance dict
+    __slots__ = ['_q0', '_q1', '_q2', '_q3']
+
     def __init__(self, *args, **kwargs):
         """
         Create a quat object from 3 Bunge euler angles, 4 quat coefficients or an array of 4 quat coefficients
@@ -29,31 +56,43 @@ class Quat(object):
             phi = args[1]
             ph2 = args[2]
 
-            self.quatCoef = np.array([np.cos(phi / 2.0) * np.cos((ph1 + ph2) / 2.0),
-                                      -np.sin(phi / 2.0) * np.cos((ph1 - ph2) / 2.0),
-                                      -np.sin(phi / 2.0) * np.sin((ph1 - ph2) / 2.0),
-                                      -np.cos(phi / 2.0) * np.sin((ph1 + ph2) / 2.0)],
-                                     dtype=float)
+            cosPhi = math.cos(phi / 2.0)
+            sinPhi = math.sin(phi / 2.0)
+            q0 = cosPhi * math.cos((ph1 + ph2) / 2.0)
+            q1 = -sinPhi * math.cos((ph1 - ph2) / 2.0)
+            q2 = -sinPhi * math.sin((ph1 - ph2) / 2.0)
+            q3 = -cosPhi * math.sin((ph1 + ph2) / 2.0)
 
         # construct with array of quat coefficients
         elif len(args) == 1:
             if len(args[0]) == 4:
-                self.quatCoef = np.array(args[0], dtype=float)
+                q0, q1, q2, q3 = (float(coef) for coef in args[0])
             else:
                 raise Exception("Arrays should have 4 elements, use 3 arguments for Euler angles")
 
         # construct with quat coefficients
         elif len(args) == 4:
-            self.quatCoef = np.array([args[0], args[1], args[2], args[3]], dtype=float)
-        elif len(args) > 4 or len(args) ==2:
+            q0, q1, q2, q3 = (float(coef) for coef in args)
+        else:
             raise Exception("Incorrect argument length\n"
                             "Allowable inputs are 3 Bunge euler angles, array of quat coeffs or quat coeffs")
 
-        if self.quatCoef[0] < 0:
-            self.quatCoef = self.quatCoef * -1
+        if q0 < 0:
+            q0, q1, q2, q3 = -q0, -q1, -q2, -q3
+
+        self._q0 = q0
+        self._q1 = q1
+        self._q2 = q2
+        self._q3 = q3
+
+    @property
+    def quatCoef(self):
+        """Components of the quat as a new array"""
+        return np.array([self._q0, self._q1, self._q2, self._q3])
 
-        # overload static method with instance method of same name in object
-        self.plotIPF = self._plotIPF
+    @quatCoef.setter
+    def quatCoef(self, value):
+        self._q0, self._q1, self._q2, self._q3 = (float(coef) for coef in value)
 
     @classmethod
     def fromAxisAngle(cls, axis, angle):
@@ -68,14 +107,14 @@ class Quat(object):
         """
 
         # normalise the axis vector
-        axis = axis / np.sqrt(np.dot(axis, axis))
+        axis = np.asarray(axis, dtype=float)
+        axis = axis / math.sqrt(np.dot(axis, axis))
         # calculate quat coefficients
-        quatCoef = np.zeros(4, dtype=float)
-        quatCoef[0] = np.cos(angle / 2)
-        quatCoef[1:4] = np.sin(angle / 2) * axis
+        sinAngle = math.sin(angle / 2)
 
         # call constructor
-        return cls(quatCoef)
+        return cls(math.cos(angle / 2), sinAngle * axis[0],
+                   sinAngle * axis[1], sinAngle * axis[2])
 
     def eulerAngles(self):
         """Calculate euler angles for quat
@@ -92,19 +131,19 @@ class Quat(object):
 
         eulers = np.empty(3, dtype=float)
 
-        q = self.quatCoef
+        q = (self._q0, self._q1, self._q2, self._q3)
         q03 = q[0]**2 + q[3]**2
         q12 = q[1]**2 + q[2]**2
-        chi = np.sqrt(q03 * q12)
+        chi = math.sqrt(q03 * q12)
 
         if (chi == 0 and q12 == 0):
-            eulers[0] = np.arctan2(-2 * q[0] * q[3],
+            eulers[0] = math.atan2(-2 * q[0] * q[3],
                                    q[0]**2 - q[3]**2)
             eulers[1] = 0
             eulers[2] = 0
 
         elif (chi == 0 and q03 == 0):
-            eulers[0] = np.arctan2(2 * q[1] * q[2],
+            eulers[0] = math.atan2(2 * q[1] * q[2],
                                    q[1]**2 - q[2]**2)
             eulers[1] = np.pi
             eulers[2] = 0
@@ -119,9 +158,9 @@ class Quat(object):
             cosPh2 = (-q[0] * q[1] + q[2] * q[3]) / chi
             sinPh2 = (q[1] * q[3] + q[0] * q[2]) / chi
 
-            eulers[0] = np.arctan2(sinPh1, cosPh1)
-            eulers[1] = np.arctan2(sinPhi, cosPhi)
-            eulers[2] = np.arctan2(sinPh2, cosPh2)
+            eulers[0] = math.atan2(sinPh1, cosPh1)
+            eulers[1] = math.atan2(sinPhi, cosPhi)
+            eulers[2] = math.atan2(sinPh2, cosPh2)
 
         if eulers[0] < 0:
             eulers[0] += 2 * np.pi
@@ -131,28 +170,20 @@ class Quat(object):
         return eulers
 
     def rotMatrix(self):
-        rotMatrix = np.empty((3, 3), dtype=float)
-
-        q = self.quatCoef
-        qbar = q[0]**2 - q[1]**2 - q[2]**2 - q[3]**2
-
-        rotMatrix[0, 0] = qbar + 2 * q[1]**2
-        rotMatrix[0, 1] = 2 * (q[1] * q[2] - q[0] * q[3])
-        rotMatrix[0, 2] = 2 * (q[1] * q[3] + q[0] * q[2])
-
-        rotMatrix[1, 0] = 2 * (q[1] * q[2] + q[0] * q[3])
-        rotMatrix[1, 1] = qbar + 2 * q[2]**2
-        rotMatrix[1, 2] = 2 * (q[2] * q[3] - q[0] * q[1])
+        q0, q1, q2, q3 = self._q0, self._q1, self._q2, self._q3
+        qbar = q0**2 - q1**2 - q2**2 - q3**2
 
-        rotMatrix[2, 0] = 2 * (q[1] * q[3] - q[0] * q[2])
-        rotMatrix[2, 1] = 2 * (q[2] * q[3] + q[0] * q[1])
-        rotMatrix[2, 2] = qbar + 2 * q[3]**2
-
-        return rotMatrix
+        return np.array([
+            [qbar + 2 * q1**2, 2 * (q1 * q2 - q0 * q3), 2 * (q1 * q3 + q0 * q2)],
+            [2 * (q1 * q2 + q0 * q3), qbar + 2 * q2**2, 2 * (q2 * q3 - q0 * q1)],
+            [2 * (q1 * q3 - q0 * q2), 2 * (q2 * q3 + q0 * q1), qbar + 2 * q3**2]
+        ])
 
     # show components when the quat is printed
     def __repr__(self):
-        return "[{:.4f}, {:.4f}, {:.4f}, {:.4f}]".format(*self.quatCoef)
+        return "[{:.4f}, {:.4f}, {:.4f}, {:.4f}]".format(
+            self._q0, self._q1, self._q2, self._q3
+        )
 
     def __str__(self):
         return self.__repr__()
@@ -163,32 +194,38 @@ class Quat(object):
     # overload * operator for quaterion product and vector product
     def __mul__(self, right):
         if isinstance(right, type(self)):   # another quat
-            newQuatCoef = np.zeros(4, dtype=float)
-            newQuatCoef[0] = (self.quatCoef[0] * right.quatCoef[0] -
-                              np.dot(self.quatCoef[1:4], right.quatCoef[1:4]))
-            newQuatCoef[1:4] = (self.quatCoef[0] * right.quatCoef[1:4] +
-                                right.quatCoef[0] * self.quatCoef[1:4] +
-                                np.cross(self.quatCoef[1:4], right.quatCoef[1:4]))
-            return Quat(newQuatCoef)
+            a0, a1, a2, a3 = self._q0, self._q1, self._q2, self._q3
+            b0, b1, b2, b3 = right._q0, right._q1, right._q2, right._q3
+            return Quat(a0 * b0 - a1 * b1 - a2 * b2 - a3 * b3,
+                        a0 * b1 + b0 * a1 + a2 * b3 - a3 * b2,
+                        a0 * b2 + b0 * a2 + a3 * b1 - a1 * b3,
+                        a0 * b3 + b0 * a3 + a1 * b2 - a2 * b1)
+        elif isinstance(right, QuatArray):
+            return QuatArray(self.quatCoef) * right
         raise TypeError()
 
     # # overload % operator for dot product
     # def __mod__(self, right):
     def dot(self, right):
         if isinstance(right, type(self)):
-            return np.dot(self.quatCoef, right.quatCoef)
+            return (self._q0 * right._q0 + self._q1 * right._q1 +
+                    self._q2 * right._q2 + self._q3 * right._q3)
         raise TypeError()
 
     # overload + operator
     def __add__(self, right):
         if isinstance(right, type(self)):
-            return Quat(self.quatCoef + right.quatCoef)
+            return Quat(self._q0 + right._q0, self._q1 + right._q1,
+                        self._q2 + right._q2, self._q3 + right._q3)
         raise TypeError()
 
     # overload += operator
     def __iadd__(self, right):
         if isinstance(right, type(self)):
-            self.quatCoef += right.quatCoef
+            self._q0 += right._q0
+            self._q1 += right._q1
+            self._q2 += right._q2
+            self._q3 += right._q3
             return self
         raise TypeError()
 
@@ -197,20 +234,26 @@ class Quat(object):
         return self.quatCoef[key]
 
     def __setitem__(self, key, value):
-        self.quatCoef[key] = value
+        quatCoef = self.quatCoef
+        quatCoef[key] = value
+        self.quatCoef = quatCoef
         return
 
     def norm(self):
-        return np.sqrt(np.dot(self.quatCoef[0:4], self.quatCoef[0:4]))
+        return math.sqrt(self.dot(self))
 
     def normalise(self):
-        self.quatCoef /= self.norm()
+        norm = self.norm()
+        self._q0 /= norm
+        self._q1 /= norm
+        self._q2 /= norm
+        self._q3 /= norm
         return
 
     # also the inverse if this is a unit quaterion
     @property
     def conjugate(self):
-        return Quat(self[0], -self[1], -self[2], -self[3])
+        return Quat(self._q0, -self._q1, -self._q2, -self._q3)
 
     def transformVector(self, vector):
         """Transforms vector by the quaternion. For EBSD quaterions this
@@ -225,10 +268,19 @@ class Quat(object):
         """
 
         if isinstance(vector, np.ndarray) and vector.shape == (3,):
-            vectorQuat = Quat(0, vector[0], vector[1], vector[2])
-            vectorQuatTransformed = (self * vectorQuat) * self.conjugate
-            vectorTransformed = vectorQuatTransformed.quatCoef[1:4]
-            return vectorTransformed
+            # (self * vectorQuat) * self.conjugate expanded, without
+            # forming intermediate quats
+            q0, q1, q2, q3 = self._q0, self._q1, self._q2, self._q3
+            v0, v1, v2 = (float(comp) for comp in vector)
+
+            quatDotVec = q1 * v0 + q2 * v1 + q3 * v2
+            temp = q0**2 - q1**2 - q2**2 - q3**2
+
+            return np.array([
+                2 * quatDotVec * q1 + temp * v0 + 2 * q0 * (q2 * v2 - q3 * v1),
+                2 * quatDotVec * q2 + temp * v1 + 2 * q0 * (q3 * v0 - q1 * v2),
+                2 * quatDotVec * q3 + temp * v2 + 2 * q0 * (q1 * v1 - q2 * v0)
+            ])
 
         raise TypeError("Vector must be a size 3 numpy array.")
 
@@ -248,13 +300,15 @@ class Quat(object):
                         returnQuat = 2 - both
         """
         if isinstance(right, type(self)):
-            minMisOri = 0   # actually looking for max of this as it is cos of misoriention angle
-            for sym in Quat.symEqv(symGroup):   # loop over symmetrically equivelent orienations
-                quatSym = sym * right
-                currentMisOri = abs(self.dot(quatSym))
-                if currentMisOri > minMisOri:   # keep if misorientation lower
-                    minMisOri = currentMisOri
-                    minQuatSym = quatSym
+            # all symmetrically equivalent orientations of right at once
+            quatSyms = Quat.calcProducts(Quat.symEqvArray(symGroup),
+                                         right.quatCoef)
+            misOris = np.abs(quatSyms.dot(self.quatCoef))
+
+            # actually looking for max of this as it is cos of misoriention angle
+            minIdx = np.argmax(misOris)
+            minMisOri = misOris[minIdx]
+            minQuatSym = Quat(quatSyms[minIdx])
 
             if returnQuat == 1:
                 return minQuatSym
@@ -290,72 +344,282 @@ class Quat(object):
 
         Args:
             eulerArray (array): Size 3 x n x ... x m
-        """
-        ph1 = eulerArray[0]
-        phi = eulerArray[1]
-        ph2 = eulerArray[2]
-        oriShape = eulerArray.shape[1:]
 
-        quatComps = np.zeros((4,) + oriShape, dtype=float)
+        Returns:
+            QuatArray: Quats of shape n x ... x m
+        """
+        return QuatArray.fromEulerAngles(eulerArray)
 
-        quatComps[0] = np.cos(phi / 2.0) * np.cos((ph1 + ph2) / 2.0)
-        quatComps[1] = -np.sin(phi / 2.0) * np.cos((ph1 - ph2) / 2.0)
-        quatComps[2] = -np.sin(phi / 2.0) * np.sin((ph1 - ph2) / 2.0)
-        quatComps[3] = -np.cos(phi / 2.0) * np.sin((ph1 + ph2) / 2.0)
+    @staticmethod
+    def productMatrices(opComps, opOnLeft=True):
+        """Matrices of the linear maps taking quat components x to the
+        product op * x (or x * op) for each operator quat.
 
-        quats = np.empty(oriShape, dtype=Quat)
+        Args:
+            opComps (np.ndarray): Components of the operators, shape
+                (nOps, 4)
+            opOnLeft (bool, optional): Operators multiply from the left
 
-        for idx in np.ndindex(oriShape):
-            quats[idx] = Quat(quatComps[(slice(None),) + idx])
-            # quatComps[(slice(None),) + idx] is equivalent to quatComps[:, idx[0], ..., idx[n]]
+        Returns:
+            np.ndarray: Matrices of shape (nOps, 4, 4)
+        """
+        o0, o1, o2, o3 = np.asarray(opComps, dtype=float).T
+        if opOnLeft:
+            rows = [[o0, -o1, -o2, -o3],
+                    [o1, o0, -o3, o2],
+                    [o2, o3, o0, -o1],
+                    [o3, -o2, o1, o0]]
+        else:
+            rows = [[o0, -o1, -o2, -o3],
+                    [o1, o0, o3, -o2],
+                    [o2, -o3, o0, o1],
+                    [o3, o2, -o1, o0]]
 
-        return quats
+        return np.array(rows).transpose((2, 0, 1))
 
     @staticmethod
-    def calcSymEqvs(quats, symGroup, dtype=np.float):
-        syms = Quat.symEqv(symGroup)
-        quatComps = np.empty((len(syms), 4, len(quats)), dtype=dtype)
+    def calcProducts(opComps, quatComps, opOnLeft=True, out=None,
+                     chunkSize=None):
+        """Quaternion products of a small set of operator quats (e.g.
+        crystal symmetries) with an array of quats. All operators are
+        applied to each chunk of quats with a single matrix product and
+        results are swapped into the positive hemisphere.
 
-        # store quat components in array
-        for i, quat in enumerate(quats):
-            quatComps[0, :, i] = quat.quatCoef
-
-        # calculate symmetrical equivalents
-        for i, sym in enumerate(syms[1:], start=1):
-            # sym[i] * quat for all points (* is quaternion product)
-            quatComps[i, 0, :] = (quatComps[0, 0, :] * sym[0] - quatComps[0, 1, :] * sym[1] -
-                                  quatComps[0, 2, :] * sym[2] - quatComps[0, 3, :] * sym[3])
-            quatComps[i, 1, :] = (quatComps[0, 0, :] * sym[1] + quatComps[0, 1, :] * sym[0] -
-                                  quatComps[0, 2, :] * sym[3] + quatComps[0, 3, :] * sym[2])
-            quatComps[i, 2, :] = (quatComps[0, 0, :] * sym[2] + quatComps[0, 2, :] * sym[0] -
-                                  quatComps[0, 3, :] * sym[1] + quatComps[0, 1, :] * sym[3])
-            quatComps[i, 3, :] = (quatComps[0, 0, :] * sym[3] + quatComps[0, 3, :] * sym[0] -
-                                  quatComps[0, 1, :] * sym[2] + quatComps[0, 2, :] * sym[1])
+        Args:
+            opComps (np.ndarray): Components of the operators, shape
+                (nOps, 4) or (4,) for a single operator
+            quatComps (np.ndarray): Components of the quats, shape
+                (4, ...)
+            opOnLeft (bool, optional): Calculate op * quat if True,
+                otherwise quat * op
+            out (np.ndarray, optional): C-contiguous array to store the
+                result in, must not overlap quatComps
+            chunkSize (int, optional): Number of quats to process at a
+                time, all at once by default
+
+        Returns:
+            np.ndarray: Components of the products, shape
+                (nOps, 4, ...) or (4, ...) for a single operator
+        """
+        opComps = np.asarray(opComps)
+        singleOp = opComps.ndim == 1
+        opComps = opComps.reshape((-1, 4))
+        numOps = len(opComps)
+
+        quatComps = np.asarray(quatComps)
+        quatShape = quatComps.shape[1:]
+        quatComps = quatComps.reshape((4, -1))
+        numQuats = quatComps.shape[1]
+
+        outShape = (4,) + quatShape if singleOp else (numOps, 4) + quatShape
+        if out is None:
+            out = np.empty(outShape, dtype=np.result_type(quatComps, float))
+        elif out.shape != outShape:
+            raise ValueError("Output array must be of shape {}.".format(outShape))
+        elif not out.flags.c_contiguous:
+            raise ValueError("Output array must be C-contiguous.")
+        outFlat = out.reshape((numOps * 4, numQuats))
+
+        productMatrix = Quat.productMatrices(opComps, opOnLeft=opOnLeft)
+        productMatrix = productMatrix.reshape((numOps * 4, 4))
+
+        if chunkSize is None:
+            chunkSize = max(numQuats, 1)
+        for start in range(0, numQuats, chunkSize):
+            chunkSlice = slice(start, start + chunkSize)
+            outChunk = outFlat[:, chunkSlice]
+            np.matmul(productMatrix, quatComps[:, chunkSlice], out=outChunk)
 
             # swap into positve hemisphere if required
-            quatComps[i, :, quatComps[i, 0, :] < 0] = -quatComps[i, :, quatComps[i, 0, :] < 0]
+            outChunk = outChunk.reshape((numOps, 4, -1))
+            negative = outChunk[:, 0] < 0
+            np.negative(outChunk, out=outChunk, where=negative[:, np.newaxis])
+
+        return out
+
+    @staticmethod
+    def extractQuatComps(quats, dtype=float):
+        """Components of a sequence of quats as an array
+
+        Args:
+            quats (list(Quat) or QuatArray): Quats to extract from
+            dtype (np.dtype, optional): Data type of returned array
+
+        Returns:
+            np.ndarray: Components of shape (4, n)
+        """
+        if isinstance(quats, QuatArray):
+            return quats.quatComps.reshape((4, -1)).astype(dtype, copy=False)
+
+        quatComps = np.empty((4, len(quats)), dtype=dtype)
+        for i, quat in enumerate(quats):
+            quatComps[:, i] = quat.quatCoef
 
         return quatComps
 
     @staticmethod
-    def calcAverageOri(quatComps):
-        avOri = np.copy(quatComps[0, :, 0])
-        currMisOris = np.empty(quatComps.shape[0])
+    def calcSymEqvs(quats, symGroup, dtype=float, out=None,
+                    chunkSize=None):
+        """Calculate all symmetrically equivalent orientations of quats
+
+        Args:
+            quats (list(Quat) or QuatArray): Orientations
+            symGroup (str): Crystal type (cubic, hexagonal)
+            dtype (np.dtype, optional): Data type of returned array
+            out (np.ndarray, optional): Array to store the result in,
+                of shape (nSym, 4, n)
+            chunkSize (int, optional): Number of quats to process at a
+                time
+
+        Returns:
+            np.ndarray: Components of the equivalents of shape
+                (nSym, 4, n). The first symmetry is the identity.
+        """
+        syms = Quat.symEqvArray(symGroup)
+        quatComps = Quat.extractQuatComps(quats, dtype=dtype)
+
+        if out is None:
+            out = np.empty((len(syms), 4, quatComps.shape[1]), dtype=dtype)
+
+        # sym[i] * quat for all points (* is quaternion product)
+        return Quat.calcProducts(syms, quatComps, out=out, chunkSize=chunkSize)
+
+    @staticmethod
+    def calcAverageOri(quatComps, numIterations=5):
+        """Calculate the average orientation of a set of orientations.
+        The symmetric equivalent of each orientation closest to the
+        current average is selected, then the average is updated to the
+        quaternion eigen-mean (Markley et al.) of the selection. This is
+        repeated until the selection does not change.
+
+        Args:
+            quatComps (np.ndarray): Components of the orientations and
+                their symmetric equivalents, shape (nSym, 4, n) as
+                returned by `calcSymEqvs`
+            numIterations (int, optional): Maximum number of times to
+                select equivalents
+
+        Returns:
+            Quat: Average orientation
+
+        References:
+            Markley F. L. et al., 'Averaging quaternions', Journal of
+            Guidance, Control, and Dynamics, 30(4) 1193 - 1197
+        """
+        avOri = quatComps[0, :, 0]
+        pointIdxs = np.arange(quatComps.shape[2])
+        prevSymIdxs = None
+
+        for _ in range(numIterations):
+            # find equivalent of each point with min misorientation to
+            # the current average
+            symIdxs = np.argmax(np.abs(np.einsum("ijk,j->ik", quatComps, avOri)), axis=0)
+            if prevSymIdxs is not None and np.array_equal(symIdxs, prevSymIdxs):
+                break
+            prevSymIdxs = symIdxs
+
+            selectedComps = quatComps[symIdxs, :, pointIdxs]
+            avOri = Quat.calcEigenMean(selectedComps.T.dot(selectedComps))
+
+        return Quat(avOri)
+
+    @staticmethod
+    def calcAverageOris(quats, labels, symGroup, numIterations=5,
+                        chunkSize=2**16):
+        """Calculate average orientations of labelled groups of
+        orientations, e.g. the grains of a map, in one batched
+        calculation. The same method as `calcAverageOri` is used for
+        each group.
+
+        Args:
+            quats (QuatArray): Orientations
+            labels (np.ndarray): Integer labels of the same shape as
+                quats. Groups are labelled from 1 and points with labels
+                less than 1 are ignored.
+            symGroup (str): Crystal type (cubic, hexagonal)
+            numIterations (int, optional): Maximum number of times to
+                select equivalents
+            chunkSize (int, optional): Number of orientations to expand
+                into symmetric equivalents at a time
 
-        for i in range(1, quatComps.shape[2]):
-            # calculate misorientation between current average and all symmetrical equivalents
-            # Dot product of each symm quat in quatComps with refOri for point i
-            currMisOris[:] = abs(np.einsum("ij,j->i", quatComps[:, :, i], avOri))
+        Returns:
+            QuatArray: Average orientation of each group, shape
+                (numGroups,). Groups with no points are NaN.
+        """
+        syms = Quat.symEqvArray(symGroup)
+        labels = np.ravel(labels)
+        numGroups = max(int(labels.max(initial=0)), 0)
+
+        # components and zero based labels of points in a group
+        inGroup = labels > 0
+        quatComps = Quat.extractQuatComps(quats)[:, inGroup]
+        labels = labels[inGroup] - 1
+        numPoints = len(labels)
+
+        # start from the first point of each group
+        firstIdxs = np.full(numGroups, -1)
+        firstIdxs[labels[::-1]] = np.arange(numPoints)[::-1]
+        avOris = np.full((4, numGroups), np.nan)
+        hasPoints = firstIdxs >= 0
+        avOris[:, hasPoints] = quatComps[:, firstIdxs[hasPoints]]
+
+        selectedComps = np.empty((4, numPoints))
+        symIdxs = np.empty(numPoints, dtype=np.intp)
+        prevSymIdxs = None
+
+        # unique elements of the 4x4 sums of outer products
+        rowIdxs, colIdxs = np.triu_indices(4)
+
+        for _ in range(numIterations):
+            # find equivalent of each point with min misorientation to
+            # the current average of its group
+            for start in range(0, numPoints, chunkSize):
+                chunkSlice = slice(start, start + chunkSize)
+                quatCompsSym = Quat.calcProducts(syms, quatComps[:, chunkSlice])
+                misOris = np.abs(np.einsum("ijk,jk->ik", quatCompsSym,
+                                           avOris[:, labels[chunkSlice]]))
+                symIdxs[chunkSlice] = np.argmax(misOris, axis=0)
+                selectedComps[:, chunkSlice] = quatCompsSym[
+                    symIdxs[chunkSlice], :, np.arange(quatCompsSym.shape[2])
+                ].T
+
+            if prevSymIdxs is not None and np.array_equal(symIdxs, prevSymIdxs):
+                break
+            prevSymIdxs = symIdxs.copy()
+
+            # sum outer products of the selected equivalents in each group
+            outerSums = np.empty((numGroups, 4, 4))
+            for row, col in zip(rowIdxs, colIdxs):
+                outerSums[:, row, col] = np.bincount(
+                    labels, weights=selectedComps[row] * selectedComps[col],
+                    minlength=numGroups
+                )
+                outerSums[:, col, row] = outerSums[:, row, col]
+
+            avOris[:, hasPoints] = Quat.calcEigenMean(outerSums[hasPoints]).T
+
+        return QuatArray(avOris)
 
-            # find min misorientation with current average then add to it
-            maxIdx = np.argmax(currMisOris[:])
-            avOri += quatComps[maxIdx, :, i]
+    @staticmethod
+    def calcEigenMean(outerSums):
+        """Quaternion eigen-mean from sums of outer products of
+        quaternion components. This is the eigenvector with the largest
+        eigenvalue, which is independent of the sign of each quaternion.
 
-        # Convert components back to a quat and normalise
-        avOri = Quat(avOri)
-        avOri.normalise()
+        Args:
+            outerSums (np.ndarray): Sums of outer products, shape
+                (..., 4, 4)
 
-        return avOri
+        Returns:
+            np.ndarray: Components of the means, in the positive
+                hemisphere, shape (..., 4)
+        """
+        # eigenvalues are returned in ascending order
+        _, eigVecs = np.linalg.eigh(outerSums)
+        avOris = eigVecs[..., -1]
+        avOris *= np.where(avOris[..., 0] < 0, -1, 1)[..., np.newaxis]
+
+        return avOris
 
     @staticmethod
     def calcMisOri(quatComps, refOri):
@@ -375,6 +639,166 @@ class Quat(object):
 
         return minMisOris, minQuatComps
 
+    @staticmethod
+    def calcMisOris(quats1, quats2, symGroup, returnQuat=False,
+                    returnAxis=False, pairwise=False, chunkSize=2**16):
+        """Calculate misorientations between arrays of orientations
+        taking into account the symmetries of the crystal structure.
+        Angle is 2*arccos(output).
+
+        Args:
+            quats1 (Quat, QuatArray, list(Quat) or np.ndarray):
+                Orientations, arrays of components are shape (4, ...)
+            quats2 (Quat, QuatArray, list(Quat) or np.ndarray):
+                Orientations to find misorientation to, broadcastable
+                with quats1
+            symGroup (str): Crystal type (cubic, hexagonal)
+            returnQuat (bool, optional): Also return the symmetric
+                equivalents of quats2 with min misorientation
+            returnAxis (bool, optional): Also return the misorientation
+                axes, calculated as in `misOriAxis` from the equivalents
+            pairwise (bool, optional): Calculate misorientation between
+                every pair of quats1 and quats2, giving shape (N, M)
+            chunkSize (int, optional): Approximate number of pairs to
+                calculate at a time
+
+        Returns:
+            various: Misorientations, followed by a QuatArray of the
+                equivalents if returnQuat and an array of axes of shape
+                (3, ...) if returnAxis.
+        """
+        def toComps(quats):
+            if isinstance(quats, QuatArray):
+                return quats.quatComps
+            if isinstance(quats, Quat):
+                return quats.quatCoef
+            if isinstance(quats, np.ndarray) and quats.dtype != object:
+                return quats
+            return Quat.extractQuatComps(quats)
+
+        a = toComps(quats1)
+        b = toComps(quats2)
+        if pairwise:
+            a = a.reshape((4, -1))[:, :, np.newaxis]
+            b = b.reshape((4, -1))[:, np.newaxis, :]
+
+        shape = np.broadcast(a[0], b[0]).shape
+        # broadcast to the same shape with at least 1 dimension, to
+        # chunk over the first
+        workShape = shape or (1,)
+        a, b = [np.broadcast_to(
+            comps.reshape((4,) + (1,) * (len(workShape) - comps.ndim + 1) + comps.shape[1:]),
+            (4,) + workShape
+        ) for comps in (a, b)]
+
+        misOris = np.empty(a.shape[1:])
+        if returnQuat:
+            minQuatComps = np.empty(a.shape)
+        if returnAxis:
+            misOriAxes = np.empty((3,) + a.shape[1:])
+
+        rowSize = int(np.prod(a.shape[2:]))
+        rowsPerChunk = max(chunkSize // max(rowSize, 1), 1)
+        syms = Quat.symEqvArray(symGroup)
+
+        for start in range(0, a.shape[1], rowsPerChunk):
+            chunk = slice(start, start + rowsPerChunk)
+            aChunk = a[:, chunk]
+            bChunk = b[:, chunk]
+
+            if not (returnQuat or returnAxis):
+                Quat.calcDisorientation(aChunk, bChunk, symGroup,
+                                        out=misOris[chunk])
+                continue
+
+            # symmetric equivalents of relative rotation q2 * conj(q1),
+            # selecting the one with min misorientation
+            Dq = QuatArray(bChunk) * QuatArray(aChunk).conjugate
+            DqSym = Quat.calcProducts(syms, Dq.quatComps)
+            symIdxs = np.argmax(np.abs(DqSym[:, 0]), axis=0)
+            Dq = np.take_along_axis(DqSym, symIdxs[np.newaxis, np.newaxis], axis=0)[0]
+
+            misOris[chunk] = np.minimum(Dq[0], 1)
+
+            if returnQuat:
+                # equivalent of q2 is Dq * q1
+                minQuatComps[:, chunk] = (QuatArray(Dq) * QuatArray(aChunk)).quatComps
+
+            if returnAxis:
+                sinHalfAngle = np.sqrt(np.maximum(1 - Dq[0]**2, 0))
+                misOriAxes[:, chunk] = np.divide(
+                    2 * Dq[1:4] * np.arccos(misOris[chunk]), sinHalfAngle,
+                    out=np.zeros_like(Dq[1:4]), where=sinHalfAngle > 0
+                )
+
+        outputs = [misOris.reshape(shape)]
+        if returnQuat:
+            outputs.append(QuatArray(minQuatComps.reshape((4,) + shape)))
+        if returnAxis:
+            outputs.append(misOriAxes.reshape((3,) + shape))
+
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+    @staticmethod
+    def calcDisorientation(quatComps1, quatComps2, symGroup, out=None):
+        """Calculate the minimum misorientation between orientations
+        taking into account the symmetries of the crystal structure.
+        The fundamental zone reduction is applied directly to the
+        relative rotation, so the symmetrical equivalents are never
+        formed. Angle is 2*arccos(output).
+
+        Args:
+            quatComps1 (np.ndarray): Components of the first
+                orientations, shape (4, ...)
+            quatComps2 (np.ndarray): Components of the second
+                orientations, broadcastable with quatComps1
+            symGroup (str): Crystal type (cubic, hexagonal)
+            out (np.ndarray, optional): Array to store the result in
+
+        Returns:
+            np.ndarray: Cosine of half the minimum misorientation angle
+        """
+        a = np.asarray(quatComps1)
+        b = np.asarray(quatComps2)
+
+        # absolute components of the relative rotation q2 * conj(q1)
+        shape = np.broadcast(a[0], b[0]).shape
+        d = np.empty((4,) + shape)
+        d[0] = a[0] * b[0] + a[1] * b[1] + a[2] * b[2] + a[3] * b[3]
+        d[1] = a[0] * b[1] - a[1] * b[0] + a[2] * b[3] - a[3] * b[2]
+        d[2] = a[0] * b[2] - a[2] * b[0] + a[3] * b[1] - a[1] * b[3]
+        d[3] = a[0] * b[3] - a[3] * b[0] + a[1] * b[2] - a[2] * b[1]
+        np.abs(d, out=d)
+
+        if out is None:
+            out = np.empty(shape)
+
+        if symGroup == 'cubic':
+            # the symmetries give candidates of the largest component,
+            # the largest 2 over root 2 and half the sum of all 4
+            d.sort(axis=0)
+            np.add(d[3], d[2], out=d[2])
+            np.add(d[1], d[0], out=d[0])
+            np.add(d[0], d[2], out=d[0])
+            np.maximum(d[3], d[2] / np.sqrt(2), out=out)
+            np.maximum(out, d[0] / 2, out=out)
+
+        elif symGroup == 'hexagonal':
+            # the hexads act on components (0, 3) and the diads on
+            # (1, 2), each giving candidates at 30 degree intervals
+            for i, j in [(0, 3), (1, 2)]:
+                u = np.maximum(d[i], d[j])
+                v = np.minimum(d[i], d[j], out=d[j])
+                np.maximum(u, (np.sqrt(3) * u + v) / 2, out=d[i])
+            np.maximum(d[0], d[1], out=out)
+
+        else:
+            out[...] = d[0]
+
+        np.minimum(out, 1, out=out)
+
+        return out
+
     @staticmethod
     def polarAngles(x, y, z):      # spherical coordinates as per Wikipedia
         mod = np.sqrt(x**2 + y**2 + z**2)
@@ -389,7 +813,7 @@ class Quat(object):
 
         return alpha, beta
 
-    @staticmethod
+    @InstanceDispatch(_plotIPF)
     def plotIPF(quats, direction, symGroup, projection=None,
                 plot=None, fig=None, ax=None, makeInteractive=False,
                 plotColourBar=False, cLabel="",
@@ -436,96 +860,264 @@ class Quat(object):
         return plot
 
     @staticmethod
-    def calcIPFcolours(quats, direction, symGroup):
-        numQuats = len(quats)
-
-        # Calculating as float32 seems to speed this up
-        alphaFund, betaFund = Quat.calcFundDirs(quats, direction, symGroup, dtype=np.float32)
-
-        # revert to cartesians
-        # at some this should be changed to have the quats dimention
-        # last to fit with numpys row major storage direction vector in
-        # cartesians. Changes this to float32 causes errors in arccos,
-        # so leave to default to 64
-        dirvec = np.empty((numQuats, 3))
+    def calcIPFcolours(quats, direction, symGroup, chunkSize=2**16,
+                       numThreads=None, out=None, useLUT=False):
+        """Calculate IPF colours of orientations. Orientations are
+        processed in chunks on a pool of threads, so temporary arrays
+        are only allocated for a chunk at a time. With `useLUT` colours
+        are interpolated from a table over the fundamental triangle,
+        instead of being calculated for each pole.
+
+        Args:
+            quats (list(Quat) or QuatArray): Orientations
+            direction (np.array): Vector of reference direction for the
+                IPF
+            symGroup (str): Crystal type (cubic, hexagonal)
+            chunkSize (int, optional): Number of orientations in each
+                chunk
+            numThreads (int, optional): Number of threads to use,
+                defaults to the number of CPUs
+            out (np.ndarray, optional): C-contiguous array to store the
+                colours in
+            useLUT (bool, optional): Interpolate colours from a lookup
+                table, see `calcIPFcolourLUT`
+
+        Returns:
+            np.ndarray: RGB colours of shape (..., 3), where ... is
+                the shape of the QuatArray or the length of the list
+        """
+        quatComps = Quat.extractQuatComps(quats)
+        numQuats = quatComps.shape[1]
+
+        if isinstance(quats, QuatArray):
+            outShape = quats.shape + (3,)
+        else:
+            outShape = (numQuats, 3)
+        if out is None:
+            out = np.empty(outShape)
+        elif out.shape != outShape:
+            raise ValueError("Output array must be of shape {}.".format(outShape))
+        elif not out.flags.c_contiguous:
+            raise ValueError("Output array must be C-contiguous.")
+        outFlat = out.reshape((numQuats, 3))
+
+        if numThreads is None:
+            numThreads = os.cpu_count() or 1
+
+        def calcChunk(start):
+            chunkSlice = slice(start, start + chunkSize)
+            # Calculating as float32 seems to speed this up
+            alphaFund, betaFund = Quat.calcFundDirs(
+                QuatArray(quatComps[:, chunkSlice]), direction, symGroup,
+                dtype=np.float32
+            )
+            if useLUT:
+                Quat.interpIPFcolours(alphaFund, betaFund, symGroup,
+                                      out=outFlat[chunkSlice])
+            else:
+                Quat.calcIPFcoloursFromPoles(alphaFund, betaFund,
+                                             out=outFlat[chunkSlice])
+
+        starts = range(0, numQuats, chunkSize)
+        if numThreads > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=numThreads) as executor:
+                # consume results to raise any exceptions
+                list(executor.map(calcChunk, starts))
+        else:
+            for start in starts:
+                calcChunk(start)
+
+        return out
+
+    @staticmethod
+    def calcIPFcoloursFromPoles(alphaFund, betaFund, out=None):
+        """Calculate IPF colours of poles in the fundamental triangle.
+        Converted from Stephen Cluff's IPF_rgbcalc.m (BYU).
+
+        Args:
+            alphaFund (np.ndarray): Polar angles of the poles
+            betaFund (np.ndarray): Azimuthal angles of the poles
+            out (np.ndarray, optional): Array to store the colours in
+
+        Returns:
+            np.ndarray: RGB colours of shape (n, 3)
+        """
+        numPoles = len(alphaFund)
+        if out is None:
+            out = np.empty((numPoles, 3))
+
+        # revert to cartesians. Changes this to float32 causes errors
+        # in arccos, so leave to default to 64
+        dirvec = np.empty((numPoles, 3))
         dirvec[:, 0] = np.sin(alphaFund) * np.cos(betaFund)
         dirvec[:, 1] = np.sin(alphaFund) * np.sin(betaFund)
         dirvec[:, 2] = np.cos(alphaFund)
-        rvect = np.matlib.repmat([0., 0., 1.], numQuats, 1)
-        gvect = np.matlib.repmat([1., 0., 1.] / np.sqrt(2), numQuats, 1)
-        bvect = np.matlib.repmat([1., 1., 1.] / np.sqrt(3), numQuats, 1)
-        rgb = np.zeros((numQuats, 3))
-
-        # Red Component; these subroutines are converted from
-        # Stephen Cluff's IPF_rgbcalc.m (BYU)
-        RDirPlane = np.cross(dirvec, rvect)
-        GBplane = np.cross(bvect, gvect)
-        Rintersect = np.cross(RDirPlane, GBplane)
-        NORM = np.sqrt(np.power(Rintersect[:, 0], 2) + np.power(Rintersect[:, 1], 2) + np.power(Rintersect[:, 2], 2))
-        Rintersect[NORM != 0, :] = np.divide(Rintersect[NORM != 0, :], np.transpose(np.matlib.repmat(NORM[NORM != 0], 3, 1)))
-
-        temp = np.arccos(np.einsum("ij,ij->i", dirvec, Rintersect))
-        Rintersect[temp > (np.pi / 2), :] = Rintersect[temp > (np.pi / 2), :] * -1
-        rgb[:, 0] = np.divide(np.arccos(np.einsum("ij,ij->i", dirvec, Rintersect)), np.arccos(np.einsum("ij,ij->i", rvect, Rintersect)))
-
-        # Green Component
-        GDirPlane = np.cross(dirvec, gvect)
-        RBplane = np.cross(rvect, bvect)
-        Gintersect = np.cross(GDirPlane, RBplane)
-        NORM = np.sqrt(np.power(Gintersect[:, 0], 2) + np.power(Gintersect[:, 1], 2) + np.power(Gintersect[:, 2], 2))
-        Gintersect[NORM != 0, :] = np.divide(Gintersect[NORM != 0, :], np.transpose(np.matlib.repmat(NORM[NORM != 0], 3, 1)))
-
-        temp = np.arccos(np.einsum("ij,ij->i", dirvec, Gintersect))
-        Gintersect[temp > (np.pi / 2), :] = Gintersect[temp > (np.pi / 2), :] * -1
-        rgb[:, 1] = np.divide(np.arccos(np.einsum("ij,ij->i", dirvec, Gintersect)), np.arccos(np.einsum("ij,ij->i", gvect, Gintersect)))
-
-        # Blue Component
-        BDirPlane = np.cross(dirvec, bvect)
-        RGplane = np.cross(gvect, rvect)
-        Bintersect = np.cross(BDirPlane, RGplane)
-        NORM = np.sqrt(np.power(Bintersect[:, 0], 2) + np.power(Bintersect[:, 1], 2) + np.power(Bintersect[:, 2], 2))
-        Bintersect[NORM != 0, :] = np.divide(Bintersect[NORM != 0, :], np.transpose(np.matlib.repmat(NORM[NORM != 0], 3, 1)))
-
-        temp = np.arccos(np.einsum("ij,ij->i", dirvec, Bintersect))
-        Bintersect[temp > (np.pi / 2), :] = Bintersect[temp > (np.pi / 2), :] * -1
-        rgb[:, 2] = np.divide(np.arccos(np.einsum("ij,ij->i", dirvec, Bintersect)), np.arccos(np.einsum("ij,ij->i", bvect, Bintersect)))
-
-        rgb = np.divide(rgb, np.transpose(np.matlib.repmat(np.amax(rgb, 1), 3, 1)))
-
-        return rgb
+
+        # poles of the red, green and blue corners of the triangle
+        cornerVects = np.array([[0., 0., 1.],
+                                [1. / np.sqrt(2), 0., 1. / np.sqrt(2)],
+                                [1. / np.sqrt(3), 1. / np.sqrt(3), 1. / np.sqrt(3)]])
+
+        for i, cornerVect in enumerate(cornerVects):
+            # intersection of the plane containing the corner and pole
+            # with the opposite edge of the triangle
+            dirPlane = np.cross(dirvec, cornerVect)
+            edgePlane = np.cross(cornerVects[(i + 2) % 3], cornerVects[(i + 1) % 3])
+            intersect = np.cross(dirPlane, edgePlane)
+            norm = np.sqrt(np.einsum("ij,ij->i", intersect, intersect))
+            nonZero = norm != 0
+            intersect[nonZero] /= norm[nonZero, np.newaxis]
+
+            dirDotIntersect = np.clip(np.einsum("ij,ij->i", dirvec, intersect), -1, 1)
+            intersect[dirDotIntersect < 0] *= -1
+            np.abs(dirDotIntersect, out=dirDotIntersect)
+
+            out[:, i] = np.arccos(dirDotIntersect) / np.arccos(
+                np.clip(intersect.dot(cornerVect), -1, 1)
+            )
+
+        out /= np.amax(out, axis=1)[:, np.newaxis]
+
+        return out
 
     @staticmethod
-    def calcFundDirs(quats, direction, symGroup, dtype=np.float):
+    def calcIPFcolourLUT(symGroup, resolution=0.25):
+        """Lookup table of IPF colours on a regular grid of polar and
+        azimuthal angles covering the fundamental triangle. The table is
+        calculated once for each symmetry and resolution and is
+        read-only.
+
+        Args:
+            symGroup (str): Crystal type (cubic, hexagonal)
+            resolution (float, optional): Grid spacing in degrees
+
+        Returns:
+            np.ndarray: RGB colours of shape (numAlpha, numBeta, 3),
+                at polar angles i * resolution and azimuthal angles
+                j * resolution
+        """
+        try:
+            return _ipfColourLUTs[symGroup, resolution]
+        except KeyError:
+            pass
+
+        # maximum angles of poles in the fundamental triangle
+        if symGroup == "cubic":
+            alphaMax = np.arccos(1 / np.sqrt(3))
+            betaMax = np.pi / 4
+        elif symGroup == "hexagonal":
+            alphaMax = np.pi / 2
+            betaMax = np.pi / 6
+        else:
+            raise Exception("symGroup must be cubic or hexagonal")
+
+        step = resolution * np.pi / 180
+        # extend by a point to bracket the edges of the triangle
+        numAlpha = int(np.ceil(alphaMax / step)) + 2
+        numBeta = int(np.ceil(betaMax / step)) + 2
+        alphaGrid, betaGrid = np.meshgrid(np.arange(numAlpha) * step,
+                                          np.arange(numBeta) * step,
+                                          indexing='ij')
+
+        colourLUT = Quat.calcIPFcoloursFromPoles(alphaGrid.ravel(),
+                                                 betaGrid.ravel())
+        colourLUT = colourLUT.reshape((numAlpha, numBeta, 3))
+        colourLUT.flags.writeable = False
+        _ipfColourLUTs[symGroup, resolution] = colourLUT
+
+        return colourLUT
+
+    @staticmethod
+    def interpIPFcolours(alphaFund, betaFund, symGroup, resolution=0.25,
+                         out=None):
+        """Calculate IPF colours of poles in the fundamental triangle by
+        bilinear interpolation in a lookup table.
+
+        Args:
+            alphaFund (np.ndarray): Polar angles of the poles
+            betaFund (np.ndarray): Azimuthal angles of the poles
+            symGroup (str): Crystal type (cubic, hexagonal)
+            resolution (float, optional): Grid spacing of the table in
+                degrees
+            out (np.ndarray, optional): Array to store the colours in
+
+        Returns:
+            np.ndarray: RGB colours of shape (n, 3)
+        """
+        colourLUT = Quat.calcIPFcolourLUT(symGroup, resolution=resolution)
+        if out is None:
+            out = np.empty((len(alphaFund), 3))
+
+        step = resolution * np.pi / 180
+        numAlpha, numBeta = colourLUT.shape[:2]
+
+        # index of the grid cell containing each pole and the position
+        # inside the cell
+        alphaPos = np.clip(alphaFund / step, 0, numAlpha - 1)
+        i = np.minimum(alphaPos.astype(np.intp), numAlpha - 2)
+        fa = (alphaPos - i)[:, np.newaxis]
+        betaPos = np.clip(betaFund / step, 0, numBeta - 1)
+        j = np.minimum(betaPos.astype(np.intp), numBeta - 2)
+        fb = (betaPos - j)[:, np.newaxis]
+
+        # colours at the corners of the cells
+        colourLUT = colourLUT.reshape((-1, 3))
+        cellIdxs = i * numBeta + j
+        c00 = np.take(colourLUT, cellIdxs, axis=0)
+        c01 = np.take(colourLUT, cellIdxs + 1, axis=0)
+        c10 = np.take(colourLUT, cellIdxs + numBeta, axis=0)
+        c11 = np.take(colourLUT, cellIdxs + numBeta + 1, axis=0)
+
+        out[...] = c00 + fb * (c01 - c00)
+        out += fa * (c10 + fb * (c11 - c10) - out)
+        out /= np.amax(out, axis=1)[:, np.newaxis]
+
+        # colours are not continuous everywhere in the table, calculate
+        # poles in cells with a jump in colour directly
+        cellRange = np.maximum(np.maximum(c00, c01), np.maximum(c10, c11))
+        cellRange -= np.minimum(np.minimum(c00, c01), np.minimum(c10, c11))
+        jumps = np.amax(cellRange, axis=1) > 0.1
+        if np.any(jumps):
+            out[jumps] = Quat.calcIPFcoloursFromPoles(alphaFund[jumps], betaFund[jumps])
+
+        return out
+
+    @staticmethod
+    def calcFundDirs(quats, direction, symGroup, dtype=float):
         # convert direction to float array
         direction = np.array(direction, dtype=dtype)
 
-        # get array of symmetry operations. shape - (numSym, 4, numQuats)
-        quatCompsSym = Quat.calcSymEqvs(quats, symGroup, dtype=dtype)
-
-        # array to store crytal directions for all orientations and symmetries
-        directionCrystal = np.empty((3, quatCompsSym.shape[0], quatCompsSym.shape[2]), dtype=dtype)
+        # quat components of orientations. shape - (4, numQuats)
+        quatComps = Quat.extractQuatComps(quats, dtype=dtype)
 
         # temp variables to use bleow
-        quatDotVec = (quatCompsSym[:, 1, :] * direction[0] +
-                      quatCompsSym[:, 2, :] * direction[1] +
-                      quatCompsSym[:, 3, :] * direction[2])
-        temp = (np.square(quatCompsSym[:, 0, :]) - np.square(quatCompsSym[:, 1, :]) -
-                np.square(quatCompsSym[:, 2, :]) - np.square(quatCompsSym[:, 3, :]))
-
-        # transform the pole direction to crystal coords for all orientations and symmetries
-        # (quatCompsSym * vectorQuat) * quatCompsSym.conjugate
-        directionCrystal[0, :, :] = (2 * quatDotVec * quatCompsSym[:, 1, :] +
-                                     temp * direction[0] +
-                                     2 * quatCompsSym[:, 0, :] * (quatCompsSym[:, 2, :] * direction[2] -
-                                                                  quatCompsSym[:, 3, :] * direction[1]))
-        directionCrystal[1, :, :] = (2 * quatDotVec * quatCompsSym[:, 2, :] +
-                                     temp * direction[1] +
-                                     2 * quatCompsSym[:, 0, :] * (quatCompsSym[:, 3, :] * direction[0] -
-                                                                  quatCompsSym[:, 1, :] * direction[2]))
-        directionCrystal[2, :, :] = (2 * quatDotVec * quatCompsSym[:, 3, :] +
-                                     temp * direction[2] +
-                                     2 * quatCompsSym[:, 0, :] * (quatCompsSym[:, 1, :] * direction[1] -
-                                                                  quatCompsSym[:, 2, :] * direction[0]))
+        quatDotVec = (quatComps[1] * direction[0] +
+                      quatComps[2] * direction[1] +
+                      quatComps[3] * direction[2])
+        temp = (np.square(quatComps[0]) - np.square(quatComps[1]) -
+                np.square(quatComps[2]) - np.square(quatComps[3]))
+
+        # transform the pole direction to crystal coords for all orientations
+        # (quatComps * vectorQuat) * quatComps.conjugate
+        directionCrystal = np.empty((3, quatComps.shape[1]), dtype=dtype)
+        directionCrystal[0] = (2 * quatDotVec * quatComps[1] +
+                               temp * direction[0] +
+                               2 * quatComps[0] * (quatComps[2] * direction[2] -
+                                                   quatComps[3] * direction[1]))
+        directionCrystal[1] = (2 * quatDotVec * quatComps[2] +
+                               temp * direction[1] +
+                               2 * quatComps[0] * (quatComps[3] * direction[0] -
+                                                   quatComps[1] * direction[2]))
+        directionCrystal[2] = (2 * quatDotVec * quatComps[3] +
+                               temp * direction[2] +
+                               2 * quatComps[0] * (quatComps[1] * direction[1] -
+                                                   quatComps[2] * direction[0]))
+
+        # apply the symmetries to the crystal directions, this is
+        # equivalent to transforming by the symmetric equivalents of
+        # the orientations. shape - (3, numSym, numQuats)
+        symMatrices = Quat.symEqvMatrices(symGroup).astype(dtype)
+        directionCrystal = np.matmul(symMatrices, directionCrystal).transpose((1, 0, 2))
 
         # normalise vectors
         directionCrystal /= np.sqrt(np.einsum('ijk,ijk->jk', directionCrystal, directionCrystal))
@@ -538,110 +1130,472 @@ class Quat(object):
 
         # find the poles in the fundamental triangle
         if symGroup == "cubic":
-            # first beta should be between 0 and 45 deg leaving 3 symmetric equivalents per orientation
-            trialPoles = np.logical_and(beta >= 0, beta <= np.pi / 4)
+            # first beta should be between 0 and 45 deg leaving 3
+            # symmetric equivalents per orientation
+            betaMax = np.pi / 4
+            numTrialPoles = 3
+        elif symGroup == "hexagonal":
+            # first beta should be between 0 and 30 deg leaving 1
+            # symmetric equivalent per orientation
+            betaMax = np.pi / 6
+            numTrialPoles = 1
+        else:
+            raise Exception("symGroup must be cubic or hexagonal")
 
-            # if less than 3 left need to expand search slighly to catch edge cases
-            if np.sum(np.sum(trialPoles, axis=0) < 3) > 0:
-                deltaBeta = 1e-8
-                trialPoles = np.logical_and(beta >= -deltaBeta, beta <= np.pi / 4 + deltaBeta)
+        # distance of beta outside of the range, negative if inside
+        betaDist = np.maximum(-beta, beta - betaMax)
+        trialPoles = betaDist <= 0
+
+        # if less left than expected need to expand search slighly to
+        # catch edge cases
+        tooFew = np.sum(trialPoles, axis=0) < numTrialPoles
+        if np.any(tooFew):
+            deltaBeta = 1e-8
+            trialPoles[:, tooFew] = betaDist[:, tooFew] <= deltaBeta
+
+            # fall back to the poles closest to the range so there is
+            # always at least one
+            noneFound = ~np.any(trialPoles, axis=0)
+            if np.any(noneFound):
+                closest = betaDist[:, noneFound]
+                trialPoles[:, noneFound] = closest == np.min(closest, axis=0)
+
+        # now of symmetric equivalents left we want the one with minimum alpha
+        poleIdxs = np.argmin(np.where(trialPoles, alpha, np.inf), axis=0)[np.newaxis]
+        alphaFund = np.take_along_axis(alpha, poleIdxs, axis=0)[0]
+        betaFund = np.take_along_axis(beta, poleIdxs, axis=0)[0]
 
-            # create array to store angles of pols in fundermental triangle
-            alphaFund, betaFund = np.empty((quatCompsSym.shape[2])), np.empty((quatCompsSym.shape[2]))
+        return alphaFund, betaFund
 
-            # now of symmetric equivalents left we want the one with minimum alpha
-            # loop over different orientations
-            # this seems quite slow so might be worth finding a different way to do it
-            for i in range(trialPoles.shape[1]):
-                # create array of indexes of poles kept in previous step
-                trialPoleIdxs = np.arange(trialPoles.shape[0])[trialPoles[:, i]]
+    @staticmethod
+    def symEqv(group):
+        """Quats of the symmetry operators of a crystal group. New
+        objects are created on each call, use `symEqvArray` in
+        calculations.
 
-                # find pole with minimum alpha of those kept in previous step
-                # then use trialPoleIdxs to get its index in original arrays
-                poleIdx = trialPoleIdxs[np.argmin(alpha[trialPoles[:, i], i])]
+        Args:
+            group (str): Crystal type (cubic, hexagonal)
 
-                # add to final array of poles
-                alphaFund[i] = alpha[poleIdx, i]
-                betaFund[i] = beta[poleIdx, i]
+        Returns:
+            list(Quat): Symmetry operators, starting with the identity
+        """
+        return [Quat(symComps) for symComps in Quat.symEqvArray(group)]
 
-        elif symGroup == "hexagonal":
-            # first beta should be between 0 and 30 deg leaving 1 symmetric equivalent per orientation
-            trialPoles = np.logical_and(beta >= 0, beta <= np.pi / 6)
+    @staticmethod
+    def symEqvArray(group):
+        """Components of the symmetry operators of a crystal group.
+        The array is built once per group and is read-only.
+
+        Args:
+            group (str): Crystal type (cubic, hexagonal)
 
-            # if less than 1 left need to expand search slighly to catch edge cases
-            if np.sum(np.sum(trialPoles, axis=0) < 1) > 0:
-                deltaBeta = 1e-8
-                trialPoles = np.logical_and(beta >= -deltaBeta, beta <= np.pi / 6 + deltaBeta)
+        Returns:
+            np.ndarray: Components of shape (nSym, 4), starting with the
+                identity
+        """
+        try:
+            return _symEqvArrays[group]
+        except KeyError:
+            symComps = _buildSymEqvArray(group)
+            symComps.flags.writeable = False
+            _symEqvArrays[group] = symComps
+            return symComps
 
-            alphaFund = alpha[trialPoles]
-            betaFund = beta[trialPoles]
+    @staticmethod
+    def symEqvMatrices(group):
+        """Rotation matrices of the symmetry operators of a crystal
+        group, matching the order of `symEqvArray`. The array is built
+        once per group and is read-only.
 
-        else:
-            raise Exception("symGroup must be cubic or hexagonal")
+        Args:
+            group (str): Crystal type (cubic, hexagonal)
 
-        return alphaFund, betaFund
+        Returns:
+            np.ndarray: Rotation matrices of shape (nSym, 3, 3)
+        """
+        try:
+            return _symEqvMatrices[group]
+        except KeyError:
+            symComps = Quat.symEqvArray(group)
+            symMatrices = np.ascontiguousarray(
+                QuatArray(symComps.T.copy()).rotMatrix().transpose((2, 0, 1))
+            )
+            symMatrices.flags.writeable = False
+            _symEqvMatrices[group] = symMatrices
+            return symMatrices
+
+
+# Symmetry operators cached per crystal group
+_symEqvArrays = {}
+_symEqvMatrices = {}
+
+# IPF colour lookup tables cached per crystal group and resolution
+_ipfColourLUTs = {}
+
+
+def _buildSymEqvArray(group):
+    """Build the (nSym, 4) array of symmetry operator components of a
+    crystal group. Use `Quat.symEqvArray` for the cached version.
+    """
+    overRoot2 = np.sqrt(2) / 2
+    sqrt3over2 = np.sqrt(3) / 2
+    qsym = []
+    # identity - this should always be returned as the first symmetry
+    qsym.append([1.0, 0.0, 0.0, 0.0])
+
+    # from Pete Bate's fspl_orir.f90 code
+    # checked for consistency with mtex
+    # cubic tetrads(100)
+    qsym.append([overRoot2, overRoot2, 0.0, 0.0])
+    qsym.append([0.0, 1.0, 0.0, 0.0])
+    qsym.append([overRoot2, -overRoot2, 0.0, 0.0])
+
+    qsym.append([overRoot2, 0.0, overRoot2, 0.0])
+    qsym.append([0.0, 0.0, 1.0, 0.0])
+    qsym.append([overRoot2, 0.0, -overRoot2, 0.0])
+
+    qsym.append([overRoot2, 0.0, 0.0, overRoot2])
+    qsym.append([0.0, 0.0, 0.0, 1.0])
+    qsym.append([overRoot2, 0.0, 0.0, -overRoot2])
+
+    # cubic dyads (110)
+    qsym.append([0.0, overRoot2, overRoot2, 0.0])
+    qsym.append([0.0, -overRoot2, overRoot2, 0.0])
+
+    qsym.append([0.0, overRoot2, 0.0, overRoot2])
+    qsym.append([0.0, -overRoot2, 0.0, overRoot2])
+
+    qsym.append([0.0, 0.0, overRoot2, overRoot2])
+    qsym.append([0.0, 0.0, -overRoot2, overRoot2])
+
+    # cubic triads (111)
+    qsym.append([0.5, 0.5, 0.5, 0.5])
+    qsym.append([0.5, -0.5, -0.5, -0.5])
+
+    qsym.append([0.5, -0.5, 0.5, 0.5])
+    qsym.append([0.5, 0.5, -0.5, -0.5])
+
+    qsym.append([0.5, 0.5, -0.5, 0.5])
+    qsym.append([0.5, -0.5, 0.5, -0.5])
+
+    qsym.append([0.5, 0.5, 0.5, -0.5])
+    qsym.append([0.5, -0.5, -0.5, 0.5])
+
+    # hexagonal hexads
+    qsym.append([sqrt3over2, 0.0, 0.0, 0.5])
+    qsym.append([0.5, 0.0, 0.0, sqrt3over2])
+    qsym.append([0.5, 0.0, 0.0, -sqrt3over2])
+    qsym.append([sqrt3over2, 0.0, 0.0, -0.5])
+
+    # hexagonal diads
+    qsym.append([0.0, -0.5, -sqrt3over2, 0.0])
+    qsym.append([0.0, 0.5, -sqrt3over2, 0.0])
+    qsym.append([0.0, sqrt3over2, -0.5, 0.0])
+    qsym.append([0.0, -sqrt3over2, -0.5, 0.0])
+
+    if group == 'cubic':
+        qsym = qsym[0:24]
+    elif group == 'hexagonal':
+        qsym = [qsym[0], qsym[2], qsym[5], qsym[8]] + qsym[-8:32]
+    else:
+        qsym = [qsym[0]]
+
+    return np.array(qsym, dtype=float)
+
+
+class QuatArray(object):
+    """Array of quaternions stored as a structure of arrays, with the
+    4 components along the first axis of a float array of shape
+    (4, ...). Operations are applied to all quaternions at once.
+    Indexing a single element returns a Quat holding a copy of its
+    components and indexing a range returns a QuatArray that is a view
+    onto this one.
+    """
+
+    def __init__(self, quatComps, copy=False):
+        """
+        Args:
+            quatComps (np.ndarray): Quaternion components, shape
+                (4, ...)
+            copy (bool, optional): Copy the components instead of
+                using the array given
+        """
+        quatComps = np.asarray(quatComps, dtype=float)
+        if copy:
+            quatComps = quatComps.copy()
+        if quatComps.ndim < 1 or quatComps.shape[0] != 4:
+            raise ValueError("Quaternion components must have shape "
+                             "(4, ...).")
+        self.quatComps = quatComps
+
+    @classmethod
+    def fromEulerAngles(cls, eulerArray):
+        """Create an array of quats from an array of Bunge Euler angles
+
+        Args:
+            eulerArray (np.ndarray): Euler angles (in radians), shape
+                (3, ...)
+
+        Returns:
+            QuatArray: Initialised QuatArray object
+        """
+        ph1 = eulerArray[0]
+        phi = eulerArray[1]
+        ph2 = eulerArray[2]
+
+        quatComps = np.empty((4,) + np.shape(ph1), dtype=float)
+
+        cosPhi = np.cos(phi / 2.0)
+        sinPhi = np.sin(phi / 2.0)
+        quatComps[0] = cosPhi * np.cos((ph1 + ph2) / 2.0)
+        quatComps[1] = -sinPhi * np.cos((ph1 - ph2) / 2.0)
+        quatComps[2] = -sinPhi * np.sin((ph1 - ph2) / 2.0)
+        quatComps[3] = -cosPhi * np.sin((ph1 + ph2) / 2.0)
+
+        quatArray = cls(quatComps)
+        quatArray.positiveHemisphere()
+
+        return quatArray
+
+    @classmethod
+    def fromQuats(cls, quats):
+        """Create an array of quats from a sequence of Quat objects
+
+        Args:
+            quats (list(Quat)): Quats to store
+
+        Returns:
+            QuatArray: Initialised QuatArray object
+        """
+        quatComps = np.empty((4, len(quats)), dtype=float)
+        for i, quat in enumerate(quats):
+            quatComps[:, i] = quat.quatCoef
+
+        return cls(quatComps)
+
+    @property
+    def shape(self):
+        return self.quatComps.shape[1:]
+
+    @property
+    def ndim(self):
+        return self.quatComps.ndim - 1
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def __len__(self):
+        if self.ndim == 0:
+            raise TypeError("len() of unsized QuatArray")
+        return self.shape[0]
+
+    def __repr__(self):
+        return "QuatArray(shape={})".format(self.shape)
+
+    def _compIndex(self, key):
+        # index into the components array for a key of the quat array
+        if not isinstance(key, tuple):
+            key = (key,)
+        return (slice(None),) + key
+
+    def __getitem__(self, key):
+        quatComps = self.quatComps[self._compIndex(key)]
+        if quatComps.ndim == 1:
+            return Quat(quatComps)
+        return QuatArray(quatComps)
+
+    def __setitem__(self, key, value):
+        if isinstance(value, Quat):
+            value = value.quatCoef
+            # broadcast over the element axes of the target
+            value = value.reshape((4,) + (1,) * (
+                self.quatComps[self._compIndex(key)].ndim - 1))
+        elif isinstance(value, QuatArray):
+            value = value.quatComps
+        self.quatComps[self._compIndex(key)] = value
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def flatten(self):
+        """Copy of the array collapsed into 1 dimension"""
+        return QuatArray(self.quatComps.reshape((4, -1)), copy=True)
+
+    def ravel(self):
+        """Array collapsed into 1 dimension, a view where possible"""
+        return QuatArray(self.quatComps.reshape((4, -1)))
+
+    def reshape(self, *shape):
+        if len(shape) == 1 and isinstance(shape[0], tuple):
+            shape = shape[0]
+        return QuatArray(self.quatComps.reshape((4,) + tuple(shape)))
+
+    def copy(self):
+        return QuatArray(self.quatComps, copy=True)
+
+    def toQuats(self):
+        """Object array of Quat for each element"""
+        quats = np.empty(self.shape, dtype=Quat)
+        for idx in np.ndindex(self.shape):
+            quats[idx] = Quat(self.quatComps[(slice(None),) + idx])
+
+        return quats
+
+    def positiveHemisphere(self):
+        """Negate quaternions with a negative first component, in place,
+        as done for Quat objects.
+        """
+        negative = self.quatComps[0] < 0
+        self.quatComps[:, negative] *= -1
 
     @staticmethod
-    def symEqv(group):
-        overRoot2 = np.sqrt(2) / 2
-        sqrt3over2 = np.sqrt(3) / 2
-        qsym = []
-        # identity - this should always be returned as the first symmetry
-        qsym.append(Quat(np.array([1.0, 0.0, 0.0, 0.0])))
-
-        # from Pete Bate's fspl_orir.f90 code
-        # checked for consistency with mtex
-        # cubic tetrads(100)
-        qsym.append(Quat(np.array([overRoot2, overRoot2, 0.0, 0.0])))
-        qsym.append(Quat(np.array([0.0, 1.0, 0.0, 0.0])))
-        qsym.append(Quat(np.array([overRoot2, -overRoot2, 0.0, 0.0])))
-
-        qsym.append(Quat(np.array([overRoot2, 0.0, overRoot2, 0.0])))
-        qsym.append(Quat(np.array([0.0, 0.0, 1.0, 0.0])))
-        qsym.append(Quat(np.array([overRoot2, 0.0, -overRoot2, 0.0])))
-
-        qsym.append(Quat(np.array([overRoot2, 0.0, 0.0, overRoot2])))
-        qsym.append(Quat(np.array([0.0, 0.0, 0.0, 1.0])))
-        qsym.append(Quat(np.array([overRoot2, 0.0, 0.0, -overRoot2])))
-
-        # cubic dyads (110)
-        qsym.append(Quat(np.array([0.0, overRoot2, overRoot2, 0.0])))
-        qsym.append(Quat(np.array([0.0, -overRoot2, overRoot2, 0.0])))
-
-        qsym.append(Quat(np.array([0.0, overRoot2, 0.0, overRoot2])))
-        qsym.append(Quat(np.array([0.0, -overRoot2, 0.0, overRoot2])))
-
-        qsym.append(Quat(np.array([0.0, 0.0, overRoot2, overRoot2])))
-        qsym.append(Quat(np.array([0.0, 0.0, -overRoot2, overRoot2])))
-
-        # cubic triads (111)
-        qsym.append(Quat(np.array([0.5, 0.5, 0.5, 0.5])))
-        qsym.append(Quat(np.array([0.5, -0.5, -0.5, -0.5])))
-
-        qsym.append(Quat(np.array([0.5, -0.5, 0.5, 0.5])))
-        qsym.append(Quat(np.array([0.5, 0.5, -0.5, -0.5])))
-
-        qsym.append(Quat(np.array([0.5, 0.5, -0.5, 0.5])))
-        qsym.append(Quat(np.array([0.5, -0.5, 0.5, -0.5])))
-
-        qsym.append(Quat(np.array([0.5, 0.5, 0.5, -0.5])))
-        qsym.append(Quat(np.array([0.5, -0.5, -0.5, 0.5])))
-
-        # hexagonal hexads
-        qsym.append(Quat(np.array([sqrt3over2, 0.0, 0.0, 0.5])))
-        qsym.append(Quat(np.array([0.5, 0.0, 0.0, sqrt3over2])))
-        qsym.append(Quat(np.array([0.5, 0.0, 0.0, -sqrt3over2])))
-        qsym.append(Quat(np.array([sqrt3over2, 0.0, 0.0, -0.5])))
-
-        # hexagonal diads
-        qsym.append(Quat(np.array([0.0, -0.5, -sqrt3over2, 0.0])))
-        qsym.append(Quat(np.array([0.0, 0.5, -sqrt3over2, 0.0])))
-        qsym.append(Quat(np.array([0.0, sqrt3over2, -0.5, 0.0])))
-        qsym.append(Quat(np.array([0.0, -sqrt3over2, -0.5, 0.0])))
-
-        if group == 'cubic':
-            return qsym[0:24]
-        elif group == 'hexagonal':
-            return [qsym[0], qsym[2], qsym[5], qsym[8]] + qsym[-8:32]
-        else:
-            return [qsym[0]]
+    def _components(quats):
+        # components of a Quat or QuatArray, shaped to broadcast
+        if isinstance(quats, QuatArray):
+            return quats.quatComps
+        if isinstance(quats, Quat):
+            return quats.quatCoef
+        raise TypeError("Input must be a Quat or QuatArray.")
+
+    def __mul__(self, right):
+        """Quaternion product, broadcasting over the element shapes"""
+        a = self.quatComps
+        b = self._components(right)
+        if b.ndim == 1:
+            b = b.reshape((4,) + (1,) * self.ndim)
+
+        shape = np.broadcast(a[0], b[0]).shape
+        quatComps = np.empty((4,) + shape, dtype=float)
+        quatComps[0] = a[0] * b[0] - a[1] * b[1] - a[2] * b[2] - a[3] * b[3]
+        quatComps[1] = a[0] * b[1] + a[1] * b[0] + a[2] * b[3] - a[3] * b[2]
+        quatComps[2] = a[0] * b[2] + a[2] * b[0] + a[3] * b[1] - a[1] * b[3]
+        quatComps[3] = a[0] * b[3] + a[3] * b[0] + a[1] * b[2] - a[2] * b[1]
+
+        product = QuatArray(quatComps)
+        product.positiveHemisphere()
+
+        return product
+
+    @property
+    def conjugate(self):
+        quatComps = self.quatComps.copy()
+        quatComps[1:] *= -1
+        return QuatArray(quatComps)
+
+    def dot(self, right):
+        """Dot product of components, broadcasting over the element
+        shapes
+
+        Args:
+            right (Quat or QuatArray): Quats to take product with
+
+        Returns:
+            np.ndarray: Dot products
+        """
+        b = self._components(right)
+        if b.ndim == 1:
+            b = b.reshape((4,) + (1,) * self.ndim)
+        return np.einsum("i...,i...->...", self.quatComps, b)
+
+    def norm(self):
+        return np.sqrt(np.einsum("i...,i...->...",
+                                 self.quatComps, self.quatComps))
+
+    def normalise(self):
+        self.quatComps /= self.norm()
+
+    def eulerAngles(self):
+        """Calculate Bunge Euler angles for all quats
+
+        Returns:
+            np.ndarray: Euler angles (in radians), shape (3, ...)
+        """
+        q = self.quatComps
+        eulers = np.empty((3,) + self.shape, dtype=float)
+
+        q03 = q[0]**2 + q[3]**2
+        q12 = q[1]**2 + q[2]**2
+        chi = np.sqrt(q03 * q12)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            eulers[0] = np.arctan2((-q[0] * q[2] + q[1] * q[3]) / chi,
+                                   (-q[0] * q[1] - q[2] * q[3]) / chi)
+            eulers[1] = np.arctan2(2 * chi, q03 - q12)
+            eulers[2] = np.arctan2((q[1] * q[3] + q[0] * q[2]) / chi,
+                                   (-q[0] * q[1] + q[2] * q[3]) / chi)
+
+        # special cases where Phi is 0 or pi
+        zeroChi = chi == 0
+        phiZero = zeroChi & (q12 == 0)
+        phiPi = zeroChi & (q03 == 0)
+        eulers[0, phiZero] = np.arctan2(-2 * q[0, phiZero] * q[3, phiZero],
+                                        q[0, phiZero]**2 - q[3, phiZero]**2)
+        eulers[1, phiZero] = 0
+        eulers[0, phiPi] = np.arctan2(2 * q[1, phiPi] * q[2, phiPi],
+                                      q[1, phiPi]**2 - q[2, phiPi]**2)
+        eulers[1, phiPi] = np.pi
+        eulers[2, zeroChi] = 0
+
+        eulers[0, eulers[0] < 0] += 2 * np.pi
+        eulers[2, eulers[2] < 0] += 2 * np.pi
+
+        return eulers
+
+    def rotMatrix(self):
+        """Rotation matrices of all quats
+
+        Returns:
+            np.ndarray: Rotation matrices, shape (3, 3, ...)
+        """
+        q = self.quatComps
+        rotMatrix = np.empty((3, 3) + self.shape, dtype=float)
+
+        qbar = q[0]**2 - q[1]**2 - q[2]**2 - q[3]**2
+
+        rotMatrix[0, 0] = qbar + 2 * q[1]**2
+        rotMatrix[0, 1] = 2 * (q[1] * q[2] - q[0] * q[3])
+        rotMatrix[0, 2] = 2 * (q[1] * q[3] + q[0] * q[2])
+
+        rotMatrix[1, 0] = 2 * (q[1] * q[2] + q[0] * q[3])
+        rotMatrix[1, 1] = qbar + 2 * q[2]**2
+        rotMatrix[1, 2] = 2 * (q[2] * q[3] - q[0] * q[1])
+
+        rotMatrix[2, 0] = 2 * (q[1] * q[3] - q[0] * q[2])
+        rotMatrix[2, 1] = 2 * (q[2] * q[3] + q[0] * q[1])
+        rotMatrix[2, 2] = qbar + 2 * q[3]**2
+
+        return rotMatrix
+
+    def transformVector(self, vector):
+        """Transforms a vector by all the quaternions. For EBSD
+        quaternions this is a transformation from sample space to
+        crystal space.
+
+        Args:
+            vector (numpy.ndarray): Vector to transform, size 3
+
+        Returns:
+            numpy.ndarray: Transformed vectors, shape (3, ...)
+        """
+        vector = np.asarray(vector, dtype=float)
+        if vector.shape != (3,):
+            raise TypeError("Vector must be a size 3 numpy array.")
+
+        q = self.quatComps
+        vector = vector.reshape((3,) + (1,) * self.ndim)
+
+        # (q * v) * q.conjugate expanded
+        quatDotVec = np.einsum("i...,i...->...", q[1:], vector)
+        temp = q[0]**2 - q[1]**2 - q[2]**2 - q[3]**2
+
+        vectorTransformed = np.empty((3,) + self.shape, dtype=float)
+        vectorTransformed[0] = (2 * quatDotVec * q[1] + temp * vector[0] +
+                                2 * q[0] * (q[2] * vector[2] - q[3] * vector[1]))
+        vectorTransformed[1] = (2 * quatDotVec * q[2] + temp * vector[1] +
+                                2 * q[0] * (q[3] * vector[0] - q[1] * vector[2]))
+        vectorTransformed[2] = (2 * quatDotVec * q[3] + temp * vector[2] +
+                                2 * q[0] * (q[1] * vector[1] - q[2] * vector[0]))
+
+        return vectorTransformed
@@ -0,0 +1,255 @@
+import pytest
+import numpy as np
+
+from defdap import ebsd
+
+EXAMPLE_EBSD = "data/testDataEBSD"
+
+
+class TestMapLoading:
+
+    @staticmethod
+    @pytest.mark.parametrize('roi', [None, (10, 50, 20, 45)])
+    def test_lazy(roi):
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=roi)
+        lazy_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=roi, lazy=True)
+
+        assert not lazy_map.dataLoaded
+        assert (lazy_map.xDim, lazy_map.yDim) == (ebsd_map.xDim, ebsd_map.yDim)
+        assert lazy_map.offset == ebsd_map.offset
+        assert lazy_map.phaseNames == ebsd_map.phaseNames
+        assert lazy_map.stepSize == ebsd_map.stepSize
+
+        assert np.array_equal(lazy_map.phaseArray, ebsd_map.phaseArray)
+        assert lazy_map.dataLoaded
+        assert np.array_equal(lazy_map.eulerAngleArray,
+                              ebsd_map.eulerAngleArray)
+        assert np.array_equal(lazy_map.bandContrastArray,
+                              ebsd_map.bandContrastArray)
+        assert np.array_equal(lazy_map.meanAngularDeviationArray,
+                              ebsd_map.meanAngularDeviationArray)
+
+    @staticmethod
+    @pytest.mark.parametrize('data_type', ['OxfordBinary', 'OxfordText'])
+    def test_save(tmp_path, data_type):
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic")
+        ebsd_map.transformData()
+        file_name = str(tmp_path / "saved")
+        ebsd_map.save(file_name, dataType=data_type)
+
+        saved_map = ebsd.Map(file_name, "cubic", dataType=data_type)
+        assert (saved_map.xDim, saved_map.yDim) == (ebsd_map.xDim, ebsd_map.yDim)
+        assert saved_map.stepSize == ebsd_map.stepSize
+        assert saved_map.phaseNames == ebsd_map.phaseNames
+        assert np.array_equal(saved_map.phaseArray, ebsd_map.phaseArray)
+        assert np.array_equal(saved_map.bandContrastArray,
+                              ebsd_map.bandContrastArray)
+        assert np.any(ebsd_map.meanAngularDeviationArray != 0)
+        assert np.allclose(saved_map.meanAngularDeviationArray,
+                           ebsd_map.meanAngularDeviationArray, atol=1e-4)
+        assert np.allclose(saved_map.eulerAngleArray,
+                           ebsd_map.quatArray.eulerAngles(), atol=1e-4)
+
+        # orientations, including the rotation of the transform, are kept
+        saved_map.buildQuatArray()
+        dot = np.abs(saved_map.quatArray.dot(ebsd_map.quatArray))
+        assert np.allclose(dot, 1, atol=1e-6)
+
+
+class TestBoundaries:
+
+    @staticmethod
+    def test_neighbour_misori():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.calcNeighbourMisOri(chunkSize=7)
+        quat_array = ebsd_map.quatArray
+
+        assert ebsd_map.misOrix.shape == (40, 60)
+        assert np.allclose(ebsd_map.misOrix[:, -1], 180)
+        assert np.allclose(ebsd_map.misOriy[-1], 180)
+        for x, y in [(0, 0), (10, 5), (58, 38)]:
+            expected_x = quat_array[y, x].misOri(quat_array[y, x + 1], "cubic")
+            expected_y = quat_array[y, x].misOri(quat_array[y + 1, x], "cubic")
+            assert ebsd_map.misOrix[y, x] == pytest.approx(
+                360 * np.arccos(min(expected_x, 1)) / np.pi, abs=1e-4)
+            assert ebsd_map.misOriy[y, x] == pytest.approx(
+                360 * np.arccos(min(expected_y, 1)) / np.pi, abs=1e-4)
+
+        ebsd_map.findBoundaries(boundDef=10)
+        expected = (ebsd_map.misOrix > 10) | (ebsd_map.misOriy > 10)
+        assert np.array_equal(ebsd_map.boundaries == -1, expected)
+
+    @staticmethod
+    def test_rethreshold_uses_cache():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.findBoundaries(boundDef=10)
+        misori_x = ebsd_map.misOrix
+
+        assert misori_x.dtype == np.float32
+
+        ebsd_map.findBoundaries(boundDef=2)
+        expected = (ebsd_map.misOrix > 2) | (ebsd_map.misOriy > 2)
+        assert ebsd_map.misOrix is misori_x
+        assert np.array_equal(ebsd_map.boundaries == -1, expected)
+
+    @staticmethod
+    def test_boundary_levels():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        levels = ebsd_map.findBoundaryLevels(boundDefs=(15, 2))
+        max_misori = np.maximum(ebsd_map.misOrix, ebsd_map.misOriy)
+
+        assert np.array_equal(levels == 0, max_misori <= 2)
+        assert np.array_equal(levels == 1, (max_misori > 2) & (max_misori <= 15))
+        assert np.array_equal(levels == 2, max_misori > 15)
+
+    @staticmethod
+    def test_transform_clears_cache():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.calcNeighbourMisOri()
+        misori_x = ebsd_map.misOrix.copy()
+        ebsd_map.transformData()
+
+        assert ebsd_map.misOrix is None
+        assert ebsd_map.misOriy is None
+
+        ebsd_map.calcNeighbourMisOri()
+        assert np.allclose(ebsd_map.misOrix[:, :-1], misori_x[::-1, -2::-1],
+                           atol=1e-3)
+
+    @staticmethod
+    def test_symmetry_change_clears_cache():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.findBoundaries(boundDef=10)
+        cubic_boundaries = ebsd_map.boundaries.copy()
+
+        ebsd_map.crystalSym = "hexagonal"
+        assert ebsd_map.misOrix is None
+        assert ebsd_map.misOriy is None
+
+        ebsd_map.findBoundaries(boundDef=10)
+        hexagonal_map = ebsd.Map(EXAMPLE_EBSD, "hexagonal", roi=(0, 60, 0, 40))
+        hexagonal_map.findBoundaries(boundDef=10)
+        assert not np.array_equal(ebsd_map.boundaries, cubic_boundaries)
+        assert np.array_equal(ebsd_map.boundaries, hexagonal_map.boundaries)
+
+
+class TestKam:
+
+    @staticmethod
+    def test_kam():
+        """KAM uses the minimum misorientation to each neighbour
+        considering crystal symmetry. Values before symmetry was used
+        are given in comments."""
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.calcKam()
+
+        assert ebsd_map.kam.shape == (40, 60)
+        assert ebsd_map.kam.mean() == pytest.approx(0.99526367, abs=1e-7)
+        expected = {
+            (0, 22): 0.91833351,    # 0.28927941 without symmetry
+            (2, 27): 0.92752333,    # 0.30690087 without symmetry
+            (33, 4): 0.93308597,    # 0.37617995 without symmetry
+            (0, 0): 0.93478043,
+            (10, 20): 0.99998905,
+        }
+        for (y, x), value in expected.items():
+            assert ebsd_map.kam[y, x] == pytest.approx(value, abs=1e-7)
+
+
+class TestGrains:
+
+    @staticmethod
+    def test_label_grains():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.boundaries = np.array([
+            [0,  0, -1,  0,  0,  0],
+            [0,  0, -1,  0,  0,  0],
+            [-1, -1, -1, -1, -1, -1],
+            [0,  0,  0, -1,  0, -1],
+            [0,  0,  0, -1, -1,  0],
+        ])
+        num_grains = ebsd_map.labelGrains(minGrainSize=4)
+
+        expected = np.array([
+            [1,  1,  1,  2,  2,  2],
+            [1,  1,  1,  2,  2,  2],
+            [1,  1, -1,  2,  2,  2],
+            [3,  3,  3,  3, -2, -2],
+            [3,  3,  3,  3, -2, -2],
+        ])
+        assert np.array_equal(ebsd_map.grains, expected)
+        assert num_grains == 3
+        assert ebsd_map.grainOffsets[-1] == len(ebsd_map.grainPoints)
+        for i in range(num_grains):
+            points = ebsd_map.grainPoints[ebsd_map.grainSlice(i)]
+            assert np.array_equal(points, np.flatnonzero(expected == i + 1))
+
+    @staticmethod
+    def test_find_grains():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.findBoundaries(boundDef=10)
+        ebsd_map.findGrains(minGrainSize=10)
+
+        assert len(ebsd_map) == ebsd_map.grains.max()
+        for i, grain in enumerate(ebsd_map):
+            y_coords, x_coords = np.nonzero(ebsd_map.grains == i + 1)
+            assert np.array_equal(grain.coordList[:, 0], x_coords)
+            assert np.array_equal(grain.coordList[:, 1], y_coords)
+            assert len(grain.quatList) == len(grain)
+            assert np.array_equal(
+                grain.quatList.quatComps,
+                ebsd_map.quatArray.quatComps[:, y_coords, x_coords]
+            )
+
+    @staticmethod
+    def test_grain_views():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.findBoundaries(boundDef=10)
+        ebsd_map.findGrains(minGrainSize=10)
+        ebsd_map.calcGrainMisOri(calcAxis=True)
+        grain = ebsd_map[1]
+
+        assert np.shares_memory(grain.coordList, ebsd_map.grainCoords)
+        assert np.shares_memory(grain.quatList.quatComps,
+                                ebsd_map.grainQuatComps)
+        assert np.shares_memory(grain.misOriList, ebsd_map.grainMisOris)
+        assert grain.misOriAxisList.shape == (len(grain), 3)
+        assert grain.averageMisOri == pytest.approx(grain.misOriList.mean())
+        assert not np.isnan(ebsd_map.grainMisOris).any()
+
+        map_data = np.arange(ebsd_map.xDim * ebsd_map.yDim).reshape(
+            ebsd_map.yDim, ebsd_map.xDim)
+        assert np.array_equal(grain.grainData(map_data),
+                              ebsd_map.grainPoints[grain.pointSlice])
+
+    @staticmethod
+    def test_grain_stats():
+        ebsd_map = ebsd.Map(EXAMPLE_EBSD, "cubic", roi=(0, 60, 0, 40))
+        ebsd_map.findBoundaries(boundDef=10)
+        ebsd_map.findGrains(minGrainSize=10)
+        map_data = {
+            'bc': ebsd_map.bandContrastArray,
+            'phi1': ebsd_map.eulerAngleArray[0],
+        }
+        grain_ids = [3, 0, 5]
+        stats = ebsd_map.calcGrainStats(
+            map_data, stats=['mean', 'std', 'min', 'max', 'median', 95, 'count'],
+            grainIds=grain_ids
+        )
+
+        assert list(stats.index) == grain_ids
+        for name, data in map_data.items():
+            for grain_id in grain_ids:
+                grain_data = ebsd_map[grain_id].grainData(data)
+                grain_stats = stats.loc[grain_id, name]
+                assert grain_stats['mean'] == pytest.approx(grain_data.mean())
+                assert grain_stats['std'] == pytest.approx(grain_data.std())
+                assert grain_stats['min'] == grain_data.min()
+                assert grain_stats['max'] == grain_data.max()
+                assert grain_stats['median'] == pytest.approx(np.median(grain_data))
+                assert grain_stats['p95'] == pytest.approx(np.percentile(grain_data, 95))
+                assert grain_stats['count'] == len(grain_data)
+
+        grain_av = ebsd_map.calcGrainAv(map_data['phi1'])
+        assert grain_av.shape == (len(ebsd_map),)
+        assert grain_av[1] == pytest.approx(ebsd_map[1].grainData(map_data['phi1']).mean())
@@ -28,7 +28,6 @@
 # 'f21',
 # 'f22',
 # 'findGrains',
-# 'floodFill',
 # 'fname',
 # 'format',
 # 'grainList',
@@ -73,4 +72,66 @@
 # 'y_map',
 # 'yc',
 # 'yd',
-# 'ydim'
\ No newline at end of file
+# 'ydim'
+
+import shutil
+
+import pytest
+import numpy as np
+
+from defdap import hrdic
+
+EXAMPLE_DIC_DIR = "data/"
+EXAMPLE_DIC_FILE = "testDataDIC.txt"
+
+
+class TestMapSequence:
+
+    @staticmethod
+    @pytest.fixture
+    def sequence_dir(tmp_path):
+        for i in [1, 2, 10]:
+            shutil.copy(EXAMPLE_DIC_DIR + EXAMPLE_DIC_FILE,
+                        str(tmp_path / "B{:d}.txt".format(i)))
+        return tmp_path
+
+    @staticmethod
+    @pytest.mark.parametrize('memory_map', [False, True])
+    def test_load_sequence(sequence_dir, memory_map):
+        dic_map = hrdic.Map(EXAMPLE_DIC_DIR, EXAMPLE_DIC_FILE)
+        sequence = hrdic.MapSequence(
+            str(sequence_dir), numThreads=2,
+            memoryMapDir=str(sequence_dir) if memory_map else None
+        )
+
+        assert len(sequence) == 3
+        assert [path.name for path in sequence.filePaths] == \
+            ["B1.txt", "B2.txt", "B10.txt"]
+        assert sequence.max_shear.shape == (3,) + dic_map.max_shear.shape
+
+        step_map = sequence[-1]
+        assert isinstance(step_map, hrdic.Map)
+        assert np.shares_memory(step_map.max_shear, sequence.max_shear)
+        for key in ['xd', 'yd', 'f11', 'f22', 'f12', 'f21', 'max_shear']:
+            assert np.allclose(getattr(step_map, key), getattr(dic_map, key))
+
+    @staticmethod
+    def test_load_sequence_memory_map_dir(sequence_dir, tmp_path_factory):
+        memory_map_dir = tmp_path_factory.mktemp("stacks")
+        existing_file = memory_map_dir / "max_shear.npy"
+        existing_file.write_bytes(b"existing")
+
+        sequence_1 = hrdic.MapSequence(str(sequence_dir),
+                                       memoryMapDir=str(memory_map_dir))
+        sequence_2 = hrdic.MapSequence(str(sequence_dir / "B1*.txt"),
+                                       memoryMapDir=str(memory_map_dir))
+
+        assert existing_file.read_bytes() == b"existing"
+        assert sequence_1.memoryMapDir != sequence_2.memoryMapDir
+        assert not np.shares_memory(sequence_1.max_shear, sequence_2.max_shear)
+        assert len(sequence_1.max_shear) == 3
+
+    @staticmethod
+    def test_load_sequence_glob(sequence_dir):
+        sequence = hrdic.MapSequence(str(sequence_dir / "B1*.txt"))
+        assert len(sequence) == 2
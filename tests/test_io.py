@@ -1,10 +1,14 @@
 import pytest
 import numpy as np
+import scipy.io
 
 import defdap.file_readers
+import defdap.file_writers
 
 EXAMPLE_DIC = "../example_data/Map Data 2-DIC area"
 EXAMPLE_TXT = "../example_data/B00005.txt"
+EXAMPLE_EBSD = "data/testDataEBSD"
+EXAMPLE_DIC_TXT = "data/testDataDIC.txt"
 
 
 class TestEBSDDataLoader:
@@ -29,6 +33,8 @@ class TestEBSDDataLoader:
     def test_check_metadata_good(data_loader):
         """The check_metadata method should pass silently if phaseNames
         and numPhases match."""
+        data_loader.loadedMetadata["xDim"] = 7
+        data_loader.loadedMetadata["yDim"] = 5
         data_loader.loadedMetadata["phaseNames"] = ["1", "2", "3"]
         data_loader.loadedMetadata["numPhases"] = 3
         assert data_loader.checkMetadata() is None
@@ -79,6 +85,282 @@ class TestEBSDDataLoader:
         with pytest.raises(FileNotFoundError):
             metadata_loaded.loadOxfordCRC("badger")
 
+    @staticmethod
+    def test_load_oxford_crc_memory_map(data_loader):
+        data_loader.loadOxfordCPR(EXAMPLE_EBSD)
+        data = dict(data_loader.loadOxfordCRC(EXAMPLE_EBSD))
+
+        mapped_loader = defdap.file_readers.EBSDDataLoader()
+        mapped_loader.loadOxfordCPR(EXAMPLE_EBSD)
+        mapped_data = mapped_loader.loadOxfordCRC(EXAMPLE_EBSD, memoryMap=True)
+
+        assert mapped_data['eulerAngle'].shape == data['eulerAngle'].shape
+        assert mapped_data['eulerAngle'].dtype == np.float32
+        assert np.array_equal(mapped_data['eulerAngle'], data['eulerAngle'])
+        for key in ['phase', 'bandContrast', 'meanAngularDeviation']:
+            assert np.array_equal(mapped_data[key], data[key])
+
+    @staticmethod
+    @pytest.mark.parametrize('memory_map', [False, True])
+    def test_load_oxford_crc_roi(memory_map):
+        data_loader = defdap.file_readers.EBSDDataLoader()
+        data_loader.loadOxfordCPR(EXAMPLE_EBSD)
+        data = dict(data_loader.loadOxfordCRC(EXAMPLE_EBSD))
+
+        roi_loader = defdap.file_readers.EBSDDataLoader()
+        roi_loader.loadOxfordCPR(EXAMPLE_EBSD)
+        roi_data = roi_loader.loadOxfordCRC(
+            EXAMPLE_EBSD, memoryMap=memory_map, roi=(10, 50, 20, 45)
+        )
+        metadata = roi_loader.loadedMetadata
+
+        assert (metadata['yDim'], metadata['xDim']) == (25, 40)
+        assert metadata['offset'] == (10, 20)
+        assert np.array_equal(roi_data['eulerAngle'],
+                              data['eulerAngle'][:, 20:45, 10:50])
+        for key in ['phase', 'bandContrast', 'meanAngularDeviation']:
+            assert np.array_equal(roi_data[key], data[key][20:45, 10:50])
+
+    @staticmethod
+    @pytest.mark.parametrize('roi', [(0, 7, 6, 5), (3, 9, 0, 5), (-1, 7, 0, 5)])
+    def test_check_roi_bad(roi):
+        with pytest.raises(ValueError):
+            defdap.file_readers.checkRoi(roi, 7, 5)
+
+    @staticmethod
+    @pytest.fixture
+    def ctf_file(tmp_path):
+        """Write a small .ctf file with known data."""
+        x_dim, y_dim = 7, 5
+        rng = np.random.default_rng(0)
+        data = np.zeros((x_dim * y_dim, 11))
+        data[:, 0] = rng.integers(0, 2, x_dim * y_dim)
+        data[:, 5:8] = rng.uniform(0, 90, (x_dim * y_dim, 3)).round(4)
+        data[:, 8] = rng.uniform(0, 2, x_dim * y_dim).round(4)
+        data[:, 9] = rng.integers(0, 255, x_dim * y_dim)
+
+        header = [
+            "Channel Text File", "JobMode\tGrid",
+            "XCells\t{}".format(x_dim), "YCells\t{}".format(y_dim),
+            "XStep\t0.5", "YStep\t0.5", "Phases\t1",
+            "3.57;3.57;3.57\t90;90;90\tNickel\t11\t225",
+            "Phase\tX\tY\tBands\tError\tEuler1\tEuler2\tEuler3\tMAD\tBC\tBS",
+        ]
+        file_path = tmp_path / "test.ctf"
+        with open(str(file_path), 'w') as ctf_file:
+            ctf_file.write("\n".join(header) + "\n")
+            np.savetxt(ctf_file, data, fmt="%g", delimiter="\t")
+
+        return str(tmp_path / "test"), data, (y_dim, x_dim)
+
+    @staticmethod
+    @pytest.mark.parametrize('chunk_size', [64, 2**22])
+    def test_load_oxford_ctf(data_loader, ctf_file, chunk_size):
+        file_name, data, shape = ctf_file
+        metadata, loaded_data = data_loader.loadOxfordCTF(
+            file_name, chunkSize=chunk_size, numThreads=2
+        )
+        assert (metadata['yDim'], metadata['xDim']) == shape
+        assert metadata['phaseNames'] == ["Nickel"]
+
+        assert np.array_equal(loaded_data['phase'], data[:, 0].reshape(shape))
+        assert np.array_equal(loaded_data['bandContrast'], data[:, 9].reshape(shape))
+        assert np.allclose(loaded_data['meanAngularDeviation'], data[:, 8].reshape(shape))
+        assert np.allclose(
+            loaded_data['eulerAngle'],
+            data[:, 5:8].T.reshape((3,) + shape) * np.pi / 180
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize('chunk_size', [16, 2**22])
+    def test_load_oxford_ctf_roi(data_loader, ctf_file, chunk_size):
+        file_name, data, shape = ctf_file
+        metadata, loaded_data = data_loader.loadOxfordCTF(
+            file_name, chunkSize=chunk_size, numThreads=2, roi=(2, 6, 1, 4)
+        )
+        assert (metadata['yDim'], metadata['xDim']) == (3, 4)
+        assert metadata['offset'] == (2, 1)
+
+        assert np.array_equal(loaded_data['phase'],
+                              data[:, 0].reshape(shape)[1:4, 2:6])
+        assert np.allclose(
+            loaded_data['eulerAngle'],
+            data[:, 5:8].T.reshape((3,) + shape)[:, 1:4, 2:6] * np.pi / 180
+        )
+
+    @staticmethod
+    @pytest.fixture
+    def ang_file(tmp_path):
+        """Write a small single phase .ang file with known data."""
+        x_dim, y_dim = 6, 4
+        rng = np.random.default_rng(1)
+        data = np.zeros((x_dim * y_dim, 10))
+        data[:, 0:3] = rng.uniform(0, 3, (x_dim * y_dim, 3)).round(5)
+        data[:, 5] = rng.uniform(0, 3000, x_dim * y_dim).round(1)
+        data[:, 6] = rng.uniform(-0.1, 1, x_dim * y_dim).round(3)
+
+        header = [
+            "# TEM_PIXperUM          1.000000",
+            "# Phase 1", "# MaterialName  \tNickel", "# Symmetry  43",
+            "# GRID: SqrGrid", "# XSTEP: 0.500000", "# YSTEP: 0.500000",
+            "# NCOLS_ODD: {}".format(x_dim), "# NCOLS_EVEN: {}".format(x_dim),
+            "# NROWS: {}".format(y_dim), "#",
+        ]
+        file_path = tmp_path / "test.ang"
+        with open(str(file_path), 'w') as ang_file:
+            ang_file.write("\n".join(header) + "\n")
+            np.savetxt(ang_file, data, fmt="%10.5f")
+
+        return str(tmp_path / "test"), data, (y_dim, x_dim)
+
+    @staticmethod
+    @pytest.mark.parametrize('roi', [None, (1, 5, 2, 4)])
+    def test_load_edax_ang(data_loader, ang_file, roi):
+        file_name, data, shape = ang_file
+        metadata, loaded_data = data_loader.loadEdaxAng(
+            file_name, chunkSize=64, roi=roi
+        )
+        region = np.s_[:, :] if roi is None else np.s_[2:4, 1:5]
+        assert metadata['phaseNames'] == ["Nickel"]
+        assert metadata['stepSize'] == 0.5
+        assert (metadata['yDim'], metadata['xDim']) == \
+            data[:, 5].reshape(shape)[region].shape
+
+        assert np.allclose(loaded_data['eulerAngle'],
+                           data[:, 0:3].T.reshape((3,) + shape)[(slice(None),) + region])
+        assert np.allclose(loaded_data['bandContrast'],
+                           data[:, 5].reshape(shape)[region])
+        # unindexed points have negative confidence index
+        expected_phase = np.where(data[:, 6] < 0, 0, 1).reshape(shape)[region]
+        assert np.array_equal(loaded_data['phase'], expected_phase)
+
+    @staticmethod
+    @pytest.mark.parametrize('missing_key, missing_line', [
+        ('xDim', "# NCOLS_ODD"), ('yDim', "# NROWS")
+    ])
+    def test_load_edax_ang_no_dims(data_loader, ang_file, missing_key,
+                                   missing_line):
+        file_name, data, shape = ang_file
+        with open(file_name + ".ang", 'r') as ang_file:
+            lines = [line for line in ang_file
+                     if not line.startswith(missing_line)]
+        with open(file_name + ".ang", 'w') as ang_file:
+            ang_file.writelines(lines)
+
+        with pytest.raises(ValueError, match=missing_key):
+            data_loader.loadEdaxAng(file_name)
+
+    @staticmethod
+    def test_load_hdf5(tmp_path):
+        h5py = pytest.importorskip("h5py")
+        data_loader = defdap.file_readers.EBSDDataLoader()
+        data_loader.loadOxfordCPR(EXAMPLE_EBSD)
+        data = dict(data_loader.loadOxfordCRC(EXAMPLE_EBSD))
+        y_dim, x_dim = data['phase'].shape
+
+        # write the test data as a h5oina file
+        with h5py.File(str(tmp_path / "test.h5oina"), 'w') as h5_file:
+            header = h5_file.create_group("1/EBSD/Header")
+            header["X Cells"] = [x_dim]
+            header["Y Cells"] = [y_dim]
+            header["X Step"] = [0.12]
+            header["Phases/1/Phase Name"] = [b"Ni-superalloy"]
+            data_group = h5_file.create_group("1/EBSD/Data")
+            data_group["Euler"] = data['eulerAngle'].reshape(3, -1).T
+            data_group["Phase"] = data['phase'].ravel()
+            data_group["Band Contrast"] = data['bandContrast'].ravel()
+
+        metadata, loaded_data = defdap.file_readers.EBSDDataLoader().loadHDF5(
+            "test", str(tmp_path), chunkSize=1000, roi=(5, 100, 10, 200)
+        )
+        assert metadata['phaseNames'] == ["Ni-superalloy"]
+        assert (metadata['yDim'], metadata['xDim']) == (190, 95)
+        assert np.array_equal(loaded_data['eulerAngle'],
+                              data['eulerAngle'][:, 10:200, 5:100])
+        for key in ['phase', 'bandContrast']:
+            assert np.array_equal(loaded_data[key], data[key][10:200, 5:100])
+
+    @staticmethod
+    def test_load_oxford_ctf_cache(ctf_file):
+        file_name, data, shape = ctf_file
+        metadata, loaded_data = defdap.file_readers.EBSDDataLoader(
+        ).loadOxfordCTF(file_name, useCache=True)
+        metadata = dict(metadata)
+        loaded_data = dict(loaded_data)
+
+        cache = defdap.file_readers.DataCache(file_name + ".ctf", "OxfordCTF")
+        assert cache.load() is not None
+
+        cached_metadata, cached_data = defdap.file_readers.EBSDDataLoader(
+        ).loadOxfordCTF(file_name, useCache=True)
+        assert cached_metadata == metadata
+        for key, value in loaded_data.items():
+            assert np.array_equal(cached_data[key], value)
+            assert cached_data[key].dtype == value.dtype
+
+        # modifying the source file invalidates the cache
+        with open(file_name + ".ctf", 'a') as ctf_file:
+            ctf_file.write("\n")
+        assert cache.load() is None
+
+    @staticmethod
+    def test_load_oxford_ctf_cache_not_writable(ctf_file):
+        file_name, data, shape = ctf_file
+        cache = defdap.file_readers.DataCache(file_name + ".ctf", "OxfordCTF")
+        # a file in place of the cache directory stops it being written
+        cache.cacheDir.touch()
+
+        with pytest.warns(UserWarning):
+            metadata, loaded_data = defdap.file_readers.EBSDDataLoader(
+            ).loadOxfordCTF(file_name, useCache=True)
+        assert (metadata['yDim'], metadata['xDim']) == shape
+        assert cache.load() is None
+
+
+class TestEBSDDataWriter:
+
+    @staticmethod
+    def test_write_oxford_ctf(tmp_path):
+        x_dim, y_dim = 7, 5
+        rng = np.random.default_rng(1)
+        data_writer = defdap.file_writers.EBSDDataWriter()
+        data_writer.metadata.update({
+            'xDim': x_dim, 'yDim': y_dim, 'stepSize': 0.5, 'numPhases': 1,
+            'phaseNames': ["Ni"], 'crystalSym': 'cubic'
+        })
+        data_writer.data.update({
+            'eulerAngle': rng.uniform(0, np.pi, (3, y_dim, x_dim)),
+            'bandContrast': rng.integers(0, 255, (y_dim, x_dim)),
+            'phase': rng.integers(0, 2, (y_dim, x_dim)),
+            'meanAngularDeviation': rng.uniform(0, 2, (y_dim, x_dim)),
+        })
+        data_writer.writeOxfordCTF("test", fileDir=str(tmp_path), chunkSize=8)
+
+        # 8 header lines, 1 per phase and the column names
+        columns = np.loadtxt(str(tmp_path / "test.ctf"), skiprows=10,
+                             delimiter='\t')
+        y_coords, x_coords = np.mgrid[0:y_dim, 0:x_dim] * 0.5
+        data = data_writer.data
+        assert columns.shape == (x_dim * y_dim, 11)
+        assert np.array_equal(columns[:, 0], data['phase'].ravel())
+        assert np.allclose(columns[:, 1], x_coords.ravel())
+        assert np.allclose(columns[:, 2], y_coords.ravel())
+        assert np.all(columns[:, 3:5] == 0)
+        assert np.allclose(columns[:, 5:8],
+                           data['eulerAngle'].reshape(3, -1).T * 180 / np.pi,
+                           atol=1e-4)
+        assert np.allclose(columns[:, 8],
+                           data['meanAngularDeviation'].ravel(), atol=1e-4)
+        assert np.array_equal(columns[:, 9], data['bandContrast'].ravel())
+        # band slope is not stored
+        assert np.all(columns[:, 10] == 0)
+
+        metadata, loaded_data = defdap.file_readers.EBSDDataLoader(
+        ).loadOxfordCTF("test", fileDir=str(tmp_path))
+        assert (metadata['yDim'], metadata['xDim']) == (y_dim, x_dim)
+        assert np.allclose(loaded_data['eulerAngle'], data['eulerAngle'],
+                           atol=1e-5)
+
 
 class TestDICDataLoader:
 
@@ -123,12 +405,92 @@ class TestDICDataLoader:
     def test_load_davis_data(dic_metadata_loaded):
         dic_metadata_loaded.loadDavisData(EXAMPLE_TXT)
         data = dic_metadata_loaded.loadedData
-        num_elements = dic_metadata_loaded.loadedMetadata["xDim"] * \
-                       dic_metadata_loaded.loadedMetadata["yDim"]
-        assert data['xc'].shape[0] == num_elements
-        assert data['yc'].shape[0] == num_elements
-        assert data['xd'].shape[0] == num_elements
-        assert data['yd'].shape[0] == num_elements
+        shape = (dic_metadata_loaded.loadedMetadata["yDim"],
+                 dic_metadata_loaded.loadedMetadata["xDim"])
+        assert data['xc'].shape == shape
+        assert data['yc'].shape == shape
+        assert data['xd'].shape == shape
+        assert data['yd'].shape == shape
+
+    @staticmethod
+    @pytest.mark.parametrize('dtype', [np.float64, np.float32])
+    def test_load_davis_data_grid(dic_loader, dtype):
+        dic_loader.loadDavisMetadata(EXAMPLE_DIC_TXT)
+        data = dic_loader.loadDavisData(EXAMPLE_DIC_TXT, dtype=dtype, chunkSize=2**16)
+
+        expected = np.loadtxt(EXAMPLE_DIC_TXT, skiprows=1)
+        for i, key in enumerate(['xc', 'yc', 'xd', 'yd']):
+            assert data[key].shape == (200, 300)
+            assert data[key].dtype == dtype
+            assert np.allclose(data[key].reshape(-1), expected[:, i])
+
+    @staticmethod
+    @pytest.mark.parametrize('chunk_size', [2**10, 2**22])
+    def test_load_davis_data_roi(dic_loader, chunk_size):
+        dic_loader.loadDavisMetadata(EXAMPLE_DIC_TXT)
+        dic_loader.loadDavisData(EXAMPLE_DIC_TXT, roi=(35, 290, 99, 101),
+                                 chunkSize=chunk_size)
+        metadata = dic_loader.loadedMetadata
+        assert (metadata['yDim'], metadata['xDim']) == (2, 255)
+        assert metadata['offset'] == (35, 99)
+
+        full_data = np.loadtxt(EXAMPLE_DIC_TXT, skiprows=1)
+        for i, key in enumerate(['xc', 'yc', 'xd', 'yd']):
+            assert np.array_equal(dic_loader.loadedData[key],
+                                  full_data[:, i].reshape((200, 300))[99:101, 35:290])
+
+    @staticmethod
+    def test_load_davis_data_cache(tmp_path):
+        file_path = tmp_path / "test.txt"
+        file_path.write_bytes(open(EXAMPLE_DIC_TXT, 'rb').read())
+
+        dic_loader = defdap.file_readers.DICDataLoader()
+        dic_loader.loadDavisMetadata(str(file_path))
+        data = dict(dic_loader.loadDavisData(str(file_path), useCache=True))
+
+        dic_loader = defdap.file_readers.DICDataLoader()
+        cached_data = dic_loader.loadDavisData(str(file_path), useCache=True)
+        assert dic_loader.loadedMetadata['xDim'] == 300
+        for key, value in data.items():
+            assert np.array_equal(cached_data[key], value)
+
+    @staticmethod
+    @pytest.fixture
+    def ncorr_file(tmp_path):
+        """Write a small nCorr .mat file with known displacements."""
+        rng = np.random.default_rng(0)
+        u = rng.normal(size=(4, 6))
+        v = rng.normal(size=(4, 6))
+        data_dic = {
+            'displacements': {'plot_u_dic': u, 'plot_v_dic': v},
+            'dispinfo': {'radius': 15},
+        }
+        file_path = tmp_path / "ncorr.mat"
+        scipy.io.savemat(str(file_path), {'data_dic': data_dic,
+                                          'reference_save': np.zeros(3)})
+        return file_path, u, v
+
+    @staticmethod
+    def test_load_ncorr(dic_loader, ncorr_file):
+        file_path, u, v = ncorr_file
+        metadata, data = dic_loader.loadNCorr(file_path.name,
+                                              str(file_path.parent))
+        assert metadata['format'] == "nCorr"
+        assert metadata['binning'] == 15
+        assert (metadata['yDim'], metadata['xDim']) == (4, 6)
+
+        assert np.array_equal(data['xd'], u)
+        assert np.array_equal(data['yd'], v)
+        # matches coordinates written by nCorrToDavis.m
+        assert np.array_equal(data['xc'][0], np.arange(6) * 15 + 8)
+        assert np.array_equal(data['yc'][:, 0], np.arange(4) * 15 + 8)
+
+        metadata, data = defdap.file_readers.DICDataLoader().loadNCorr(
+            file_path.name, str(file_path.parent), roi=(1, 4, 2, 4)
+        )
+        assert metadata['offset'] == (1, 2)
+        assert np.array_equal(data['xd'], u[2:4, 1:4])
+        assert np.array_equal(data['xc'][0], np.arange(1, 4) * 15 + 8)
 
     @staticmethod
     def test_load_davis_data_bad_file(dic_metadata_loaded):
@@ -101,6 +101,365 @@ def testFromAxisAngleStr2(axis, angle):
         defdap.quat.Quat.fromAxisAngle(axis, angle)
 
 
+## Storage and methods
+def testSlots():
+    quat = defdap.quat.Quat(0.1, 0.2, 0.3)
+    assert not hasattr(quat, '__dict__')
+    with pytest.raises(AttributeError):
+        quat.someAttribute = 1
+
+    quat.quatCoef = [0.5, 0.5, 0.5, 0.5]
+    assert np.allclose(quat.quatCoef, [0.5, 0.5, 0.5, 0.5])
+    quat[1] = -0.5
+    assert np.allclose(quat.quatCoef, [0.5, -0.5, 0.5, 0.5])
+
+
+def testPlotIPFDispatch():
+    quat = defdap.quat.Quat(0.1, 0.2, 0.3)
+    # static method when accessed from the class, bound method from an instance
+    assert defdap.quat.Quat.plotIPF.__name__ == 'plotIPF'
+    assert quat.plotIPF.__func__ is defdap.quat.Quat._plotIPF
+
+
+@pytest.mark.parametrize('eulers', [
+    (0.1, 0.2, 0.3),
+    (2.5, 1.2, 5.9),
+    (np.pi, 3., np.pi / 3.),
+])
+def testTransformVector(eulers):
+    quat = defdap.quat.Quat(*eulers)
+    vector = np.array([0.3, -1.2, 0.7])
+    assert np.allclose(quat.transformVector(vector),
+                       quat.rotMatrix().dot(vector))
+
+
+## Symmetry operators
+@pytest.mark.parametrize('symGroup, numSyms', [
+    ('cubic', 24),
+    ('hexagonal', 12),
+    ('triclinic', 1),
+])
+def testSymEqvArray(symGroup, numSyms):
+    symComps = defdap.quat.Quat.symEqvArray(symGroup)
+    symMatrices = defdap.quat.Quat.symEqvMatrices(symGroup)
+
+    assert symComps.shape == (numSyms, 4)
+    assert symMatrices.shape == (numSyms, 3, 3)
+    # built once and shared between calls
+    assert defdap.quat.Quat.symEqvArray(symGroup) is symComps
+    assert not symComps.flags.writeable
+    assert not symMatrices.flags.writeable
+
+    syms = defdap.quat.Quat.symEqv(symGroup)
+    assert np.allclose(symComps[0], [1, 0, 0, 0])
+    for sym, symComp, symMatrix in zip(syms, symComps, symMatrices):
+        assert np.allclose(sym.quatCoef, symComp)
+        assert np.allclose(sym.rotMatrix(), symMatrix)
+
+
+@pytest.mark.parametrize('symGroup', ['cubic', 'hexagonal'])
+def testMisOri(symGroup):
+    quat1 = defdap.quat.Quat(0.3, 0.5, 1.0)
+    quat2 = defdap.quat.Quat(2.0, 1.0, 0.1)
+
+    expectedMisOri = max(abs(quat1.dot(sym * quat2))
+                         for sym in defdap.quat.Quat.symEqv(symGroup))
+    misOri, quatSym = quat1.misOri(quat2, symGroup, returnQuat=2)
+
+    assert misOri == pytest.approx(expectedMisOri)
+    assert abs(quat1.dot(quatSym)) == pytest.approx(expectedMisOri)
+
+
+## Batched products
+@pytest.mark.parametrize('opOnLeft', [True, False])
+@pytest.mark.parametrize('chunkSize', [None, 4])
+def testCalcProducts(opOnLeft, chunkSize):
+    ops = [defdap.quat.Quat(0.1, 0.2, 0.3), defdap.quat.Quat(2.5, 1.2, 5.9)]
+    opComps = np.array([op.quatCoef for op in ops])
+    quats = [defdap.quat.Quat(0.3 * i, 0.2 * i, 0.1 * i) for i in range(10)]
+    quatComps = np.array([quat.quatCoef for quat in quats]).T.reshape((4, 2, 5))
+
+    out = np.empty((2, 4, 2, 5))
+    products = defdap.quat.Quat.calcProducts(opComps, quatComps, opOnLeft=opOnLeft,
+                                             out=out, chunkSize=chunkSize)
+    assert products is out
+
+    for i, op in enumerate(ops):
+        for j, quat in enumerate(quats):
+            expected = op * quat if opOnLeft else quat * op
+            assert np.allclose(products[i, :, j // 5, j % 5], expected.quatCoef)
+
+    # a single operator
+    products = defdap.quat.Quat.calcProducts(opComps[1], quatComps, opOnLeft=opOnLeft)
+    assert products.shape == (4, 2, 5)
+    assert np.allclose(products, out[1])
+
+
+def testCalcSymEqvs():
+    quats = [defdap.quat.Quat(0.3 * i, 0.2 * i, 0.1 * i) for i in range(5)]
+    syms = defdap.quat.Quat.symEqv('hexagonal')
+
+    quatCompsSym = defdap.quat.Quat.calcSymEqvs(quats, 'hexagonal')
+    assert quatCompsSym.shape == (12, 4, 5)
+    for i, sym in enumerate(syms):
+        for j, quat in enumerate(quats):
+            assert np.allclose(quatCompsSym[i, :, j], (sym * quat).quatCoef)
+
+
+## Disorientation
+@pytest.mark.parametrize('symGroup', ['cubic', 'hexagonal', 'triclinic'])
+def testCalcDisorientation(symGroup):
+    rng = np.random.default_rng(0)
+    quatComps1 = rng.normal(size=(4, 20, 10))
+    quatComps1 /= np.linalg.norm(quatComps1, axis=0)
+    quatComps2 = rng.normal(size=(4, 20, 10))
+    quatComps2 /= np.linalg.norm(quatComps2, axis=0)
+
+    # brute force over all symmetrical equivalents
+    quatCompsSym = defdap.quat.Quat.calcProducts(
+        defdap.quat.Quat.symEqvArray(symGroup), quatComps2
+    )
+    expected = np.abs(np.einsum("i...,si...->s...", quatComps1, quatCompsSym)).max(axis=0)
+
+    out = np.empty((20, 10))
+    misOri = defdap.quat.Quat.calcDisorientation(quatComps1, quatComps2, symGroup, out=out)
+
+    assert misOri is out
+    assert np.allclose(misOri, np.minimum(expected, 1))
+
+    # broadcast against a single orientation
+    misOri = defdap.quat.Quat.calcDisorientation(quatComps1, quatComps2[:, 0, 0], symGroup)
+    assert misOri.shape == (20, 10)
+
+
+## Batch misorientation
+@pytest.mark.parametrize('symGroup', ['cubic', 'hexagonal'])
+def testCalcMisOrisPairwise(symGroup):
+    rng = np.random.default_rng(5)
+    quats1 = defdap.quat.QuatArray.fromEulerAngles(rng.uniform(0, np.pi, size=(3, 6)))
+    quats2 = defdap.quat.QuatArray.fromEulerAngles(rng.uniform(0, np.pi, size=(3, 4)))
+
+    misOris, minQuats, axes = defdap.quat.Quat.calcMisOris(
+        quats1, quats2, symGroup, returnQuat=True, returnAxis=True,
+        pairwise=True, chunkSize=5
+    )
+    assert misOris.shape == minQuats.shape == (6, 4)
+    assert axes.shape == (3, 6, 4)
+    assert np.allclose(
+        defdap.quat.Quat.calcMisOris(quats1, quats2, symGroup, pairwise=True),
+        misOris
+    )
+
+    for i, quat1 in enumerate(quats1):
+        for j, quat2 in enumerate(quats2):
+            misOri, minQuat = quat1.misOri(quat2, symGroup, returnQuat=2)
+            assert misOris[i, j] == pytest.approx(misOri)
+            assert abs(minQuats[i, j].dot(minQuat)) == pytest.approx(1)
+            assert np.allclose(axes[:, i, j], quat1.misOriAxis(minQuat))
+
+
+def testCalcMisOrisBroadcast():
+    rng = np.random.default_rng(6)
+    quats1 = defdap.quat.QuatArray.fromEulerAngles(rng.uniform(0, np.pi, size=(3, 5, 3)))
+    quat2 = defdap.quat.Quat(0.1, 0.2, 0.3)
+
+    misOris = defdap.quat.Quat.calcMisOris(quats1, quat2, 'cubic')
+    assert misOris.shape == (5, 3)
+    for idx in np.ndindex(5, 3):
+        assert misOris[idx] == pytest.approx(quats1[idx].misOri(quat2, 'cubic'))
+
+    # no misorientation between identical orientations
+    misOris, axes = defdap.quat.Quat.calcMisOris(quats1, quats1, 'cubic', returnAxis=True)
+    assert np.allclose(misOris, 1)
+    assert np.allclose(axes, 0)
+
+
+## Average orientation
+@pytest.fixture
+def groupedQuats():
+    """Orientations scattered around 2 mean orientations, each
+    represented by random symmetric equivalents."""
+    rng = np.random.default_rng(4)
+    syms = defdap.quat.Quat.symEqv('cubic')
+    means = [defdap.quat.Quat(0.5, 0.4, 0.3), defdap.quat.Quat(2.0, 1.0, 1.5)]
+    labels = np.array([1] * 30 + [2] * 20 + [0] * 3 + [-1] * 2)
+
+    quats = []
+    for label in labels:
+        mean = means[max(label, 1) - 1]
+        scatter = defdap.quat.Quat(*rng.normal(scale=0.02, size=3))
+        quats.append(syms[rng.integers(len(syms))] * (scatter * mean))
+
+    return quats, labels, means
+
+
+def testCalcAverageOri(groupedQuats):
+    quats, labels, means = groupedQuats
+    for label, mean in enumerate(means, start=1):
+        groupQuats = [quat for quat, l in zip(quats, labels) if l == label]
+        quatCompsSym = defdap.quat.Quat.calcSymEqvs(groupQuats, 'cubic')
+
+        avOri = defdap.quat.Quat.calcAverageOri(quatCompsSym)
+        assert avOri.misOri(mean, 'cubic') > np.cos(np.pi / 180)
+
+
+def testCalcAverageOris(groupedQuats):
+    quats, labels, means = groupedQuats
+    quatArray = defdap.quat.QuatArray.fromQuats(quats)
+
+    avOris = defdap.quat.Quat.calcAverageOris(quatArray, labels, 'cubic', chunkSize=16)
+    assert avOris.shape == (2,)
+    for label, avOri in enumerate(avOris, start=1):
+        groupQuats = [quat for quat, l in zip(quats, labels) if l == label]
+        expected = defdap.quat.Quat.calcAverageOri(
+            defdap.quat.Quat.calcSymEqvs(groupQuats, 'cubic')
+        )
+        assert abs(avOri.dot(expected)) == pytest.approx(1)
+
+
+## Fundamental directions
+@pytest.mark.parametrize('symGroup, betaMax', [
+    ('cubic', np.pi / 4),
+    ('hexagonal', np.pi / 6),
+])
+def testCalcFundDirs(symGroup, betaMax):
+    rng = np.random.default_rng(1)
+    eulers = rng.uniform(0, np.pi, size=(50, 3))
+    # include orientations with poles on the edges of the triangle
+    eulers[:3] = [(0, 0, 0), (np.pi / 4, 0, 0), (np.pi / 6, np.pi / 2, 0)]
+    quats = [defdap.quat.Quat(*euler) for euler in eulers]
+    direction = np.array([0, 0, 1])
+
+    alphaFund, betaFund = defdap.quat.Quat.calcFundDirs(quats, direction, symGroup)
+
+    assert alphaFund.shape == betaFund.shape == (50,)
+    assert np.all(betaFund >= -1e-8) and np.all(betaFund <= betaMax + 1e-8)
+    # one pole per orientation, in the same order
+    for i, quat in enumerate(quats):
+        alpha, beta = defdap.quat.Quat.calcFundDirs([quat], direction, symGroup)
+        assert alphaFund[i] == pytest.approx(alpha[0])
+        assert betaFund[i] == pytest.approx(beta[0])
+
+
+## IPF colours
+@pytest.mark.parametrize('symGroup', ['cubic', 'hexagonal'])
+def testCalcIPFcolours(symGroup):
+    rng = np.random.default_rng(2)
+    eulers = rng.uniform(0, np.pi, size=(3, 12, 10))
+    quatArray = defdap.quat.QuatArray.fromEulerAngles(eulers)
+    direction = np.array([0, 0, 1])
+
+    colours = defdap.quat.Quat.calcIPFcolours(quatArray, direction, symGroup)
+    assert colours.shape == (12, 10, 3)
+    assert np.all(colours >= 0) and np.all(colours <= 1)
+    assert np.allclose(colours.max(axis=2), 1)
+
+    # chunked and threaded calculation gives the same result
+    out = np.empty((12, 10, 3))
+    chunkedColours = defdap.quat.Quat.calcIPFcolours(
+        quatArray, direction, symGroup, chunkSize=7, numThreads=3, out=out
+    )
+    assert chunkedColours is out
+    assert np.allclose(chunkedColours, colours)
+
+    # a list of quats gives a colour per quat
+    quats = quatArray.flatten().toQuats()
+    listColours = defdap.quat.Quat.calcIPFcolours(quats, direction, symGroup)
+    assert listColours.shape == (120, 3)
+    assert np.allclose(listColours, colours.reshape((120, 3)))
+
+
+@pytest.mark.parametrize('symGroup', ['cubic', 'hexagonal'])
+def testCalcIPFcoloursLUT(symGroup):
+    rng = np.random.default_rng(3)
+    eulers = rng.uniform(0, np.pi, size=(3, 50, 40))
+    quatArray = defdap.quat.QuatArray.fromEulerAngles(eulers)
+    direction = np.array([0, 0, 1])
+
+    colours = defdap.quat.Quat.calcIPFcolours(quatArray, direction, symGroup)
+    lutColours = defdap.quat.Quat.calcIPFcolours(quatArray, direction, symGroup,
+                                                 useLUT=True)
+    assert lutColours.shape == (50, 40, 3)
+    assert np.mean(np.abs(lutColours - colours)) < 1e-3
+    assert np.max(np.abs(lutColours - colours)) < 0.1
+
+    # table is calculated once per symmetry
+    colourLUT = defdap.quat.Quat.calcIPFcolourLUT(symGroup)
+    assert defdap.quat.Quat.calcIPFcolourLUT(symGroup) is colourLUT
+    assert not colourLUT.flags.writeable
+
+
+## QuatArray
+@pytest.fixture
+def eulerArray():
+    rng = np.random.default_rng(0)
+    return rng.uniform(0, 1, (3, 5, 4)) * np.array([2*np.pi, np.pi, 2*np.pi])[:, None, None]
+
+# Elements should match Quats created individually
+def testQuatArrayFromEulers(eulerArray):
+    quatArray = defdap.quat.Quat.createManyQuats(eulerArray)
+    assert isinstance(quatArray, defdap.quat.QuatArray)
+    assert quatArray.shape == (5, 4)
+    for idx in np.ndindex(quatArray.shape):
+        expected = defdap.quat.Quat(*eulerArray[(slice(None),) + idx])
+        assert isinstance(quatArray[idx], defdap.quat.Quat)
+        assert np.allclose(quatArray[idx].quatCoef, expected.quatCoef)
+    assert np.allclose(quatArray.eulerAngles(), eulerArray)
+
+# Components should be converted to float and only copied if asked
+def testQuatArrayInit():
+    quatComps = np.zeros((4, 3))
+    assert np.shares_memory(defdap.quat.QuatArray(quatComps).quatComps, quatComps)
+    assert not np.shares_memory(
+        defdap.quat.QuatArray(quatComps, copy=True).quatComps, quatComps
+    )
+
+    quatArray = defdap.quat.QuatArray([[1, 0], [0, 1], [0, 0], [0, 0]])
+    assert quatArray.quatComps.dtype == float
+    assert quatArray.shape == (2,)
+
+# Rows of a 2D array should be views that can be iterated over
+def testQuatArrayIndexing(eulerArray):
+    quatArray = defdap.quat.QuatArray.fromEulerAngles(eulerArray)
+    rows = list(quatArray)
+    assert len(rows) == 5
+    assert all(isinstance(row, defdap.quat.QuatArray) for row in rows)
+    assert np.shares_memory(rows[0].quatComps, quatArray.quatComps)
+
+    newQuat = defdap.quat.Quat(0.5, 0.5, 0.5, 0.5)
+    quatArray[1, 2] = newQuat
+    assert np.allclose(quatArray[1, 2].quatCoef, newQuat.quatCoef)
+    quatArray[0] = newQuat
+    assert np.allclose(quatArray.quatComps[:, 0], 0.5)
+
+# Vectorised operations should match those of Quat
+def testQuatArrayOperations(eulerArray):
+    quatArray = defdap.quat.QuatArray.fromEulerAngles(eulerArray)
+    other = defdap.quat.Quat.fromAxisAngle(np.array([1, 2, 3]), 0.3)
+    vector = np.array([0.3, -1., 2.])
+
+    product = quatArray * other
+    leftProduct = other * quatArray
+    conjugate = quatArray.conjugate
+    dots = quatArray.dot(other)
+    rotMatrices = quatArray.rotMatrix()
+    vectors = quatArray.transformVector(vector)
+    for idx in np.ndindex(quatArray.shape):
+        quat = quatArray[idx]
+        assert np.allclose(product[idx].quatCoef, (quat * other).quatCoef)
+        assert np.allclose(leftProduct[idx].quatCoef, (other * quat).quatCoef)
+        assert np.allclose(conjugate.quatComps[(slice(None),) + idx],
+                           quat.conjugate.quatCoef)
+        assert np.isclose(dots[idx], quat.dot(other))
+        assert np.allclose(rotMatrices[(slice(None), slice(None)) + idx],
+                           quat.rotMatrix())
+        assert np.allclose(vectors[(slice(None),) + idx],
+                           quat.rotMatrix().dot(vector))
+
+    quatArray.quatComps *= 2
+    quatArray.normalise()
+    assert np.allclose(quatArray.norm(), 1)
+
 
 ''' Functions left to test
 eulerAngles(self):